@@ -0,0 +1,328 @@
+"""Asyncio YouTube Data API client (plain REST over aiohttp) for fetches that can overlap."""
+import json
+import atexit
+import asyncio
+import threading
+from urllib.parse import urlencode
+
+import aiohttp
+
+import resilience
+from profiling import staged
+from key_pool import quota_cost
+from youtube_api import (
+    ETAG_CACHE, PAYLOAD_STATS, VIDEO_STATS, YOUTUBE_BREAKER, KEY_POOL, API_DEADLINE, HEDGE_AFTER, view_params,
+    _request_key, keyword_metrics_from_items, keyword_error_message
+)
+
+# Same root and `alt` as googleapiclient, so both clients share ETag cache entries
+API_ROOT = "https://youtube.googleapis.com/youtube/v3/"
+POOL_SIZE = 32
+STATS_BATCH_SIZE = 10
+
+_loop = None
+_loop_lock = threading.Lock()
+_session = None
+
+
+class YouTubeHTTPError(Exception):
+    """Non-2xx reply; the message keeps the API's error body (reason codes, "quota", ...)"""
+
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body[:500]}")
+        self.status = status
+
+
+def _background_loop():
+    """
+    One event loop on a daemon thread for the whole process. Streamlit's script
+    thread (and job threads) hand coroutines to it instead of running their own
+    loop, so the aiohttp connection pool survives reruns and is shared by sessions.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="vidiq-async", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+@staged('fetch')
+def run(coro, timeout=None):
+    """Run a coroutine on the background loop from any thread and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result(timeout)
+
+
+def iterate(agen):
+    """Consume an async generator from a sync thread, one item per round-trip to the loop"""
+    try:
+        while True:
+            try:
+                yield run(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run(agen.aclose())
+
+
+def run_all(*coros, return_exceptions=False):
+    """Run independent coroutines concurrently; results in argument order"""
+    async def gather():
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+    return run(gather())
+
+
+async def _close_session():
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+@atexit.register
+def close():
+    """Close the shared connection pool (runs at interpreter exit)"""
+    if _loop is not None and _loop.is_running():
+        try:
+            run(_close_session(), timeout=2)
+        except Exception:
+            pass
+
+
+async def _get_session():
+    """Shared ClientSession; only ever touched from the background loop's thread"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=POOL_SIZE, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=API_DEADLINE)
+        )
+    return _session
+
+
+class AsyncYouTubeClient:
+    """
+    list() calls with the same view profiles, ETag cache, payload stats and circuit
+    breaker as youtube_api, so sync and async fetches can be mixed freely.
+    """
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    async def list(self, resource, view, conditional=True, **params):
+        """`conditional=False` for searches: no If-None-Match and nothing kept in the ETag cache"""
+        query = {k: v for k, v in params.items() if v is not None}
+        query.update(view_params(view))
+        query['alt'] = 'json'
+        key = _request_key(API_ROOT + resource + '?' + urlencode(query))
+        cached = ETAG_CACHE.lookup(key) if conditional else None
+        headers = {}
+        if cached is not None and conditional and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+
+        cost = quota_cost(resource)
+
+        async def attempt():
+            session = await _get_session()
+            while True:
+                key = KEY_POOL.route(self.api_key, cost)
+                async with session.get(API_ROOT + resource, params={**query, 'key': key}, headers=headers) as resp:
+                    body = await resp.read()
+                if resp.status >= 300:
+                    error = YouTubeHTTPError(resp.status, body.decode('utf-8', 'replace'))
+                    if KEY_POOL.report_error(key, error):
+                        continue
+                    raise error
+                PAYLOAD_STATS.record(view, len(body))
+                return json.loads(body)
+
+        try:
+            response = await resilience.call_async(
+                attempt, YOUTUBE_BREAKER, deadline=API_DEADLINE,
+                hedge_after=HEDGE_AFTER if conditional else None
+            )
+        except Exception as e:
+            answer = ETAG_CACHE.fallback(key, cached, e, view, conditional)
+            if answer is None:
+                raise
+            return answer
+
+        if conditional:
+            ETAG_CACHE.store(key, response)
+        return response
+
+    async def search(self, view, **params):
+        return await self.list('search', view, conditional=False, **params)
+
+    async def channel(self, channel_id, view='audit_channel'):
+        """Channel resource or None"""
+        res = await self.list('channels', view, id=channel_id)
+        items = res.get('items', [])
+        return items[0] if items else None
+
+    async def uploads(self, channel_id, max_results, view='audit_uploads'):
+        """First page of a channel's uploads, addressed without fetching the channel first"""
+        return await self.list('playlistItems', view, playlistId=uploads_playlist_id(channel_id), maxResults=max_results)
+
+    async def videos(self, video_ids, view):
+        return await self.list('videos', view, id=','.join(video_ids))
+
+
+def uploads_playlist_id(channel_id):
+    """A channel's uploads playlist is its ID with UC swapped for UU"""
+    return 'UU' + channel_id[2:]
+
+
+async def keyword_events(client, keyword, pages=1, region='ID', batch_size=STATS_BATCH_SIZE):
+    """
+    Search -> statistics pipeline for a keyword, as an async generator of events:
+    ('snippets', rows) as soon as a search page lands, ('stats', items) for every
+    videos().list batch as it completes. Statistics batches of a page run while
+    the next search page is already being fetched.
+    """
+    def search(page_token):
+        return asyncio.ensure_future(client.search(
+            'keyword_search', q=keyword, type='video', maxResults=20,
+            order='relevance', regionCode=region, pageToken=page_token
+        ))
+
+    next_search = search(None)
+    stats_tasks = set()
+    try:
+        for page in range(pages):
+            res = await next_search
+            token = res.get('nextPageToken')
+            next_search = search(token) if token and page + 1 < pages else None
+
+            items = [item for item in res.get('items', []) if 'videoId' in item.get('id', {})]
+            yield 'snippets', [{
+                'video_id': item['id']['videoId'],
+                'Title': item.get('snippet', {}).get('title', 'Unknown'),
+                'Channel': item.get('snippet', {}).get('channelTitle', 'Unknown'),
+                'Date': item.get('snippet', {}).get('publishedAt', '')[:10] or 'N/A'
+            } for item in items]
+
+            ids = [item['id']['videoId'] for item in items]
+            stats_tasks.update(
+                asyncio.ensure_future(client.videos(ids[i:i + batch_size], 'keyword'))
+                for i in range(0, len(ids), batch_size)
+            )
+            # Hand over whatever statistics already arrived before waiting on the next page
+            for task in [t for t in stats_tasks if t.done()]:
+                stats_tasks.discard(task)
+                yield 'stats', task.result().get('items', [])
+            if next_search is None:
+                break
+
+        for task in asyncio.as_completed(stats_tasks):
+            yield 'stats', (await task).get('items', [])
+        stats_tasks.clear()
+    finally:
+        for task in stats_tasks:
+            task.cancel()
+        if next_search is not None:
+            next_search.cancel()
+
+
+def stream_keyword_metrics(api_key, keyword, on_items=None, on_progress=None, pages=1, region='ID'):
+    """
+    youtube_api.get_keyword_metrics over the pipeline above; `on_progress(event, payload)`
+    is called on the caller's thread for every event, so it may draw Streamlit elements.
+    """
+    if not api_key or len(api_key) < 30:
+        return None, "❌ Invalid API Key"
+    if not keyword:
+        return None, "❌ Keyword required"
+
+    try:
+        order = []
+        stats_items = {}
+        for event, payload in iterate(keyword_events(AsyncYouTubeClient(api_key), keyword, pages, region)):
+            if event == 'snippets':
+                order.extend(row['video_id'] for row in payload)
+            else:
+                stats_items.update((item['id'], item) for item in payload)
+            if on_progress:
+                on_progress(event, payload)
+
+        if not order:
+            return None, f"❌ No videos found for '{keyword}'"
+        # Batches land in any order; keep search relevance order like the sync path
+        items = [stats_items[video_id] for video_id in order if video_id in stats_items]
+        VIDEO_STATS.put_many(items)
+        if on_items:
+            on_items(items, 'keyword', keyword, region)
+        return keyword_metrics_from_items(items, keyword, region)
+    except Exception as e:
+        return None, keyword_error_message(e)
+
+
+async def region_items(client, keyword, regions, batch_size=STATS_BATCH_SIZE):
+    """
+    Every region's search at once, then statistics for the distinct videos that aren't
+    in VIDEO_STATS, batched across regions. Returns ({region: items or exception}, counts).
+    """
+    searches = await asyncio.gather(*(
+        client.search('keyword_search', q=keyword, type='video', maxResults=20, order='relevance', regionCode=region)
+        for region in regions
+    ), return_exceptions=True)
+
+    found = {}
+    for region, res in zip(regions, searches):
+        if not isinstance(res, Exception):
+            found[region] = [item['id']['videoId'] for item in res.get('items', []) if 'videoId' in item.get('id', {})]
+    distinct = list(dict.fromkeys(video_id for ids in found.values() for video_id in ids))
+    known = VIDEO_STATS.get_many(distinct)
+    missing = [video_id for video_id in distinct if video_id not in known]
+
+    batches = await asyncio.gather(*(
+        client.videos(missing[i:i + batch_size], 'keyword') for i in range(0, len(missing), batch_size)
+    ))
+    fetched = [item for batch in batches for item in batch.get('items', [])]
+    VIDEO_STATS.put_many(fetched)
+    known.update((item['id'], item) for item in fetched)
+
+    results = {}
+    for region, res in zip(regions, searches):
+        if isinstance(res, Exception):
+            results[region] = res
+        else:
+            results[region] = [known[video_id] for video_id in found[region] if video_id in known]
+    counts = {
+        'searches': len(regions),
+        'videos': sum(len(ids) for ids in found.values()),
+        'distinct': len(distinct),
+        'cached': len(distinct) - len(missing),
+        'fetched': len(missing)
+    }
+    return results, counts
+
+
+def compare_keyword_regions(api_key, keyword, regions, on_items=None):
+    """
+    Keyword metrics for several regions concurrently (one 100-unit search per region;
+    a video that ranks in several regions is fetched once). Returns
+    ({region: (metrics, error)}, counts) or (None, error) when nothing could be fetched.
+    """
+    if not api_key or len(api_key) < 30:
+        return None, "❌ Invalid API Key"
+    if not keyword:
+        return None, "❌ Keyword required"
+    if not regions:
+        return {}, {'searches': 0, 'videos': 0, 'distinct': 0, 'cached': 0, 'fetched': 0}
+
+    try:
+        results, counts = run(region_items(AsyncYouTubeClient(api_key), keyword, list(regions)))
+    except Exception as e:
+        return None, keyword_error_message(e)
+
+    metrics = {}
+    for region, items in results.items():
+        if isinstance(items, Exception):
+            metrics[region] = (None, keyword_error_message(items))
+        elif not items:
+            metrics[region] = (None, f"❌ No videos found for '{keyword}'")
+        else:
+            if on_items:
+                on_items(items, 'keyword', keyword, region)
+            metrics[region] = keyword_metrics_from_items(items, keyword, region)
+    return metrics, counts
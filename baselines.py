@@ -0,0 +1,276 @@
+"""
+Per-niche, per-region view and engagement baselines for keyword difficulty.
+
+    python baselines.py build                      # from the local corpus (vidiq_corpus.db)
+    python baselines.py build --min-videos 50 --niches niches.json -o baselines.npz
+    python baselines.py show
+
+The builder turns every video with statistics into percentile tables (101 quantiles of
+views and of engagement per niche x region, plus per-niche, per-region and global
+fallbacks) saved as one small .npz file. The app loads it once and rates a keyword by
+where its results sit inside its own niche instead of by fixed view thresholds.
+"""
+import os
+import re
+import sys
+import json
+import math
+import time
+import bisect
+import argparse
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+DEFAULT_BASELINES_PATH = os.environ.get("VIDIQ_BASELINES", "vidiq_baselines.npz")
+DEFAULT_MIN_VIDEOS = 30
+QUANTILES = np.linspace(0, 100, 101)
+ANY = "*"
+
+# Sidebar niches (minus "general") and the words that put a query or title in them
+NICHE_TERMS = {
+    'gaming': ['game', 'games', 'gaming', 'gameplay', 'minecraft', 'roblox', 'mobile legends', 'free fire',
+               'pubg', 'valorant', 'fortnite', 'gta', 'walkthrough', 'speedrun', 'mabar'],
+    'tech': ['tech', 'review', 'unboxing', 'smartphone', 'laptop', 'android', 'iphone', 'gadget', 'pc build',
+             'samsung', 'xiaomi', 'spesifikasi', 'coding', 'programming', 'ai'],
+    'cooking': ['resep', 'recipe', 'recipes', 'masak', 'memasak', 'cooking', 'kuliner', 'food', 'makanan',
+                'baking', 'kue', 'mukbang', 'street food'],
+    'music': ['music', 'musik', 'lagu', 'song', 'songs', 'lofi', 'lullaby', 'remix', 'cover', 'playlist',
+              'beats', 'karaoke', 'instrumental', 'piano', 'dj'],
+    'fitness': ['workout', 'fitness', 'olahraga', 'gym', 'yoga', 'diet', 'senam', 'cardio', 'exercise', 'hiit'],
+    'education': ['tutorial', 'belajar', 'learn', 'learning', 'pelajaran', 'how to', 'cara', 'explained',
+                  'edukasi', 'lesson', 'course', 'matematika', 'sejarah', 'bahasa inggris'],
+    'entertainment': ['prank', 'comedy', 'lucu', 'funny', 'film', 'movie', 'trailer', 'reaction', 'drama',
+                      'sinetron', 'anime', 'horor', 'horror', 'podcast'],
+    'business': ['bisnis', 'business', 'uang', 'money', 'investasi', 'investing', 'saham', 'crypto',
+                 'marketing', 'usaha', 'jualan', 'passive income', 'trading'],
+    'lifestyle': ['vlog', 'travel', 'fashion', 'makeup', 'skincare', 'rumah', 'daily', 'routine', 'outfit',
+                  'haul', 'wisata', 'kehidupan'],
+}
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+class NicheClassifier:
+    """Niche of a keyword or title: the one whose terms match most words (None if none does)"""
+
+    def __init__(self, niche_terms=None):
+        self.niche_terms = niche_terms or NICHE_TERMS
+        self._single = defaultdict(set)
+        self._phrases = []
+        for niche, terms in self.niche_terms.items():
+            for term in terms:
+                term = term.lower().strip()
+                if ' ' in term:
+                    self._phrases.append((f" {term} ", niche))
+                elif term:
+                    self._single[term].add(niche)
+
+    def classify(self, *texts):
+        hits = defaultdict(int)
+        for text in texts:
+            words = WORD_RE.findall((text or '').lower())
+            for word in words:
+                for niche in self._single.get(word, ()):
+                    hits[niche] += 1
+            padded = f" {' '.join(words)} "
+            for phrase, niche in self._phrases:
+                if phrase in padded:
+                    hits[niche] += 2
+        if not hits:
+            return None
+        # Ties go to the first niche in declaration order
+        order = list(self.niche_terms)
+        return max(hits, key=lambda niche: (hits[niche], -order.index(niche)))
+
+
+def percentile(table, value):
+    """Percentile (0-100) of `value` in a 101-point quantile table, interpolated between points"""
+    if value <= table[0]:
+        return 0.0
+    if value >= table[-1]:
+        return 100.0
+    i = bisect.bisect_right(table, value)
+    low, high = table[i - 1], table[i]
+    step = 100 / (len(table) - 1)
+    return (i - 1 + (value - low) / (high - low)) * step if high > low else (i - 1) * step
+
+
+class Baselines:
+    """
+    Quantile tables keyed by (niche, region); lookups fall back to the niche in any
+    region, the region in any niche, then everything, whichever has data first.
+    """
+
+    def __init__(self, keys, counts, views, engagement, built_at=None, niche_terms=None):
+        self.keys = [tuple(key) for key in keys]
+        self.counts = [int(c) for c in counts]
+        # Python lists: bisect on them is faster than numpy for a single value
+        self.views = [list(map(float, row)) for row in views]
+        self.engagement = [list(map(float, row)) for row in engagement]
+        self.built_at = built_at
+        self.classifier = NicheClassifier(niche_terms)
+        self._index = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, niche, region):
+        """Index of the most specific table covering (niche, region), or None"""
+        for key in ((niche, region), (niche, ANY), (ANY, region), (ANY, ANY)):
+            if key in self._index:
+                return self._index[key]
+        return None
+
+    def rate(self, keyword, region, median_views, avg_engagement):
+        """
+        Where a keyword's results sit in their niche: views and engagement percentiles
+        plus the table used, or None when there is no baseline at all. The engagement
+        percentile is None when the results' engagement is unknown (NaN: all likes hidden)
+        """
+        niche = self.classifier.classify(keyword) or ANY
+        i = self.find(niche, region or ANY)
+        if i is None:
+            return None
+        return {
+            'niche': self.keys[i][0],
+            'region': self.keys[i][1],
+            'videos': self.counts[i],
+            'views_percentile': percentile(self.views[i], median_views),
+            'engagement_percentile': None if math.isnan(avg_engagement) else percentile(self.engagement[i], avg_engagement)
+        }
+
+    def rows(self):
+        """Summary per table, for `show` and the UI"""
+        return [{
+            'Niche': niche, 'Region': region, 'Videos': count,
+            'Median Views': int(views[50]), 'P90 Views': int(views[90]),
+            'Median Engagement': round(engagement[50], 2)
+        } for (niche, region), count, views, engagement in zip(self.keys, self.counts, self.views, self.engagement)]
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            niches=np.array([k[0] for k in self.keys], dtype=str),
+            regions=np.array([k[1] for k in self.keys], dtype=str),
+            counts=np.array(self.counts, dtype=np.int32),
+            views=np.array(self.views, dtype=np.float32).reshape(len(self.keys), len(QUANTILES)),
+            engagement=np.array(self.engagement, dtype=np.float32).reshape(len(self.keys), len(QUANTILES)),
+            built_at=np.float64(self.built_at or time.time()),
+            niche_terms=np.array(json.dumps(self.classifier.niche_terms, ensure_ascii=False))
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                zip(data['niches'].tolist(), data['regions'].tolist()), data['counts'],
+                data['views'], data['engagement'], float(data['built_at']),
+                json.loads(str(data['niche_terms']))
+            )
+
+
+def build_baselines(rows, min_videos=DEFAULT_MIN_VIDEOS, niche_terms=None):
+    """
+    Baselines from (query, region, title, tags, views, likes, comments) rows, e.g.
+    CorpusIndex.iter_stats(). Groups with fewer than `min_videos` videos are dropped.
+    """
+    classifier = NicheClassifier(niche_terms)
+    groups = defaultdict(lambda: ([], []))
+    for query, region, title, tags, views, likes, comments in rows:
+        if not views or views <= 0:
+            continue
+        # The search that found the video says most about its niche; the title breaks ties
+        niche = classifier.classify(query) or classifier.classify(title, tags)
+        # Hidden likes make engagement unknown: the video still counts towards views
+        engagement = None if likes is None else (likes + (comments or 0)) / views * 100
+        region = region or ANY
+        keys = {(ANY, ANY), (ANY, region)}
+        if niche:
+            keys.update({(niche, ANY), (niche, region)})
+        for key in keys:
+            groups[key][0].append(views)
+            if engagement is not None:
+                groups[key][1].append(engagement)
+
+    keys, counts, view_tables, engagement_tables = [], [], [], []
+    for key in sorted(groups):
+        views, engagement = groups[key]
+        if len(views) < min_videos or not engagement:
+            continue
+        keys.append(key)
+        counts.append(len(views))
+        view_tables.append(np.percentile(np.asarray(views, dtype=np.float64), QUANTILES))
+        engagement_tables.append(np.percentile(np.asarray(engagement, dtype=np.float64), QUANTILES))
+    return Baselines(keys, counts, view_tables, engagement_tables, time.time(), classifier.niche_terms)
+
+
+_cache_lock = threading.Lock()
+_cache = {}
+
+
+def load_baselines(path=DEFAULT_BASELINES_PATH):
+    """The baselines file, read once per build (None if it hasn't been built)"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = _cache[path] = (mtime, Baselines.load(path))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Ignoring unreadable baselines {path}: {e}", file=sys.stderr)
+                cached = _cache[path] = (mtime, None)
+        return cached[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build niche/region view baselines for keyword difficulty")
+    parser.add_argument("--file", default=DEFAULT_BASELINES_PATH, help="Baselines file to show (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser("build", help="Compute baselines from the local corpus")
+    build_cmd.add_argument("--db", default=None, help="Corpus database (default: VIDIQ_CORPUS_DB or vidiq_corpus.db)")
+    build_cmd.add_argument("-o", "--output", default=None, help="Output file (default: --file)")
+    build_cmd.add_argument("--min-videos", type=int, default=DEFAULT_MIN_VIDEOS, help="Smallest group that gets its own table")
+    build_cmd.add_argument("--niches", default=None, help="JSON object {niche: [terms]} replacing the built-in niches")
+    sub.add_parser("show", help="Summarize a baselines file")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        baselines = load_baselines(args.file)
+        if baselines is None:
+            raise SystemExit(f"❌ No baselines at {args.file} - run: python baselines.py build")
+        built = time.strftime('%Y-%m-%d %H:%M', time.localtime(baselines.built_at))
+        print(f"{args.file}: {len(baselines)} tables, built {built}")
+        for row in baselines.rows():
+            print(f"  {row['Niche']:<14} {row['Region']:<4} n={row['Videos']:<7} median views {row['Median Views']:>12,}"
+                  f"  p90 {row['P90 Views']:>13,}  median engagement {row['Median Engagement']:.2f}%")
+        return 0
+
+    from corpus_index import CorpusIndex, DEFAULT_DB_PATH
+    niche_terms = None
+    if args.niches:
+        with open(args.niches, encoding="utf-8") as f:
+            niche_terms = json.load(f)
+    index = CorpusIndex(args.db or DEFAULT_DB_PATH)
+    start = time.perf_counter()
+    try:
+        baselines = build_baselines(index.iter_stats(), args.min_videos, niche_terms)
+    finally:
+        index.close()
+    if not len(baselines):
+        raise SystemExit(f"❌ Fewer than {args.min_videos} videos with statistics in the corpus - fetch more first")
+
+    output = args.output or args.file
+    baselines.save(output)
+    print(f"✅ {len(baselines)} tables from {baselines.counts[baselines.find(ANY, ANY)]:,} videos "
+          f"in {time.perf_counter() - start:.1f}s -> {output} ({os.path.getsize(output) / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Startup cache warmer: the team's popular keywords, trend niches and Gemini power-word
+lists are fetched ahead of time, so the first visit after a deploy is as fast as a warm one.
+
+    [warmup]                  # .streamlit/secrets.toml
+    keywords = ["lofi hip hop", "lullaby sleeping music"]
+    niches = ["lofi", "asmr"]
+    gemini_niches = ["music"]
+
+One cycle runs on a daemon thread as soon as the server process loads the app, then
+every `interval` seconds. Results land in WARM_RESULTS, a process-wide store the tabs
+check before calling an API. A cycle spends at most `quota_budget` YouTube units, never
+takes the key pool below `reserve` units and waits `pause` seconds between calls.
+"""
+import time
+import threading
+
+from key_pool import SEARCH_COST, DEFAULT_COST
+
+DEFAULT_INTERVAL = 3600
+DEFAULT_QUOTA_BUDGET = 2000
+DEFAULT_RESERVE = 2000
+DEFAULT_PAUSE = 1.0
+DEFAULT_TREND_DAYS = (7,)
+# Keyword analyses and trend scans are one search plus one videos call
+SEARCH_UNITS = SEARCH_COST + DEFAULT_COST
+# Warmed results outlive the interval a little, so the next cycle refreshes them before they expire
+TTL_MARGIN = 600
+# Targets of each kind, in the order a cycle warms them
+TARGET_KEYS = {'keyword': 'keywords', 'trend': 'niches', 'power_words': 'gemini_niches'}
+
+
+def _normalize(target):
+    if isinstance(target, str):
+        return target.strip().lower()
+    if isinstance(target, (tuple, list)):
+        return tuple(_normalize(part) for part in target)
+    return target
+
+
+class WarmResults:
+    """
+    Prefetched results by (kind, target), shared by every session until they expire.
+    Targets are compared case-insensitively ("Lofi " finds "lofi"). Values are shared
+    between callers and must not be mutated.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        now = time.time()
+        with self._lock:
+            return sum(1 for expires_at, _ in self._items.values() if expires_at > now)
+
+    def get(self, kind, target):
+        key = (kind, _normalize(target))
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] > time.time():
+                self.hits += 1
+                return entry[1]
+            self._items.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, kind, target, value, ttl):
+        with self._lock:
+            self._items[(kind, _normalize(target))] = (time.time() + ttl, value)
+
+
+WARM_RESULTS = WarmResults()
+
+
+def load_config(mapping=None):
+    """Warm-up settings from a [warmup]-style mapping, with defaults for everything left out"""
+    mapping = dict(mapping or {})
+    interval = int(mapping.get('interval', DEFAULT_INTERVAL))
+    days = [int(d) for d in mapping.get('trend_days', DEFAULT_TREND_DAYS)]
+    return {
+        'keywords': [k for k in mapping.get('keywords', []) if k and k.strip()],
+        'niches': [(n, d) for n in mapping.get('niches', []) if n and n.strip() for d in days],
+        'gemini_niches': [n for n in mapping.get('gemini_niches', []) if n and n.strip()],
+        'interval': interval,
+        'ttl': int(mapping.get('ttl', (interval or DEFAULT_INTERVAL) + TTL_MARGIN)),
+        'quota_budget': int(mapping.get('quota_budget', DEFAULT_QUOTA_BUDGET)),
+        'reserve': int(mapping.get('reserve', DEFAULT_RESERVE)),
+        'pause': float(mapping.get('pause', DEFAULT_PAUSE)),
+    }
+
+
+class CacheWarmer:
+    """
+    Warm-up cycles on a daemon thread. `fetchers` maps a kind ('keyword', 'trend',
+    'power_words') to (fetch, units): fetch(target) returns (value, err) like the API
+    helpers, `units` is the YouTube quota one call costs. Kinds without a fetcher (e.g.
+    no pooled key) are skipped. `quota_left()` is the pool's estimate of units left today.
+    """
+
+    def __init__(self, config, fetchers, results=WARM_RESULTS, quota_left=None):
+        self.config = config
+        self.fetchers = fetchers
+        self.results = results
+        self.quota_left = quota_left
+        self.last_cycle = None
+        self.next_cycle_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def plan(self):
+        """(kind, target) pairs one cycle warms"""
+        return [
+            (kind, target)
+            for kind, config_key in TARGET_KEYS.items() if kind in self.fetchers
+            for target in self.config[config_key]
+        ]
+
+    def run_cycle(self):
+        """Warm every planned target the budget allows; returns the cycle's counters"""
+        cycle = {'started_at': time.time(), 'warmed': 0, 'skipped': 0, 'failed': 0, 'units': 0, 'error': ''}
+        for kind, target in self.plan():
+            if self._stop.is_set():
+                break
+            fetch, units = self.fetchers[kind]
+            if units and (
+                cycle['units'] + units > self.config['quota_budget']
+                or (self.quota_left is not None and self.quota_left() - units < self.config['reserve'])
+            ):
+                cycle['skipped'] += 1
+                continue
+            cycle['units'] += units
+            try:
+                value, err = fetch(target)
+            except Exception as e:
+                value, err = None, f"Error: {e}"
+            if value is None:
+                cycle['failed'] += 1
+                cycle['error'] = f"{kind} '{target}': {err}"
+            else:
+                self.results.put(kind, target, value, self.config['ttl'])
+                cycle['warmed'] += 1
+            self._stop.wait(self.config['pause'])
+        cycle['finished_at'] = time.time()
+        self.last_cycle = cycle
+        return cycle
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_cycle()
+            if not self.config['interval']:
+                self.next_cycle_at = None
+                return
+            self.next_cycle_at = time.time() + self.config['interval']
+            self._stop.wait(self.config['interval'])
+
+    def start(self):
+        """Start the warm-up thread (once); False when there is nothing to warm"""
+        if self._thread is not None:
+            return True
+        if not self.plan():
+            return False
+        self.next_cycle_at = time.time()
+        self._thread = threading.Thread(target=self._loop, name="vidiq-warmup", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
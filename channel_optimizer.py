@@ -0,0 +1,219 @@
+"""
+Bulk metadata proposals for a whole channel: a new title, tags and description for
+every upload, written to a review sheet (original vs. proposed, score delta).
+
+    python channel_optimizer.py UC_x5XG1OV2P6uZZ5FSM9Ttw -o review.csv
+    python channel_optimizer.py UC_x5XG1OV2P6uZZ5FSM9Ttw --limit 5000 --keyword "lofi hip hop" --workers 8
+
+Uploads are fetched 50 per page (playlistItems + one videos call, 2 quota units per page).
+The competitor context - the channel's most used tags on its latest page plus, with
+--keyword, the titles and trending tags of that keyword's top videos - is computed once
+and shared by every video. Worker processes build the suggestion engine once each and
+rows stream to the output in upload order as chunks finish.
+"""
+import os
+import re
+import sys
+import time
+import zlib
+import argparse
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from seo import extract_keywords_from_title, generate_description, generate_tags, title_checks
+from suggestion_engine import SuggestionEngine
+from exporters import StreamingExporter, EXPORT_FORMATS
+from score_titles import load_power_words
+from youtube_api import KEY_POOL, get_channel, get_keyword_metrics, get_youtube_client, iter_upload_details
+
+DEFAULT_CHUNK_SIZE = 50
+CONTEXT_TITLES = 10
+CONTEXT_TAGS = 15
+DURATION_RE = re.compile(r'P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+# Set once per worker process by _init_worker
+_ENGINE = None
+_CONTEXT = None
+
+
+def video_length(iso_duration):
+    """'PT1H2M3S' -> '62:03' (total minutes, as generate_description reads them)"""
+    match = DURATION_RE.fullmatch(iso_duration or '')
+    if not match or not any(match.groups()):
+        return "10:00"
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return f"{days * 1440 + hours * 60 + minutes}:{seconds:02d}"
+
+
+def video_record(item):
+    """The fields of a videos#video item the optimizer needs (cheap to ship to workers)"""
+    snippet = item.get('snippet', {})
+    return {
+        'id': item.get('id', ''),
+        'title': snippet.get('title', ''),
+        'description': snippet.get('description', ''),
+        'tags': snippet.get('tags', []),
+        'published': snippet.get('publishedAt', '')[:10],
+        'length': video_length(item.get('contentDetails', {}).get('duration'))
+    }
+
+
+def build_context(records, keyword_data=None):
+    """
+    Competitor context shared by every video: {'titles': [...], 'tags': [...]}.
+    `keyword_data` is a get_keyword_metrics() result for the channel's topic.
+    """
+    titles, tags = [], []
+    if keyword_data:
+        titles = [t for t in keyword_data['top_videos']['Title'].tolist() if t][:CONTEXT_TITLES]
+        tags = list(keyword_data['trending_tags'])
+    own_tags = Counter(tag.lower() for record in records for tag in record['tags'])
+    for tag, _ in own_tags.most_common(CONTEXT_TAGS):
+        if tag not in tags:
+            tags.append(tag)
+    return {'titles': titles, 'tags': tags[:CONTEXT_TAGS]}
+
+
+def optimize_video(engine, record, context):
+    """One review-sheet row: the best title candidate, tags and description built on it"""
+    keywords = extract_keywords_from_title(record['title'], top_n=1)
+    keyword = keywords[0] if keywords else ""
+    original_score, _ = title_checks(record['title'], keyword, engine.matcher)
+
+    # Seeded by video ID so a re-run proposes the same title
+    best = engine.suggest(record['title'], keyword, context['titles'], top_k=1, seed=zlib.crc32(record['id'].encode()))
+    proposed = best[0]['title'] if best else record['title']
+    proposed_score = best[0]['score'] if best else original_score
+    proposed_tags = generate_tags(proposed, keyword, context['tags'])
+
+    return {
+        'Video ID': record['id'],
+        'Published': record['published'],
+        'Keyword': keyword,
+        'Original Title': record['title'],
+        'Proposed Title': proposed,
+        'Original Score': original_score,
+        'Proposed Score': proposed_score,
+        'Score Delta': proposed_score - original_score,
+        'Original Tags': record['tags'],
+        'Proposed Tags': proposed_tags,
+        'Original Description': record['description'],
+        'Proposed Description': generate_description(proposed, keyword, proposed_tags, record['length'])
+    }
+
+
+def _init_worker(power_words, context):
+    global _ENGINE, _CONTEXT
+    _ENGINE = SuggestionEngine(power_words)
+    _CONTEXT = context
+
+
+def _optimize_chunk(records):
+    """Runs in a worker: video records -> review rows"""
+    return [optimize_video(_ENGINE, record, _CONTEXT) for record in records]
+
+
+def optimize_records(records, context, power_words=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Review rows for an iterable of video records, in input order. With workers > 1
+    chunks are spread over processes, at most 2 per worker in flight so memory stays
+    flat however many uploads the channel has.
+    """
+    if workers <= 1:
+        engine = SuggestionEngine(power_words)
+        for record in records:
+            yield optimize_video(engine, record, context)
+        return
+
+    records = iter(records)
+    chunks = iter(lambda: [record for _, record in zip(range(chunk_size), records)], [])
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(power_words, context)) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(_optimize_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def optimize_channel(api_key, channel_id, output, limit=500, keyword="", power_words=None, workers=1,
+                     fmt="csv", on_progress=None):
+    """
+    Fetch up to `limit` uploads and stream their review rows to `output`.
+    Returns the number of rows written.
+    """
+    youtube = get_youtube_client(api_key)
+    channel = get_channel(youtube, channel_id)
+    if not channel:
+        raise ValueError(f"Channel not found: {channel_id}")
+    uploads = channel['contentDetails']['relatedPlaylists']['uploads']
+    total = min(limit, int(channel['statistics'].get('videoCount', 0)) or limit)
+
+    pages = iter_upload_details(youtube, uploads, limit)
+    first_page = [video_record(item) for item in next(pages, ([], None))[0]]
+    keyword_data = None
+    if keyword:
+        keyword_data, err = get_keyword_metrics(api_key, keyword)
+        if err:
+            print(f"⚠️ No competitor context for '{keyword}': {err}", file=sys.stderr)
+    context = build_context(first_page, keyword_data)
+
+    def records():
+        yield from first_page
+        for items, _ in pages:
+            yield from (video_record(item) for item in items)
+
+    done = 0
+    with StreamingExporter(output, fmt) as exporter:
+        for done, row in enumerate(optimize_records(records(), context, power_words, workers), 1):
+            exporter.write_row(row)
+            if on_progress:
+                on_progress(done, max(total, done))
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Propose titles, tags and descriptions for every upload of a channel")
+    parser.add_argument("channel_id", help="Channel ID (UC...)")
+    parser.add_argument("-o", "--output", default=None, help="CSV or Parquet review sheet (default: optimize_<channel>.csv)")
+    parser.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY"), help="YouTube API key (default: YOUTUBE_API_KEY)")
+    parser.add_argument("--limit", type=int, default=500, help="Most recent uploads to cover")
+    parser.add_argument("--keyword", default="", help="Topic keyword whose top videos are the competitor context (costs 101 units)")
+    parser.add_argument("--power-words", help="JSON array or newline-separated power words (default: offline list)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress output")
+    args = parser.parse_args(argv)
+
+    api_key = args.api_key or KEY_POOL.any_key()
+    if not api_key:
+        raise SystemExit("❌ API key required (--api-key, YOUTUBE_API_KEY or YOUTUBE_API_KEYS)")
+    if not args.channel_id.startswith("UC"):
+        raise SystemExit("❌ Invalid Channel ID (must start with UC)")
+    output = args.output or f"optimize_{args.channel_id}.csv"
+    fmt = "parquet" if output.endswith(EXPORT_FORMATS["parquet"]) else "csv"
+    workers = args.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    last_report = [start]
+
+    def progress(done, total):
+        now = time.perf_counter()
+        if not args.quiet and now - last_report[0] >= 2:
+            print(f"… {done:,}/{total:,} videos ({done / (now - start):,.0f} videos/sec)", file=sys.stderr)
+            last_report[0] = now
+
+    try:
+        written = optimize_channel(
+            api_key, args.channel_id, output, args.limit, args.keyword,
+            load_power_words(args.power_words), workers, fmt, progress
+        )
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    elapsed = time.perf_counter() - start
+    print(f"✅ {written:,} proposals in {elapsed:.1f}s ({workers} workers) -> {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Viewer phrases and questions from the comments of a keyword's top competitor videos.
+
+commentThreads are paged per video (up to 100 top-level comments per page, 1 quota unit
+each) by an async generator, a few videos at a time. Every page goes straight through the
+phrase tokenizer into a fixed-size heavy-hitter sketch and a bounded question heap, so
+memory stays flat however many comments a video has. Each video's digest is cached
+against its comment count: a video is only mined again once new comments arrive.
+"""
+import re
+import heapq
+import asyncio
+import threading
+from collections import Counter, OrderedDict
+
+import pandas as pd
+
+from phrase_miner import PhraseMiner
+from async_youtube import AsyncYouTubeClient, YouTubeHTTPError, run
+from youtube_api import keyword_error_message
+
+DEFAULT_VIDEOS = 5
+DEFAULT_MAX_COMMENTS = 500
+PAGE_SIZE = 100
+CONCURRENCY = 3             # videos paged at once
+VIDEO_CAPACITY = 500        # phrase sketch size per video
+DIGEST_PHRASES = 40         # phrases kept in a cached digest
+DIGEST_QUESTIONS = 10       # questions kept in a cached digest
+DIGEST_CACHE_SIZE = 512
+MAX_QUESTION_LEN = 160
+
+SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+QUESTION_WORDS = {
+    'how', 'what', 'why', 'where', 'when', 'which', 'who', 'can', 'could', 'does', 'do', 'is', 'are',
+    'will', 'should', 'anyone', 'any', 'apa', 'bagaimana', 'gimana', 'kenapa', 'mengapa', 'kapan',
+    'dimana', 'siapa', 'bisa', 'boleh', 'cara', 'gmn', 'knp'
+}
+
+
+def questions(text):
+    """Sentences of a comment that read as questions ("?" or a leading question word)"""
+    found = []
+    for sentence in SENTENCE_RE.findall(text):
+        sentence = sentence.strip()
+        words = sentence.lower().split(None, 1)
+        if len(sentence) < 12 or not words:
+            continue
+        if sentence.endswith('?') or words[0] in QUESTION_WORDS:
+            found.append(sentence[:MAX_QUESTION_LEN])
+    return found
+
+
+class CommentDigest:
+    """
+    Streaming summary of one video's comments: phrase counts (in how many comments a
+    phrase appears) and the most liked questions, both bounded in size.
+    """
+
+    def __init__(self, video_id, capacity=VIDEO_CAPACITY, max_questions=DIGEST_QUESTIONS):
+        self.video_id = video_id
+        self.miner = PhraseMiner(capacity)
+        self.max_questions = max_questions
+        self.comments = 0
+        self.question_count = 0
+        self.disabled = False
+        # (likes, order, text) min-heap of the most liked questions
+        self._questions = []
+
+    def add(self, text, likes=0):
+        self.comments += 1
+        self.miner.add(text)
+        for question in questions(text):
+            self.question_count += 1
+            entry = (likes, self.question_count, question)
+            if len(self._questions) < self.max_questions:
+                heapq.heappush(self._questions, entry)
+            elif entry[0] > self._questions[0][0]:
+                heapq.heapreplace(self._questions, entry)
+
+    def compact(self):
+        """The cacheable result: a few dozen phrases and questions instead of the sketch"""
+        return {
+            'video_id': self.video_id,
+            'comments': self.comments,
+            'questions_asked': self.question_count,
+            'disabled': self.disabled,
+            'phrases': self.miner.most_common(DIGEST_PHRASES),
+            'questions': [(text, likes) for likes, _, text in sorted(self._questions, reverse=True)]
+        }
+
+
+class DigestCache:
+    """Compact digests by video ID, valid while the video's comment count is unchanged"""
+
+    def __init__(self, max_entries=DIGEST_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, video_id, comment_count):
+        with self._lock:
+            entry = self._items.get(video_id)
+            if entry is not None and entry[0] == comment_count:
+                self._items.move_to_end(video_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, video_id, comment_count, digest):
+        with self._lock:
+            self._items[video_id] = (comment_count, digest)
+            self._items.move_to_end(video_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+COMMENT_DIGESTS = DigestCache()
+
+
+async def comment_pages(client, video_id, max_comments=DEFAULT_MAX_COMMENTS):
+    """Async generator of [(text, likes)] pages of a video's top-level comments, most relevant first"""
+    token = None
+    fetched = 0
+    while fetched < max_comments:
+        res = await client.list(
+            'commentThreads', 'comments', videoId=video_id, maxResults=min(PAGE_SIZE, max_comments - fetched),
+            order='relevance', textFormat='plainText', pageToken=token
+        )
+        page = []
+        for item in res.get('items', []):
+            comment = item.get('snippet', {}).get('topLevelComment', {}).get('snippet', {})
+            page.append((comment.get('textOriginal', ''), int(comment.get('likeCount', 0))))
+        if not page:
+            return
+        fetched += len(page)
+        yield page
+        token = res.get('nextPageToken')
+        if not token:
+            return
+
+
+async def mine_video(client, video_id, max_comments=DEFAULT_MAX_COMMENTS):
+    """Compact digest of one video, built page by page"""
+    digest = CommentDigest(video_id)
+    try:
+        async for page in comment_pages(client, video_id, max_comments):
+            for text, likes in page:
+                digest.add(text, likes)
+    except YouTubeHTTPError as e:
+        # Comments turned off after the statistics were fetched
+        if e.status != 403 or 'commentsDisabled' not in str(e):
+            raise
+        digest.disabled = True
+    return digest.compact()
+
+
+async def mine_videos(client, targets, max_comments=DEFAULT_MAX_COMMENTS, concurrency=CONCURRENCY):
+    """{video_id: digest or exception} for (video_id, comment_count) pairs, `concurrency` videos at a time"""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def mine(video_id, comment_count):
+        async with limit:
+            digest = await mine_video(client, video_id, max_comments)
+        COMMENT_DIGESTS.put(video_id, comment_count, digest)
+        return digest
+
+    results = await asyncio.gather(*(mine(video_id, count) for video_id, count in targets), return_exceptions=True)
+    return {video_id: result for (video_id, _), result in zip(targets, results)}
+
+
+def pick_videos(top_videos, n=DEFAULT_VIDEOS):
+    """(video_id, comment_count) of the `n` most viewed videos that have comments"""
+    if top_videos is None or top_videos.empty or 'video_id' not in top_videos:
+        return []
+    rows = top_videos[top_videos['Comments'].fillna(0) > 0].nlargest(n, 'Views')
+    return [(video_id, int(count)) for video_id, count in zip(rows['video_id'], rows['Comments'])]
+
+
+def merge_digests(digests, n_phrases=20, n_questions=15):
+    """
+    Insights over several videos: phrases ranked by how many videos use them, then by
+    comment count; questions by likes.
+    """
+    comment_counts = Counter()
+    video_counts = Counter()
+    asked = []
+    for digest in digests:
+        for phrase, count in digest['phrases']:
+            comment_counts[phrase] += count
+            video_counts[phrase] += 1
+        asked.extend((likes, text, digest['video_id']) for text, likes in digest['questions'])
+
+    ranked = sorted(comment_counts, key=lambda p: (video_counts[p], comment_counts[p]), reverse=True)
+    phrases = pd.DataFrame(
+        [{'Phrase': p, 'Videos': video_counts[p], 'Comments': comment_counts[p]} for p in ranked[:n_phrases]],
+        columns=['Phrase', 'Videos', 'Comments']
+    )
+    seen = set()
+    top_questions = []
+    for likes, text, video_id in sorted(asked, key=lambda q: q[0], reverse=True):
+        if text.lower() not in seen:
+            seen.add(text.lower())
+            top_questions.append({'Question': text, 'Likes': likes, 'video_id': video_id})
+    return {
+        'videos': len(digests),
+        'comments': sum(d['comments'] for d in digests),
+        'questions_asked': sum(d['questions_asked'] for d in digests),
+        'disabled': sum(1 for d in digests if d['disabled']),
+        'phrases': phrases,
+        'questions': pd.DataFrame(top_questions[:n_questions], columns=['Question', 'Likes', 'video_id'])
+    }
+
+
+def mine_comments(api_key, targets, max_comments=DEFAULT_MAX_COMMENTS):
+    """
+    Comment insights for (video_id, comment_count) pairs, e.g. pick_videos() of a keyword's
+    top videos. Returns (insights, err); insights['cached'] counts videos served from
+    COMMENT_DIGESTS. About 1 quota unit per 100 comments read.
+    """
+    if not api_key or len(api_key) < 30:
+        return None, "❌ Invalid API Key"
+    if not targets:
+        return None, "❌ No videos with comments to mine"
+
+    digests = {}
+    missing = []
+    for video_id, count in targets:
+        cached = COMMENT_DIGESTS.get(video_id, count)
+        if cached is not None:
+            digests[video_id] = cached
+        else:
+            missing.append((video_id, count))
+
+    errors = []
+    if missing:
+        try:
+            mined = run(mine_videos(AsyncYouTubeClient(api_key), missing, max_comments))
+        except Exception as e:
+            return None, keyword_error_message(e)
+        for video_id, result in mined.items():
+            if isinstance(result, Exception):
+                errors.append(result)
+            else:
+                digests[video_id] = result
+    if not digests:
+        return None, keyword_error_message(errors[0])
+
+    insights = merge_digests([digests[video_id] for video_id, _ in targets if video_id in digests])
+    insights['cached'] = len(targets) - len(missing)
+    insights['failed'] = len(errors)
+    return insights, None
@@ -0,0 +1,247 @@
+"""Local SQLite FTS5 index of every video the app has fetched."""
+import os
+import json
+import time
+import sqlite3
+import statistics
+import threading
+from collections import Counter
+
+DEFAULT_DB_PATH = os.environ.get("VIDIQ_CORPUS_DB", "vidiq_corpus.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '[]',
+    channel TEXT NOT NULL DEFAULT '',
+    channel_id TEXT NOT NULL DEFAULT '',
+    published_at TEXT NOT NULL DEFAULT '',
+    views INTEGER,
+    likes INTEGER,
+    comments INTEGER,
+    source TEXT NOT NULL DEFAULT '',
+    query TEXT NOT NULL DEFAULT '',
+    region TEXT NOT NULL DEFAULT '',
+    fetched_at REAL NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    title, description, tags, channel,
+    content='videos', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS videos_ai AFTER INSERT ON videos BEGIN
+    INSERT INTO videos_fts(rowid, title, description, tags, channel)
+    VALUES (new.rowid, new.title, new.description, new.tags, new.channel);
+END;
+
+CREATE TRIGGER IF NOT EXISTS videos_ad AFTER DELETE ON videos BEGIN
+    INSERT INTO videos_fts(videos_fts, rowid, title, description, tags, channel)
+    VALUES ('delete', old.rowid, old.title, old.description, old.tags, old.channel);
+END;
+
+CREATE TRIGGER IF NOT EXISTS videos_au AFTER UPDATE ON videos BEGIN
+    INSERT INTO videos_fts(videos_fts, rowid, title, description, tags, channel)
+    VALUES ('delete', old.rowid, old.title, old.description, old.tags, old.channel);
+    INSERT INTO videos_fts(rowid, title, description, tags, channel)
+    VALUES (new.rowid, new.title, new.description, new.tags, new.channel);
+END;
+"""
+
+# Stats and descriptions are only overwritten when the new fetch actually has them,
+# so a playlistItems() row (no statistics) never erases numbers from videos().list
+UPSERT_SQL = """
+INSERT INTO videos (video_id, title, description, tags, channel, channel_id, published_at,
+                    views, likes, comments, source, query, region, fetched_at)
+VALUES (:video_id, :title, :description, :tags, :channel, :channel_id, :published_at,
+        :views, :likes, :comments, :source, :query, :region, :fetched_at)
+ON CONFLICT(video_id) DO UPDATE SET
+    title = excluded.title,
+    description = CASE WHEN length(excluded.description) > length(videos.description)
+                       THEN excluded.description ELSE videos.description END,
+    tags = CASE WHEN excluded.tags != '[]' THEN excluded.tags ELSE videos.tags END,
+    channel = CASE WHEN excluded.channel != '' THEN excluded.channel ELSE videos.channel END,
+    channel_id = CASE WHEN excluded.channel_id != '' THEN excluded.channel_id ELSE videos.channel_id END,
+    published_at = CASE WHEN excluded.published_at != '' THEN excluded.published_at ELSE videos.published_at END,
+    views = COALESCE(excluded.views, videos.views),
+    likes = COALESCE(excluded.likes, videos.likes),
+    comments = COALESCE(excluded.comments, videos.comments),
+    source = excluded.source,
+    query = CASE WHEN excluded.query != '' THEN excluded.query ELSE videos.query END,
+    region = CASE WHEN excluded.region != '' THEN excluded.region ELSE videos.region END,
+    fetched_at = excluded.fetched_at
+"""
+
+# Column weights for bm25(): title, description, tags, channel
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def video_row(item, source="", query="", region=""):
+    """Normalize a videos#video / search#result / playlistItem resource into an index row"""
+    snippet = item.get('snippet', {})
+    stats = item.get('statistics', {})
+
+    item_id = item.get('id')
+    if isinstance(item_id, dict):
+        video_id = item_id.get('videoId')
+    elif item.get('kind') == 'youtube#playlistItem':
+        video_id = snippet.get('resourceId', {}).get('videoId')
+    else:
+        video_id = item_id
+
+    if not video_id:
+        return None
+
+    return {
+        'video_id': video_id,
+        'title': snippet.get('title', ''),
+        'description': snippet.get('description', ''),
+        'tags': json.dumps(snippet.get('tags', []), ensure_ascii=False),
+        'channel': snippet.get('channelTitle', ''),
+        'channel_id': snippet.get('channelId', ''),
+        'published_at': snippet.get('publishedAt', ''),
+        'views': _to_int(stats.get('viewCount')),
+        'likes': _to_int(stats.get('likeCount')),
+        'comments': _to_int(stats.get('commentCount')),
+        'source': source,
+        'query': query or '',
+        'region': region or '',
+        'fetched_at': time.time()
+    }
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query: every term must match, prefix on the last one"""
+    terms = [t.replace('"', '""') for t in text.split() if t.strip('"')]
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+class CorpusIndex:
+    """Thread-safe wrapper around the SQLite corpus (one connection per process)"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def add_items(self, items, source, query="", region=""):
+        """Upsert raw API items; returns number of rows written"""
+        rows = [video_row(item, source, query, region) for item in items or []]
+        rows = [r for r in rows if r]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(UPSERT_SQL, rows)
+        return len(rows)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def search(self, text, limit=50):
+        """BM25-ranked matches for a keyword query"""
+        match = build_match_query(text)
+        if not match:
+            return []
+
+        sql = f"""
+            SELECT v.video_id, v.title, v.channel, v.published_at, v.views, v.likes,
+                   v.comments, v.tags, v.source, v.query, v.region,
+                   bm25(videos_fts, {', '.join(str(w) for w in BM25_WEIGHTS)}) AS rank
+            FROM videos_fts
+            JOIN videos v ON v.rowid = videos_fts.rowid
+            WHERE videos_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._conn.execute(sql, (match, limit)).fetchall()
+        return [self._hit(row) for row in rows]
+
+    def aggregate(self, text, top_n=10):
+        """Aggregated metrics over every match (not just the top results)"""
+        match = build_match_query(text)
+        empty = {
+            'matches': 0, 'total_views': 0, 'median_views': 0, 'avg_views': 0,
+            'avg_engagement': 0, 'top_channels': [], 'top_tags': []
+        }
+        if not match:
+            return empty
+
+        sql = """
+            SELECT v.views, v.likes, v.comments, v.channel, v.tags
+            FROM videos_fts
+            JOIN videos v ON v.rowid = videos_fts.rowid
+            WHERE videos_fts MATCH ?
+        """
+        with self._lock:
+            rows = self._conn.execute(sql, (match,)).fetchall()
+        if not rows:
+            return empty
+
+        views = [r['views'] for r in rows if r['views']]
+        # Videos with hidden likes have unknown engagement, not zero
+        engagement = [
+            (r['likes'] + (r['comments'] or 0)) / r['views'] * 100
+            for r in rows if r['views'] and r['likes'] is not None
+        ]
+        channels = Counter(r['channel'] for r in rows if r['channel'])
+        tags = Counter()
+        for r in rows:
+            tags.update(t.lower() for t in json.loads(r['tags'] or '[]'))
+
+        return {
+            'matches': len(rows),
+            'total_views': sum(views),
+            'median_views': statistics.median(views) if views else 0,
+            'avg_views': statistics.mean(views) if views else 0,
+            'avg_engagement': round(statistics.mean(engagement), 2) if engagement else 0,
+            'top_channels': channels.most_common(top_n),
+            'top_tags': tags.most_common(top_n)
+        }
+
+    def iter_stats(self, batch_size=5000):
+        """(query, region, title, tags, views, likes, comments) of every video with a view count, in batches"""
+        sql = """
+            SELECT rowid, query, region, title, tags, views, likes, comments FROM videos
+            WHERE views IS NOT NULL AND rowid > ? ORDER BY rowid LIMIT ?
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, (last, batch_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1]['rowid']
+            for row in rows:
+                yield tuple(row)[1:]
+
+    def _hit(self, row):
+        hit = dict(row)
+        hit['tags'] = json.loads(hit['tags'] or '[]')
+        # bm25() is "lower is better"; flip it so the UI can show a positive relevance
+        hit['rank'] = round(-hit['rank'], 3)
+        return hit
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,92 @@
+"""
+Vectorized engagement ratios over video statistics.
+
+Counts the API leaves out are NaN, never 0: `likeCount` is missing when the owner hides
+likes, `commentCount` when comments are disabled, `subscriberCount` when hidden. A NaN
+ratio means "unknown" and is skipped by the summaries, while a real 0 (views but no
+likes or comments) still pulls averages down.
+"""
+import numpy as np
+import pandas as pd
+
+STAT_FIELDS = {'viewCount': 'views', 'likeCount': 'likes', 'commentCount': 'comments'}
+RATIO_COLUMNS = ('engagement', 'like_rate', 'comment_rate', 'likes_per_comment', 'views_per_subscriber')
+
+
+def stats_frame(items, subscribers=None):
+    """
+    views / likes / comments (float, NaN when missing) of videos#video items, indexed by
+    video id. `subscribers` is a channel's count, or a Series of counts aligned with items.
+    """
+    frame = pd.DataFrame.from_records(
+        [item.get('statistics', {}) for item in items],
+        index=pd.Index([item.get('id') for item in items], name='video_id'),
+        columns=list(STAT_FIELDS)
+    )
+    frame = frame.apply(pd.to_numeric, errors='coerce').astype('float64').rename(columns=STAT_FIELDS)
+    if subscribers is not None:
+        frame['subscribers'] = pd.to_numeric(subscribers, errors='coerce') if not np.isscalar(subscribers) else float(subscribers)
+    return frame
+
+
+def add_ratios(frame):
+    """
+    Adds the ratio columns (percentages are 0-100):
+
+    engagement            (likes + comments) / views; NaN if likes are hidden, disabled comments count as 0
+    like_rate             likes / views
+    comment_rate          comments / views; NaN if comments are disabled
+    likes_per_comment     likes / comments; NaN without comments
+    views_per_subscriber  views / subscribers (only with a subscribers column)
+    """
+    views = frame['views'].where(frame['views'] > 0)
+    likes = frame['likes']
+    comments = frame['comments']
+    frame['engagement'] = ((likes + comments.fillna(0)) / views * 100).round(2)
+    frame['like_rate'] = (likes / views * 100).round(2)
+    frame['comment_rate'] = (comments / views * 100).round(3)
+    frame['likes_per_comment'] = (likes / comments.where(comments > 0)).round(1)
+    if 'subscribers' in frame:
+        frame['views_per_subscriber'] = (frame['views'] / frame['subscribers'].where(frame['subscribers'] > 0)).round(3)
+    return frame
+
+
+def engagement_frame(items, subscribers=None):
+    """stats_frame() with every ratio column"""
+    return add_ratios(stats_frame(items, subscribers))
+
+
+def summarize(frame):
+    """Means/medians over the videos where each figure is known, plus how many hide their likes"""
+    known = frame['engagement'].notna()
+    summary = {
+        'videos': len(frame),
+        'avg_engagement': float(frame['engagement'].mean()) if known.any() else float('nan'),
+        'median_engagement': float(frame['engagement'].median()) if known.any() else float('nan'),
+        'hidden_likes': int(frame['likes'].isna().sum()),
+        'comments_disabled': int(frame['comments'].isna().sum()),
+    }
+    if 'views_per_subscriber' in frame:
+        summary['median_views_per_subscriber'] = float(frame['views_per_subscriber'].median())
+    return summary
+
+
+def engagement_rate(stats):
+    """Scalar engagement of one statistics dict, with the same NaN rules (for streaming rows)"""
+    def count(field):
+        try:
+            return float(stats[field])
+        except (KeyError, TypeError, ValueError):
+            return float('nan')
+
+    views = count('viewCount')
+    likes = count('likeCount')
+    if not views > 0 or np.isnan(likes):
+        return float('nan')
+    comments = count('commentCount')
+    return round((likes + (0 if np.isnan(comments) else comments)) / views * 100, 2)
+
+
+def format_rate(value, digits=2, suffix="%"):
+    """'3.21%' or '–' for an unknown (NaN / None) figure"""
+    return "–" if value is None or pd.isna(value) else f"{value:.{digits}f}{suffix}"
@@ -0,0 +1,172 @@
+"""Incremental CSV / Parquet writers for keyword, audit and trend results."""
+import os
+import csv
+import re
+import datetime
+
+EXPORT_FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+DEFAULT_BATCH_SIZE = 500
+
+
+def _flatten(value):
+    """Lists (tags, check codes) become one readable cell, unknown (NaN) numbers an empty one"""
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(str(v) for v in value)
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _parquet_type(arrow_type):
+    """
+    Column type pinned from the first batch. All-null columns become strings and integers
+    become floats, so later batches with text or fractions in them still fit.
+    """
+    import pyarrow as pa
+    if pa.types.is_null(arrow_type):
+        return pa.string()
+    if pa.types.is_integer(arrow_type):
+        return pa.float64()
+    return arrow_type
+
+
+def _parquet_column(values, arrow_type):
+    """
+    `values` as an array of the pinned type. Values that don't convert become text in
+    string columns and null (unknown) in numeric ones, instead of failing mid-export.
+    """
+    import pyarrow as pa
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError):
+        pass
+
+    def coerce(value):
+        if value is None:
+            return None
+        if pa.types.is_string(arrow_type):
+            return str(value)
+        try:
+            return pa.scalar(value).cast(arrow_type).as_py()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError, OverflowError):
+            return None
+
+    return pa.array([coerce(value) for value in values], type=arrow_type)
+
+
+def export_filename(kind, label="", fmt="csv"):
+    """e.g. keyword_lofi-hip-hop_20240101-101500.csv"""
+    slug = re.sub(r'[^a-z0-9]+', '-', label.lower()).strip('-')[:40]
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    parts = [kind, slug, stamp] if slug else [kind, stamp]
+    return "_".join(parts) + EXPORT_FORMATS[fmt]
+
+
+class StreamingExporter:
+    """
+    Buffers at most `batch_size` rows, then appends them to disk.
+    CSV batches are appended to one file, Parquet batches become row groups,
+    so a run of any size only ever holds one batch in memory.
+    """
+
+    def __init__(self, path, fmt="csv", columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.columns = list(columns) if columns else None
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer = []
+        self._file = None
+        self._csv = None
+        self._parquet = None
+        self._schema = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write_row(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def write_frame(self, df):
+        """Stream a DataFrame in batch-sized slices instead of one big to_dict()"""
+        for start in range(0, len(df), self.batch_size):
+            self.write_rows(df.iloc[start:start + self.batch_size].to_dict('records'))
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.columns is None:
+            self.columns = list(self._buffer[0].keys())
+        rows = [{col: _flatten(row.get(col)) for col in self.columns} for row in self._buffer]
+
+        if self.fmt == "csv":
+            self._write_csv(rows)
+        else:
+            self._write_parquet(rows)
+
+        self.rows_written += len(rows)
+        self._buffer = []
+
+    def _write_csv(self, rows):
+        if self._csv is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._csv = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+            self._csv.writeheader()
+        self._csv.writerows(rows)
+        self._file.flush()
+
+    def _write_parquet(self, rows):
+        # pyarrow is imported dynamically; install with: pip install pyarrow
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {col: [row[col] for row in rows] for col in self.columns}
+        if self._parquet is None:
+            table = pa.table(columns)
+            self._schema = pa.schema([pa.field(f.name, _parquet_type(f.type)) for f in table.schema])
+            self._parquet = pq.ParquetWriter(self.path, self._schema)
+        # Every batch is converted to the file's schema; a batch's own inferred types may differ
+        table = pa.Table.from_arrays(
+            [_parquet_column(columns[field.name], field.type) for field in self._schema],
+            schema=self._schema
+        )
+        self._parquet.write_table(table)
+
+    def _write_empty(self):
+        """Zero rows: a header-only CSV / a Parquet file with the known columns as strings"""
+        if self.fmt == "csv":
+            with open(self.path, "w", newline="", encoding="utf-8") as f:
+                if self.columns:
+                    csv.writer(f).writerow(self.columns)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.table({col: pa.array([], pa.string()) for col in self.columns or []}), self.path)
+
+    def close(self):
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        # An export with zero rows still gets a readable file
+        if self.rows_written == 0 and not os.path.exists(self.path):
+            self._write_empty()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
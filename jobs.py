@@ -0,0 +1,371 @@
+"""Background job runner for long audits, bulk metadata proposals, bulk keyword runs and trend scans."""
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from seo import analyze_title, extract_keywords_from_title
+from engagement import engagement_frame, format_rate
+from channel_optimizer import build_context, optimize_records, video_record
+from youtube_api import (
+    get_youtube_client, get_keyword_metrics, get_channel, iter_upload_pages, iter_upload_details, iter_trend_pages,
+    KEY_ERRORS
+)
+
+DEFAULT_JOBS_DB = os.environ.get("VIDIQ_JOBS_DB", "vidiq_jobs.db")
+
+# queued -> running -> done | failed | cancelled
+# Anything still queued/running when the process starts was cut off by a crash or
+# redeploy and becomes "interrupted" until someone resumes it with an API key.
+ACTIVE_STATUSES = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    checkpoint TEXT NOT NULL DEFAULT '{}',
+    error TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class JobError(Exception):
+    """Expected job failure with a user-facing message"""
+
+
+class JobStore:
+    """Persisted job table; result rows are appended page by page"""
+
+    def __init__(self, path=DEFAULT_JOBS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def create(self, kind, label, params):
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO jobs (kind, label, params, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (kind, label, json.dumps(params), now, now)
+            )
+        return cur.lastrowid
+
+    def set_status(self, job_id, status, error=""):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+
+    def commit_page(self, job_id, rows, checkpoint, progress, total):
+        """Append result rows and move the checkpoint in one transaction"""
+        with self._lock, self._conn:
+            start = self._conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM job_rows WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO job_rows (job_id, seq, data) VALUES (?, ?, ?)",
+                [(job_id, start + i, json.dumps(row, ensure_ascii=False)) for i, row in enumerate(rows)]
+            )
+            self._conn.execute(
+                "UPDATE jobs SET checkpoint = ?, progress = ?, total = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(checkpoint), progress, total, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def list(self, limit=20):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def iter_rows(self, job_id, batch_size=500):
+        """Stream result rows without loading the whole job into memory"""
+        seq = -1
+        while True:
+            with self._lock:
+                batch = self._conn.execute(
+                    "SELECT seq, data FROM job_rows WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                    (job_id, seq, batch_size)
+                ).fetchall()
+            if not batch:
+                return
+            for row in batch:
+                yield json.loads(row['data'])
+            seq = batch[-1]['seq']
+
+    def mark_interrupted(self):
+        """Called once at startup: jobs from a previous process can no longer be running"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET status = 'interrupted', updated_at = ? WHERE status IN {ACTIVE_STATUSES}",
+                (time.time(),)
+            )
+
+    def _job(self, row):
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['checkpoint'] = json.loads(job['checkpoint'])
+        return job
+
+
+class JobContext:
+    """What a running task sees: its key, checkpointing and cancellation"""
+
+    def __init__(self, runner, job_id, api_key):
+        self.runner = runner
+        self.job_id = job_id
+        self.api_key = api_key
+
+    @property
+    def cancelled(self):
+        return self.job_id in self.runner._cancel_requests
+
+    def commit_page(self, rows, checkpoint, progress, total):
+        self.runner.store.commit_page(self.job_id, rows, checkpoint, progress, total)
+
+    def index(self, items, source, query="", region=""):
+        """Forward raw API items to the corpus hook; never fails the job"""
+        if self.runner.on_items:
+            try:
+                self.runner.on_items(items, source, query, region)
+            except Exception:
+                pass
+
+
+class JobRunner:
+    """
+    Runs registered tasks on worker threads, outside Streamlit's script thread,
+    so reruns and widget interactions never abort them.
+    """
+
+    def __init__(self, store, max_workers=2, on_items=None):
+        self.store = store
+        self.on_items = on_items
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vidiq-job")
+        self._cancel_requests = set()
+        self.store.mark_interrupted()
+
+    def submit(self, kind, label, params, api_key):
+        if kind not in TASKS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = self.store.create(kind, label, params)
+        self._executor.submit(self._run, job_id, api_key)
+        return job_id
+
+    def resume(self, job_id, api_key):
+        """Continue an interrupted/failed job from its last committed page"""
+        job = self.store.get(job_id)
+        if not job or job['status'] in ACTIVE_STATUSES or job['status'] == 'done':
+            return False
+        self._cancel_requests.discard(job_id)
+        self.store.set_status(job_id, 'queued')
+        self._executor.submit(self._run, job_id, api_key)
+        return True
+
+    def cancel(self, job_id):
+        self._cancel_requests.add(job_id)
+
+    def has_active(self):
+        return any(job['status'] in ACTIVE_STATUSES for job in self.store.list())
+
+    def _run(self, job_id, api_key):
+        job = self.store.get(job_id)
+        ctx = JobContext(self, job_id, api_key)
+        if ctx.cancelled:
+            self.store.set_status(job_id, 'cancelled')
+            self._cancel_requests.discard(job_id)
+            return
+        self.store.set_status(job_id, 'running')
+        try:
+            TASKS[job['kind']](job['params'], dict(job['checkpoint']), ctx)
+        except JobError as e:
+            self.store.set_status(job_id, 'failed', str(e))
+        except Exception as e:
+            self.store.set_status(job_id, 'failed', f"{type(e).__name__}: {e}")
+        else:
+            self.store.set_status(job_id, 'cancelled' if ctx.cancelled else 'done')
+        finally:
+            self._cancel_requests.discard(job_id)
+
+
+# --- TASKS ---
+# Each task gets (params, checkpoint, ctx). The checkpoint is whatever the task last
+# committed, so a resumed task picks up at the next page instead of starting over.
+
+def channel_audit_task(params, state, ctx):
+    """Score every upload of a channel, 50 videos per page"""
+    youtube = get_youtube_client(ctx.api_key)
+    limit = params['limit']
+    power_words = params.get('power_words')
+
+    if 'uploads' not in state:
+        channel = get_channel(youtube, params['channel_id'])
+        if not channel:
+            raise JobError("Channel not found")
+        video_count = int(channel['statistics'].get('videoCount', 0))
+        state = {
+            'uploads': channel['contentDetails']['relatedPlaylists']['uploads'],
+            'page_token': None,
+            'done': 0,
+            'total': min(limit, video_count) if video_count else limit
+        }
+        ctx.commit_page([], state, 0, state['total'])
+
+    if state['done'] and not state['page_token']:
+        return
+
+    remaining = limit - state['done']
+    pages = iter_upload_pages(youtube, state['uploads'], remaining, page_token=state['page_token'])
+    for items, next_token in pages:
+        ctx.index(items, 'audit')
+        rows = []
+        for item in items:
+            vid_title = item['snippet']['title']
+            vid_keywords = extract_keywords_from_title(vid_title, top_n=1)
+            vid_keyword = vid_keywords[0] if vid_keywords else ""
+            vid_score, vid_checks = analyze_title(vid_title, vid_keyword, power_words)
+            rows.append({
+                'Rank': state['done'] + len(rows) + 1,
+                'Title': vid_title,
+                'Date': item['snippet'].get('publishedAt', '')[:10],
+                'Keyword': vid_keyword,
+                'Score': vid_score,
+                'Checks': [message for _, message in vid_checks]
+            })
+        state['done'] += len(rows)
+        state['page_token'] = next_token
+        state['total'] = max(state['total'], state['done'])
+        ctx.commit_page(rows, state, state['done'], state['total'])
+        if ctx.cancelled:
+            return
+
+
+def channel_optimize_task(params, state, ctx):
+    """Proposed title, tags and description for every upload, 50 videos per page"""
+    youtube = get_youtube_client(ctx.api_key)
+    limit = params['limit']
+
+    if 'uploads' not in state:
+        channel = get_channel(youtube, params['channel_id'])
+        if not channel:
+            raise JobError("Channel not found")
+        video_count = int(channel['statistics'].get('videoCount', 0))
+        state = {
+            'uploads': channel['contentDetails']['relatedPlaylists']['uploads'],
+            'page_token': None,
+            'done': 0,
+            'total': min(limit, video_count) if video_count else limit,
+            'context': None
+        }
+        ctx.commit_page([], state, 0, state['total'])
+
+    if state['done'] and not state['page_token']:
+        return
+
+    remaining = limit - state['done']
+    pages = iter_upload_details(youtube, state['uploads'], remaining, page_token=state['page_token'])
+    for items, next_token in pages:
+        records = [video_record(item) for item in items]
+        if state['context'] is None:
+            # Built once from the latest uploads (+ the topic keyword) and kept in the checkpoint
+            keyword_data = None
+            if params.get('keyword'):
+                keyword_data, _ = get_keyword_metrics(ctx.api_key, params['keyword'], on_items=ctx.index)
+            state['context'] = build_context(records, keyword_data)
+        rows = list(optimize_records(records, state['context'], params.get('power_words')))
+        state['done'] += len(items)
+        state['page_token'] = next_token
+        state['total'] = max(state['total'], state['done'])
+        ctx.commit_page(rows, state, state['done'], state['total'])
+        if ctx.cancelled:
+            return
+
+
+def keyword_batch_task(params, state, ctx):
+    """Keyword metrics for a list of keywords, one keyword per checkpoint"""
+    keywords = params['keywords']
+    done = state.get('done', 0)
+    for keyword in keywords[done:]:
+        data, err = get_keyword_metrics(ctx.api_key, keyword, on_items=ctx.index)
+        if err in KEY_ERRORS:
+            # Stop without consuming the keyword so a resume retries it
+            raise JobError(err)
+        row = {'Keyword': keyword, 'Error': err or ''}
+        if data:
+            row.update({
+                'Opportunity': data['score'],
+                'Competition': data['difficulty'],
+                'Median Views': int(data['median_views']),
+                'Avg Views': int(data['avg_views']),
+                'Avg Engagement': format_rate(data['avg_engagement']),
+                'Best Upload Time': data['best_upload_time'],
+                'Trending Tags': data['trending_tags'][:10]
+            })
+        done += 1
+        ctx.commit_page([row], {'done': done}, done, len(keywords))
+        if ctx.cancelled:
+            return
+
+
+def trend_scan_task(params, state, ctx):
+    """Deep multi-page trend scan; every page of videos is one checkpoint"""
+    youtube = get_youtube_client(ctx.api_key)
+    pages_total = params['pages']
+    pages_done = state.get('pages_done', 0)
+    if pages_done and not state.get('page_token'):
+        return
+
+    pages = iter_trend_pages(
+        youtube, params['niche'], params['days'], pages_total - pages_done,
+        page_token=state.get('page_token')
+    )
+    for items, next_token in pages:
+        ctx.index(items, 'trend', params['niche'], 'ID')
+        ratios = engagement_frame(items)
+        rows = []
+        for item, views, engagement in zip(items, ratios['views'].fillna(0).astype('int64').tolist(), ratios['engagement'].tolist()):
+            snippet = item['snippet']
+            rows.append({
+                'title': snippet['title'],
+                'channel': snippet.get('channelTitle', ''),
+                'views': views,
+                'engagement': engagement,
+                'published': snippet.get('publishedAt', '')[:10],
+                'tags': snippet.get('tags', [])
+            })
+        pages_done += 1
+        ctx.commit_page(rows, {'pages_done': pages_done, 'page_token': next_token}, pages_done, pages_total)
+        if ctx.cancelled:
+            return
+
+
+TASKS = {
+    'channel_audit': channel_audit_task,
+    'channel_optimize': channel_optimize_task,
+    'keyword_batch': keyword_batch_task,
+    'trend_scan': trend_scan_task,
+}
@@ -0,0 +1,186 @@
+"""Pool of YouTube API keys: quota-aware routing, quarantine on quota / invalid-key errors, usage per key."""
+import os
+import time
+import datetime
+import threading
+from urllib.parse import urlsplit
+
+from resilience import status_of
+
+DAILY_QUOTA = int(os.environ.get('VIDIQ_KEY_QUOTA', 10000))
+SEARCH_COST = 100
+DEFAULT_COST = 1
+# A key that was rejected as invalid is tried again after this long (e.g. the API got enabled)
+INVALID_RETRY_AFTER = 3600
+
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+INVALID_REASONS = ('keyInvalid', 'API key not valid', 'API_KEY_INVALID', 'keyExpired', 'accessNotConfigured')
+
+
+class KeyPoolExhaustedError(Exception):
+    """Every pooled key is quarantined (out of quota or rejected)"""
+
+
+def quota_cost(resource):
+    """Units one call costs: search.list is 100, the list() calls this app makes are 1"""
+    return SEARCH_COST if resource.rstrip('/').rsplit('/', 1)[-1] == 'search' else DEFAULT_COST
+
+
+def uri_cost(uri):
+    return quota_cost(urlsplit(uri).path)
+
+
+def key_error_kind(exc):
+    """'quota' or 'invalid' when an API error is about the key itself, else None"""
+    status = status_of(exc)
+    text = str(exc)
+    if status == 403 and any(reason in text for reason in QUOTA_REASONS):
+        return 'quota'
+    if status in (400, 403) and any(reason in text for reason in INVALID_REASONS):
+        return 'invalid'
+    return None
+
+
+def next_quota_reset(now=None):
+    """Epoch seconds of the next midnight Pacific Time, when YouTube daily quotas reset"""
+    try:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo('America/Los_Angeles')
+    except Exception:
+        tz = datetime.timezone(datetime.timedelta(hours=-8))
+    today = datetime.datetime.fromtimestamp(now if now is not None else time.time(), tz).date()
+    return datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time(), tz).timestamp()
+
+
+def mask_key(key):
+    return f"{key[:6]}…{key[-4:]}" if len(key) > 12 else "…"
+
+
+def parse_keys(value):
+    """Keys from a list or a comma / whitespace separated string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace(',', ' ').split()
+    return [str(key).strip() for key in value if str(key).strip()]
+
+
+class KeyPool:
+    """
+    Process-wide set of interchangeable API keys. A request made with any pooled key
+    is sent with the pooled key that has the most estimated budget left today; keys
+    that hit their quota sit out until the daily reset, rejected keys for an hour.
+    Requests with keys outside the pool (e.g. a user's own) pass through untouched.
+    Usage is an estimate from call costs; it restarts at zero with the process.
+    """
+
+    def __init__(self, keys=(), daily_quota=DAILY_QUOTA):
+        self.daily_quota = daily_quota
+        self._keys = {}
+        self._lock = threading.Lock()
+        self.add(keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def add(self, keys):
+        """Add keys (duplicates ignored); returns how many were new"""
+        added = 0
+        with self._lock:
+            for key in parse_keys(keys):
+                if key not in self._keys:
+                    self._keys[key] = {
+                        'key': key, 'used': 0, 'requests': 0, 'errors': 0,
+                        'resets_at': next_quota_reset(), 'blocked_until': 0.0, 'reason': ''
+                    }
+                    added += 1
+        return added
+
+    def any_key(self):
+        """A pooled key to hand to callers that only need "a key" (routing picks the real one)"""
+        return next(iter(self._keys), None)
+
+    def _roll_over(self, now):
+        for state in self._keys.values():
+            if now >= state['resets_at']:
+                state['used'] = 0
+                state['resets_at'] = next_quota_reset(now)
+                if state['reason'] == 'quota':
+                    state['blocked_until'] = 0.0
+                    state['reason'] = ''
+
+    def route(self, key, cost=DEFAULT_COST):
+        """Key to send a `cost`-unit request with, charging it; unpooled keys are returned as is"""
+        if key not in self._keys:
+            return key
+        now = time.time()
+        with self._lock:
+            self._roll_over(now)
+            available = [s for s in self._keys.values() if s['blocked_until'] <= now]
+            if not available:
+                reset = min(s['blocked_until'] for s in self._keys.values())
+                raise KeyPoolExhaustedError(
+                    f"All {len(self._keys)} pooled API keys are out of quota or rejected "
+                    f"(next one back at {time.strftime('%H:%M', time.localtime(reset))})"
+                )
+            best = max(available, key=lambda s: self.daily_quota - s['used'])
+            best['used'] += cost
+            best['requests'] += 1
+            return best['key']
+
+    def report_error(self, key, exc):
+        """
+        Quarantine `key` if `exc` says it is out of quota or invalid. True when the
+        request should be re-sent with another pooled key.
+        """
+        kind = key_error_kind(exc)
+        if kind is None:
+            return False
+        now = time.time()
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                return False
+            state['errors'] += 1
+            state['reason'] = kind
+            if kind == 'quota':
+                state['used'] = max(state['used'], self.daily_quota)
+                state['blocked_until'] = state['resets_at']
+            else:
+                state['blocked_until'] = now + INVALID_RETRY_AFTER
+            return any(s['blocked_until'] <= now for s in self._keys.values())
+
+    def remaining(self):
+        """Estimated units left today over keys that are not quarantined"""
+        now = time.time()
+        with self._lock:
+            self._roll_over(now)
+            return sum(
+                max(0, self.daily_quota - s['used'])
+                for s in self._keys.values() if s['blocked_until'] <= now
+            )
+
+    def rows(self):
+        """Usage per key (masked) for the UI"""
+        now = time.time()
+        with self._lock:
+            self._roll_over(now)
+            rows = []
+            for state in self._keys.values():
+                if state['blocked_until'] > now:
+                    until = time.strftime('%H:%M', time.localtime(state['blocked_until']))
+                    status = f"⛔ quota (until {until})" if state['reason'] == 'quota' else f"❌ rejected (retry {until})"
+                else:
+                    status = "🟢 active"
+                rows.append({
+                    'Key': mask_key(state['key']),
+                    'Status': status,
+                    'Units Used': state['used'],
+                    'Units Left': max(0, self.daily_quota - state['used']),
+                    'Requests': state['requests'],
+                    'Key Errors': state['errors']
+                })
+            return rows
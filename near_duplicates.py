@@ -0,0 +1,123 @@
+"""Near-duplicate / templated title detection with MinHash + locality-sensitive hashing."""
+import re
+import zlib
+import numpy as np
+from collections import defaultdict
+
+# Largest prime below 2**32: with 32-bit hashes and coefficients, a*h + b fits in uint64
+MERSENNE_PRIME = np.uint64(4294967291)
+SHINGLE_SIZE = 5
+
+
+def normalize_title(title):
+    """Lowercase, digits collapsed (episode numbers/years), emoji & punctuation dropped"""
+    text = re.sub(r'\d+', '0', title.lower())
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def shingles(title, size=SHINGLE_SIZE):
+    """Character n-grams of the normalized title, as 32-bit hashes"""
+    text = normalize_title(title)
+    if len(text) <= size:
+        grams = {text} if text else set()
+    else:
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return np.array(sorted(zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64)
+
+
+class NearDuplicateIndex:
+    """
+    Add titles, then ask for clusters. With 16 bands × 4 rows the LSH collision
+    curve crosses 50% around Jaccard 0.5; colliding pairs are then checked against
+    `threshold` on the MinHash estimate, so cost grows with the number of titles
+    and collisions rather than with every pair.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.6, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._keys = []
+        self._titles = []
+        self._signatures = []
+        self._buckets = defaultdict(list)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def signature(self, title):
+        hashes = shingles(title)
+        if not len(hashes):
+            return None
+        # (a*h + b) mod p for every permutation × shingle, min over shingles
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+    def add(self, key, title):
+        sig = self.signature(title)
+        if sig is None:
+            return
+        idx = len(self._keys)
+        self._keys.append(key)
+        self._titles.append(title)
+        self._signatures.append(sig)
+        for band in range(self.bands):
+            chunk = sig[band * self.rows:(band + 1) * self.rows]
+            self._buckets[(band, chunk.tobytes())].append(idx)
+
+    def similarity(self, i, j):
+        """MinHash estimate of the Jaccard similarity between two added titles"""
+        return float(np.mean(self._signatures[i] == self._signatures[j]))
+
+    def clusters(self, min_size=2):
+        """Groups of near-duplicate titles as lists of (key, title), largest first"""
+        parent = list(range(len(self._keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for members in self._buckets.values():
+            if len(members) < 2:
+                continue
+            # Each member is compared with one representative per cluster already seen in
+            # the bucket; a member matching none of them starts a cluster of its own. A bucket
+            # holding a single template stays linear, and a bucket shared by two unrelated
+            # templates no longer drops the second one.
+            representatives = []
+            for member in members:
+                matched = False
+                for rep in representatives:
+                    if find(rep) == find(member):
+                        matched = True
+                    elif self.similarity(rep, member) >= self.threshold:
+                        parent[find(member)] = find(rep)
+                        matched = True
+                if not matched:
+                    representatives.append(member)
+
+        groups = defaultdict(list)
+        for i in range(len(self._keys)):
+            groups[find(i)].append(i)
+        result = [
+            [(self._keys[i], self._titles[i]) for i in members]
+            for members in groups.values() if len(members) >= min_size
+        ]
+        result.sort(key=len, reverse=True)
+        return result
+
+
+def find_near_duplicates(titles, threshold=0.6):
+    """Convenience wrapper: clusters of (index, title) for a list of titles"""
+    index = NearDuplicateIndex(threshold=threshold)
+    for i, title in enumerate(titles):
+        index.add(i, title)
+    return index.clusters()
@@ -0,0 +1,144 @@
+"""Bounded-memory phrase and tag counting for trend scans (Space-Saving heavy hitters)."""
+import re
+import heapq
+
+from seo import STOP_WORDS
+
+WORD_RE = re.compile(r"[^\W\d_][\w']*")
+# Phrases don't run across title separators ("lofi beats | study music")
+SEGMENT_RE = re.compile(r"[|:;,.!?()\[\]{}/\\•·#\"]+|\s[-–—]+\s")
+DEFAULT_CAPACITY = 2000
+MAX_NGRAM = 3
+MIN_UNIGRAM_LEN = 4
+# A shorter phrase is hidden when a longer one containing it covers this share of its count
+SUBSUME_RATIO = 0.8
+
+
+class SpaceSaving:
+    """
+    Top-k counter in O(capacity) memory (Metwally et al.). Once full, a new item
+    replaces the current minimum and inherits its count, so every reported count
+    over-estimates by at most `error(item)`; any item seen more than
+    total / capacity times is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}
+        self._errors = {}
+        # (count, item) entries; stale ones are skipped when popped
+        self._heap = []
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, item):
+        return item in self._counts
+
+    def add(self, item, weight=1):
+        self.total += weight
+        counts = self._counts
+        if item in counts:
+            counts[item] += weight
+        elif len(counts) < self.capacity:
+            counts[item] = weight
+            self._errors[item] = 0
+        else:
+            floor, victim = self._pop_min()
+            del counts[victim]
+            del self._errors[victim]
+            counts[item] = floor + weight
+            self._errors[item] = floor
+        heapq.heappush(self._heap, (counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self._counts.get(item) == count:
+                return count, item
+
+    def count(self, item):
+        return self._counts.get(item, 0)
+
+    def error(self, item):
+        return self._errors.get(item, 0)
+
+    def most_common(self, n=None, guaranteed=False):
+        """
+        [(item, count)] highest first, like Counter.most_common. With `guaranteed`,
+        counts are lower bounds (count - error), which keeps items that only
+        inherited an evicted item's count from crowding the top of the list.
+        """
+        if guaranteed:
+            counts = ((item, count - self._errors[item]) for item, count in self._counts.items())
+        else:
+            counts = self._counts.items()
+        if n is None:
+            return sorted(counts, key=lambda kv: kv[1], reverse=True)
+        return heapq.nlargest(n, counts, key=lambda kv: kv[1])
+
+
+def phrases(title, max_n=MAX_NGRAM):
+    """Distinct 1..max_n-word phrases of a title; none starts or ends on a stop word"""
+    found = set()
+    for segment in SEGMENT_RE.split(title.lower()):
+        words = WORD_RE.findall(segment)
+        for i, first in enumerate(words):
+            if first in STOP_WORDS:
+                continue
+            if len(first) >= MIN_UNIGRAM_LEN:
+                found.add(first)
+            for n in range(2, max_n + 1):
+                if i + n > len(words):
+                    break
+                if words[i + n - 1] not in STOP_WORDS:
+                    found.add(" ".join(words[i:i + n]))
+    return found
+
+
+class PhraseMiner:
+    """
+    Streaming trend vocabulary: in how many titles each phrase (unigram..trigram)
+    appears and how many videos use each tag, both in fixed-size sketches so a scan
+    of any depth keeps the same memory footprint.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_n=MAX_NGRAM):
+        self.max_n = max_n
+        self.phrases = SpaceSaving(capacity)
+        self.tags = SpaceSaving(capacity)
+        self.documents = 0
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def add(self, title, tags=()):
+        self.documents += 1
+        for phrase in phrases(title, self.max_n):
+            self.phrases.add(phrase)
+        for tag in {t.strip().lower() for t in tags if t and t.strip()}:
+            self.tags.add(tag)
+
+    def most_common(self, n=15, min_words=1):
+        """
+        Top phrases by guaranteed title count. "hip hop" is left out when "lofi hip hop"
+        accounts for most of its occurrences, so the list isn't padded with fragments.
+        """
+        candidates = [
+            (p, c) for p, c in self.phrases.most_common(n * 4, guaranteed=True)
+            if c > 0 and len(p.split()) >= min_words
+        ]
+        kept = []
+        for phrase, count in candidates:
+            padded = f" {phrase} "
+            subsumed = any(
+                len(other) > len(phrase) and padded in f" {other} " and other_count >= SUBSUME_RATIO * count
+                for other, other_count in candidates
+            )
+            if not subsumed:
+                kept.append((phrase, count))
+        return kept[:n]
@@ -0,0 +1,271 @@
+"""Per-rerun profiling: stage timings per tab, a sampled flame summary and hot functions."""
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import functools
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+
+STAGES = ('fetch', 'parse', 'score', 'aggregate', 'render')
+# Time inside a section that no nested stage claims is Streamlit/UI code
+RESIDUAL_STAGE = 'render'
+ROOT_SECTION = 'app'
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 48
+# A rerun cut short by st.rerun()/st.stop() never reaches stop(); the sampler gives up on its own
+MAX_SAMPLE_SECONDS = 300
+
+_local = threading.local()
+
+
+def active():
+    """Profiler of the current thread's rerun, or None"""
+    profiler = getattr(_local, 'profiler', None)
+    return profiler if profiler is not None and profiler.running else None
+
+
+@contextmanager
+def stage(name):
+    """Attribute the enclosed work to `name` (no-op unless this thread is being profiled)"""
+    profiler = active()
+    if profiler is None:
+        yield
+        return
+    profiler._push(None, name)
+    try:
+        yield
+    finally:
+        profiler._pop()
+
+
+@contextmanager
+def section(name):
+    """Group the stages below under `name`, e.g. one per tab"""
+    profiler = active()
+    if profiler is None:
+        yield
+        return
+    profiler._push(name, RESIDUAL_STAGE)
+    try:
+        yield
+    finally:
+        profiler._pop()
+
+
+def staged(name):
+    """Decorator form of stage()"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if active() is None:
+                return fn(*args, **kwargs)
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _label(code, script_path):
+    if code.co_filename == script_path and code.co_name == '<module>':
+        return os.path.basename(script_path)
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class RerunProfiler:
+    """
+    Profiles one script run on the thread that calls start(). Stage timings are
+    self times (a nested stage's time is not counted twice), so per-section rows
+    add up to the wall time. A sampler thread snapshots the script thread's stack
+    every `interval` s for the flame summary; `deterministic` also runs cProfile
+    for exact call counts, at a noticeable slowdown.
+    """
+
+    def __init__(self, script_path, deterministic=False, interval=SAMPLE_INTERVAL):
+        self.script_path = os.path.abspath(script_path)
+        self.deterministic = deterministic
+        self.interval = interval
+        self.timings = defaultdict(float)
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.wall = 0.0
+        self.running = False
+        self._frames = []
+        self._current = (ROOT_SECTION, RESIDUAL_STAGE)
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._cprofile = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.running = True
+        _local.profiler = self
+        self._push(ROOT_SECTION, RESIDUAL_STAGE)
+        if self.deterministic:
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:
+                # Another profiler already owns this thread
+                self._cprofile = None
+        self._sampler = threading.Thread(target=self._sample_loop, name="vidiq-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        if not self.running:
+            return self
+        if self._cprofile is not None and threading.get_ident() == self._thread_id:
+            self._cprofile.disable()
+        self._stop.set()
+        while self._frames:
+            self._pop()
+        self.running = False
+        if getattr(_local, 'profiler', None) is self:
+            _local.profiler = None
+        self._sampler.join(timeout=1)
+        return self
+
+    # Frames: [section, stage, started, time spent in nested frames]
+    def _push(self, section_name, stage_name):
+        parent = self._frames[-1] if self._frames else None
+        if section_name is None:
+            section_name = parent[0] if parent else ROOT_SECTION
+        self._frames.append([section_name, stage_name, time.perf_counter(), 0.0])
+        self._current = (section_name, stage_name)
+
+    def _pop(self):
+        section_name, stage_name, started, nested = self._frames.pop()
+        elapsed = time.perf_counter() - started
+        self.timings[(section_name, stage_name)] += elapsed - nested
+        if self._frames:
+            self._frames[-1][3] += elapsed
+            self._current = tuple(self._frames[-1][:2])
+        else:
+            self.wall = elapsed
+
+    def _sample_loop(self):
+        give_up = time.monotonic() + MAX_SAMPLE_SECONDS
+        while not self._stop.wait(self.interval) and time.monotonic() < give_up:
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                return
+            current = self._current
+            self.stacks[self._collapse(frame, current)] += 1
+            self.samples += 1
+
+    def _collapse(self, frame, current):
+        """section;stage;outermost;...;innermost, starting at the script's outermost frame"""
+        labels = []
+        outermost = None
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename == self.script_path:
+                # The module frame on full reruns, the fragment function on fragment reruns
+                outermost = len(labels)
+            labels.append(_label(code, self.script_path))
+            frame = frame.f_back
+        if outermost is not None:
+            del labels[outermost + 1:]
+        labels.reverse()
+        return ';'.join(list(current) + labels[:MAX_STACK_DEPTH])
+
+    def stage_rows(self):
+        """[{'Section', 'Stage', 'ms', 'share'}] largest first"""
+        total = sum(self.timings.values()) or 1
+        rows = [
+            {'Section': section_name, 'Stage': stage_name, 'ms': round(seconds * 1000, 1),
+             'share': round(100 * seconds / total, 1)}
+            for (section_name, stage_name), seconds in self.timings.items()
+        ]
+        return sorted(rows, key=lambda r: r['ms'], reverse=True)
+
+    def stage_totals(self):
+        """{stage: ms} over all sections, in STAGES order"""
+        totals = Counter()
+        for (_, stage_name), seconds in self.timings.items():
+            totals[stage_name] += seconds * 1000
+        return {name: round(totals[name], 1) for name in STAGES if name in totals}
+
+    def flame_summary(self, min_share=0.02, max_depth=14, width=20):
+        """Call tree of the samples as indented text, one bar per frame covering `min_share` or more"""
+        if not self.samples:
+            return "(no samples - the rerun was shorter than the sampling interval)"
+        tree = {}
+        for stack, count in self.stacks.items():
+            node = tree
+            for label in stack.split(';')[:max_depth]:
+                entry = node.setdefault(label, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        lines = []
+
+        def walk(node, depth):
+            for label, (count, children) in sorted(node.items(), key=lambda kv: kv[1][0], reverse=True):
+                share = count / self.samples
+                if share < min_share:
+                    continue
+                bar = '█' * max(1, round(share * width))
+                lines.append(f"{share * 100:5.1f}% {bar:<{width}} {'  ' * depth}{label}")
+                walk(children, depth + 1)
+
+        walk(tree, 0)
+        return '\n'.join(lines)
+
+    def hot_functions(self, n=15):
+        """Top functions by self time: exact (cProfile) in deterministic mode, else from samples"""
+        if self._cprofile is not None:
+            stats = pstats.Stats(self._cprofile).stats
+            rows = [
+                {'Function': f"{func} ({os.path.basename(filename)}:{line})", 'Calls': calls,
+                 'Self ms': round(self_time * 1000, 2), 'Total ms': round(total_time * 1000, 2)}
+                for (filename, line, func), (_, calls, self_time, total_time, _) in stats.items()
+            ]
+            return sorted(rows, key=lambda r: r['Self ms'], reverse=True)[:n]
+
+        self_samples = Counter()
+        total_samples = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')[2:]
+            if frames:
+                self_samples[frames[-1]] += count
+            for label in set(frames):
+                total_samples[label] += count
+        per_sample = self.wall * 1000 / self.samples if self.samples else 0
+        return [
+            {'Function': label, 'Samples': count, 'Self ms': round(count * per_sample, 1),
+             'Total ms': round(total_samples[label] * per_sample, 1)}
+            for label, count in self_samples.most_common(n)
+        ]
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack lines, for flamegraph.pl / speedscope"""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at,
+            'wall_ms': round(self.wall * 1000, 1),
+            'mode': 'deterministic' if self._cprofile is not None else 'sampling',
+            'sample_interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'stages': self.stage_rows(),
+            'hot_functions': self.hot_functions(50),
+            'collapsed_stacks': self.collapsed(),
+        }
+
+    def dumps(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=1)
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.dumps())
+        return path
@@ -0,0 +1,234 @@
+"""Retries with jittered backoff, deadlines, hedged requests and circuit breakers for outbound API calls."""
+import time
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import aiohttp
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 403s that mean "slow down" rather than "forbidden" / "out of quota"
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+DEFAULT_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_DEADLINE = 20.0
+
+# Attempts run here so a deadline can be enforced without waiting on the socket
+_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="api-call")
+
+
+class CircuitOpenError(Exception):
+    """The upstream failed too often recently; the call was not attempted"""
+
+
+class DeadlineExceededError(Exception):
+    """No successful response within the call's deadline"""
+
+
+def status_of(exc):
+    """HTTP status of a googleapiclient, requests, aiohttp-style or google.api_core error (None if unknown)"""
+    resp = getattr(exc, 'resp', None)
+    if resp is not None:
+        return getattr(resp, 'status', None)
+    response = getattr(exc, 'response', None)
+    if response is not None:
+        return getattr(response, 'status_code', None)
+    status = getattr(exc, 'status', None)
+    if isinstance(status, int):
+        return status
+    code = getattr(exc, 'code', None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc):
+    """Transient failures: timeouts, dropped connections, 429 / 5xx and rate-limit 403s"""
+    if isinstance(exc, (OSError, asyncio.TimeoutError)):
+        return True
+    # Disconnects and truncated bodies aren't OSErrors; HTTP error replies go by status below
+    if isinstance(exc, aiohttp.ClientError) and not isinstance(exc, aiohttp.ClientResponseError):
+        return True
+    status = status_of(exc)
+    if status in RETRYABLE_STATUS:
+        return True
+    return status == 403 and any(reason in str(exc) for reason in RATE_LIMIT_REASONS)
+
+
+class CircuitBreaker:
+    """
+    Closed until `failure_threshold` consecutive failed attempts, then open: calls
+    are refused for `reset_after` seconds, after which a single trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_after=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if self._trial or time.monotonic() - self._opened_at >= self.reset_after:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._trial and time.monotonic() - self._opened_at >= self.reset_after:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+def _attempt(fn, timeout, hedge_after):
+    """One attempt, plus a duplicate if the first is still running after `hedge_after` s"""
+    end = time.monotonic() + timeout
+    pending = {_POOL.submit(fn)}
+    hedged = hedge_after is None
+    error = None
+    while pending:
+        wait_for = end - time.monotonic()
+        if not hedged:
+            wait_for = min(wait_for, hedge_after)
+        if wait_for <= 0:
+            break
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+        if not hedged:
+            hedged = True
+            if pending and time.monotonic() < end:
+                pending.add(_POOL.submit(fn))
+    if error is not None and not pending:
+        raise error
+    raise DeadlineExceededError(f"no response within {timeout:.1f}s")
+
+
+def call(fn, breaker, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+         max_delay=DEFAULT_MAX_DELAY, deadline=DEFAULT_DEADLINE, hedge_after=None):
+    """
+    Run fn() with retries on transient errors, "full jitter" exponential backoff and an
+    overall deadline. With `hedge_after`, fn may run twice at once, so it must be safe
+    to call concurrently (and worth the extra quota).
+    """
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name} is unavailable, retrying in {breaker.reset_after:.0f}s")
+
+    start = time.monotonic()
+    last_error = None
+    for attempt in range(attempts):
+        remaining = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+        try:
+            result = _attempt(fn, remaining, hedge_after)
+        except DeadlineExceededError:
+            breaker.record_failure()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                # The upstream answered; the request itself was rejected
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            last_error = e
+            if attempt == attempts - 1 or breaker.state == 'open':
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            time.sleep(min(delay, max(0, deadline - (time.monotonic() - start))))
+        else:
+            breaker.record_success()
+            return result
+    raise DeadlineExceededError(f"no response within {deadline:.1f}s") from last_error
+
+
+async def _attempt_async(fn, timeout, hedge_after):
+    """Async twin of _attempt: coroutine attempts, hedged with a second task"""
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    pending = {asyncio.ensure_future(fn())}
+    hedged = hedge_after is None
+    error = None
+    try:
+        while pending:
+            wait_for = end - loop.time()
+            if not hedged:
+                wait_for = min(wait_for, hedge_after)
+            if wait_for <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not hedged:
+                hedged = True
+                if pending and loop.time() < end:
+                    pending.add(asyncio.ensure_future(fn()))
+    finally:
+        # Unlike threads, losing or timed-out coroutines can actually be stopped
+        for task in pending:
+            task.cancel()
+    if error is not None and not pending:
+        raise error
+    raise DeadlineExceededError(f"no response within {timeout:.1f}s")
+
+
+async def call_async(fn, breaker, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                     max_delay=DEFAULT_MAX_DELAY, deadline=DEFAULT_DEADLINE, hedge_after=None):
+    """call() for a coroutine function `fn`, sharing the same breakers and retry rules"""
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name} is unavailable, retrying in {breaker.reset_after:.0f}s")
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    last_error = None
+    for attempt in range(attempts):
+        remaining = deadline - (loop.time() - start)
+        if remaining <= 0:
+            break
+        try:
+            result = await _attempt_async(fn, remaining, hedge_after)
+        except DeadlineExceededError:
+            breaker.record_failure()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            last_error = e
+            if attempt == attempts - 1 or breaker.state == 'open':
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            await asyncio.sleep(min(delay, max(0, deadline - (loop.time() - start))))
+        else:
+            breaker.record_success()
+            return result
+    raise DeadlineExceededError(f"no response within {deadline:.1f}s") from last_error
@@ -0,0 +1,164 @@
+"""
+Score a title catalogue offline with the app's analyze_title rubric.
+
+    python score_titles.py titles.csv -o scores.csv
+    python score_titles.py titles.jsonl -o scores.jsonl --workers 8 --power-words words.json
+
+Input rows need a title column (and optionally a keyword column); every input column
+is passed through and `score` + `checks` (check codes) are appended.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from seo import FALLBACK_POWER_WORDS, PowerWordMatcher, title_checks
+
+# Set once per worker process by _init_worker
+_MATCHER = None
+
+
+def _init_worker(power_words):
+    global _MATCHER
+    _MATCHER = PowerWordMatcher(power_words)
+
+
+def _score_chunk(pairs):
+    """Runs in a worker: [(title, keyword), ...] -> [(score, [codes]), ...]"""
+    results = []
+    for title, keyword in pairs:
+        score, checks = title_checks(title, keyword, _MATCHER)
+        results.append((score, [code for code, _, _ in checks]))
+    return results
+
+
+def load_power_words(path):
+    """JSON array or one word per line"""
+    if not path:
+        return FALLBACK_POWER_WORDS
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        words = json.loads(text)
+    except ValueError:
+        words = [line.strip() for line in text.splitlines() if line.strip()]
+    if not isinstance(words, list) or not words:
+        raise SystemExit(f"❌ No power words found in {path}")
+    return words
+
+
+def _format(path, override):
+    if override:
+        return override
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def read_rows(path, fmt):
+    """Stream input rows as dicts"""
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class RowWriter:
+    """CSV or JSONL output, header taken from the first row"""
+
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self._file = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        self._csv = None
+
+    def write(self, row):
+        if self.fmt == "jsonl":
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            return
+        if self._csv is None:
+            self._csv = csv.DictWriter(self._file, fieldnames=list(row), extrasaction="ignore")
+            self._csv.writeheader()
+        self._csv.writerow({**row, 'checks': "|".join(row['checks'])})
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+def score_file(args):
+    in_fmt = _format(args.input, args.input_format)
+    out_fmt = _format(args.output, args.output_format)
+    power_words = load_power_words(args.power_words)
+    workers = args.workers or os.cpu_count() or 1
+
+    rows = read_rows(args.input, in_fmt)
+    writer = RowWriter(args.output, out_fmt)
+    total = 0
+    start = time.perf_counter()
+    last_report = start
+
+    # Keep at most 2 chunks per worker in flight so memory stays flat for any file size
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(power_words,)) as pool:
+        chunks = iter(lambda: list(itertools.islice(rows, args.chunk_size)), [])
+
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            pairs = [(row.get(args.title_column) or "", row.get(args.keyword_column) or "") for row in chunk]
+            pending.append((chunk, pool.submit(_score_chunk, pairs)))
+            return True
+
+        while len(pending) < workers * 2 and submit_next():
+            pass
+
+        while pending:
+            chunk, future = pending.popleft()
+            for row, (score, codes) in zip(chunk, future.result()):
+                writer.write({**row, 'score': score, 'checks': codes})
+            total += len(chunk)
+            submit_next()
+
+            now = time.perf_counter()
+            if not args.quiet and now - last_report >= 2:
+                print(f"… {total:,} titles ({total / (now - start):,.0f} titles/sec)", file=sys.stderr)
+                last_report = now
+
+    writer.close()
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else 0
+    print(f"✅ Scored {total:,} titles in {elapsed:.1f}s ({rate:,.0f} titles/sec, {workers} workers)", file=sys.stderr)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score titles with the VidIQ Clone SEO rubric")
+    parser.add_argument("input", help="CSV or JSONL file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="CSV or JSONL output file (default: stdout)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="Override format detection")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="Override format detection")
+    parser.add_argument("--title-column", default="title")
+    parser.add_argument("--keyword-column", default="keyword")
+    parser.add_argument("--power-words", help="JSON array or newline-separated power words (default: offline list)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Titles per work unit")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress output")
+    args = parser.parse_args(argv)
+    score_file(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import re
+import datetime
+from collections import Counter
+
+# Scoring rubric and metadata generators shared by the Streamlit app, background jobs and CLIs.
+# Nothing here touches Streamlit: the active power-word list is passed in explicitly.
+
+FALLBACK_POWER_WORDS = ["secret", "best", "exposed", "tutorial", "guide", "how to", "tips", "tricks", "hacks", "ultimate", "complete", "full", "master", "proven", "amazing", "incredible", "perfect", "easy", "simple", "advanced"]
+VIRAL_EMOJIS = ["🔥", "😱", "🔴", "✅", "❌", "🎵", "⚠️", "⚡", "🚀", "💰", "💯", "🤯", "😭", "😡", "😴", "🌙", "✨", "💤", "🌧️", "🎹", "👀", "💪", "🎯", "⭐", "🏆"]
+STOP_WORDS = {"the", "and", "or", "for", "to", "in", "on", "at", "by", "with", "a", "an", "is", "it", "of", "that", "this", "video", "i", "you", "me", "we", "my", "your"}
+
+
+def extract_core_theme(title, keyword):
+    """
+    FIXED: Extract the ACTUAL theme/context from the title
+    This preserves the original meaning while removing only the keyword
+    """
+    if not title:
+        return ""
+    
+    # Remove keyword but keep the rest intact
+    if keyword:
+        # Case-insensitive removal
+        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+        core = pattern.sub("", title).strip()
+    else:
+        core = title
+    
+    # Clean up extra spaces and punctuation
+    core = re.sub(r'\s+', ' ', core)
+    core = re.sub(r'^[:\-\|,\.\s]+', '', core)
+    core = re.sub(r'[:\-\|,\.\s]+$', '', core)
+    
+    # If nothing left, extract meaningful words from original title
+    if not core or len(core) < 3:
+        # Extract meaningful words (skip stop words and keyword)
+        words = re.findall(r'\b\w+\b', title.lower())
+        meaningful = [w for w in words if w not in STOP_WORDS and (not keyword or w != keyword.lower())]
+        
+        if meaningful:
+            # Take first 3-5 meaningful words
+            core = ' '.join(meaningful[:5])
+        else:
+            core = "Guide"
+    
+    return core.strip()
+
+def smart_truncate(text, max_length):
+    """Smart text truncation at word boundaries"""
+    if not text or len(text) <= max_length:
+        return text
+    
+    truncated = text[:max_length-3]
+    last_space = truncated.rfind(' ')
+    if last_space > 0:
+        truncated = truncated[:last_space]
+    return truncated + "..."
+
+def extract_keywords_from_title(title, top_n=5):
+    """Extract important keywords from title"""
+    if not title:
+        return []
+    words = re.findall(r'\b[a-z]{3,}\b', title.lower())
+    filtered = [w for w in words if w not in STOP_WORDS]
+    counter = Counter(filtered)
+    return [word for word, _ in counter.most_common(top_n)]
+
+def generate_tags(title, keyword, competitor_tags=None):
+    """Generate SEO-optimized tags"""
+    if not title:
+        return [keyword.lower()] if keyword else []
+    
+    tags = set()
+    year = datetime.datetime.now().year
+    
+    # Add main keyword
+    if keyword:
+        tags.add(keyword.lower())
+        tags.add(f"{keyword.lower()} {year}")
+        
+        # Add keyword variations
+        kw_words = keyword.lower().split()
+        if len(kw_words) > 1:
+            tags.add(kw_words[0])
+            tags.add(' '.join(kw_words[:2]))
+    
+    # Extract from title
+    clean_title = re.sub(r'[^\w\s]', '', title.lower())
+    words = clean_title.split()
+    
+    for word in words:
+        if word not in STOP_WORDS and len(word) > 2:
+            tags.add(word)
+            if len(tags) >= 12:
+                break
+    
+    # Add competitor tags
+    if competitor_tags:
+        for tag in competitor_tags[:5]:
+            if len(tags) < 18:
+                tags.add(tag.lower())
+    
+    # Add common variations
+    if keyword:
+        tags.add(f"{keyword.lower()} tutorial")
+        tags.add(f"how to {keyword.lower()}")
+    
+    return list(tags)[:20]
+
+def generate_description(title, keyword, tags, video_length="10:00"):
+    """Generate SEO-optimized description"""
+    year = datetime.datetime.now().year
+    month = datetime.datetime.now().strftime("%B")
+    
+    try:
+        duration_mins = int(video_length.split(':')[0])
+    except:
+        duration_mins = 10
+    
+    tag_text = ', '.join(tags[:5]) if tags else keyword
+    hashtags = ' '.join([f"#{tag.replace(' ', '')}" for tag in tags[:5]]) if tags else f"#{keyword.replace(' ', '')}"
+    
+    return f"""🎬 {title}
+
+📌 **About This Video:**
+In this comprehensive {video_length} video, we dive deep into **{keyword}**. Whether you're a beginner or looking to advance your skills, this {year} guide will help you master {keyword}.
+
+⏱️ **Timestamps:**
+0:00 - Introduction
+0:45 - What is {keyword}?
+2:30 - Step-by-step {keyword} tutorial
+{max(duration_mins-3, 5)}:00 - Pro tips and advanced techniques
+{max(duration_mins-2, 7)}:00 - Common mistakes to avoid
+{max(duration_mins-1, 9)}:00 - Conclusion & next steps
+
+🔥 **What You'll Learn:**
+✅ Complete {keyword} fundamentals
+✅ Practical examples and demonstrations
+✅ Expert insights and strategies
+✅ Proven techniques that work in {year}
+
+💡 **Related Topics:**
+{tag_text}
+
+🔔 **Don't Forget to:**
+• SUBSCRIBE for more {keyword} content
+• LIKE if this video helped you
+• COMMENT your questions below
+• SHARE with anyone who needs this
+
+📱 **Connect With Us:**
+[Add your social media links here]
+
+{hashtags}
+
+---
+© {year} | {keyword.title()} Tutorial | All Rights Reserved
+"""
+
+class PowerWordMatcher:
+    """
+    Power-word lookup prepared once for scoring many titles.
+    A single compiled alternation rejects titles without any power word; titles that
+    do match fall back to the per-word scan so results keep the list's order.
+    """
+    def __init__(self, power_words=None):
+        self.words = tuple(power_words or FALLBACK_POWER_WORDS)
+        self._lowered = tuple((word, word.lower()) for word in self.words)
+        alternatives = sorted({lowered for _, lowered in self._lowered}, key=len, reverse=True)
+        self._pattern = re.compile('|'.join(re.escape(a) for a in alternatives))
+    
+    def find(self, title, limit=None):
+        """Power words in `title`, in list order; stops after `limit` hits"""
+        title_lower = title.lower()
+        if not self._pattern.search(title_lower):
+            return []
+        found = []
+        for word, lowered in self._lowered:
+            if lowered in title_lower:
+                found.append(word)
+                if limit and len(found) >= limit:
+                    break
+        return found
+
+def analyze_title(title, keyword="", power_words=None):
+    """Comprehensive title SEO analysis"""
+    score, checks = title_checks(title, keyword, power_words)
+    return score, [(status, message) for _, status, message in checks]
+
+def title_checks(title, keyword="", power_words=None):
+    """
+    The scoring rubric behind analyze_title. Checks are (code, status, message);
+    codes are stable identifiers for exports and offline scoring.
+    `power_words` is a list or a precompiled PowerWordMatcher.
+    """
+    score = 0
+    checks = []
+    
+    if not title:
+        return 0, [("EMPTY", "error", "Title is empty")]
+    
+    title_len = len(title)
+    
+    # 1. Length Analysis (25 points)
+    if 40 <= title_len <= 70:
+        score += 25
+        checks.append(("LEN_PERFECT", "success", f"✅ Perfect Length ({title_len} chars) - Ideal for SEO"))
+    elif 30 <= title_len <= 90:
+        score += 20
+        checks.append(("LEN_GOOD", "warning", f"⚠️ Good Length ({title_len} chars) - Can be optimized"))
+    elif title_len < 30:
+        score += 10
+        checks.append(("LEN_SHORT", "error", f"❌ Too Short ({title_len} chars) - Add more details"))
+    else:
+        score += 5
+        checks.append(("LEN_LONG", "error", f"❌ Too Long ({title_len} chars) - Will be truncated"))
+    
+    # 2. Keyword Analysis (20 points)
+    if keyword:
+        kw_lower = keyword.lower()
+        title_lower = title.lower()
+        
+        if kw_lower in title_lower:
+            # Check position
+            position = title_lower.find(kw_lower)
+            title_start = re.sub(r'^[^a-zA-Z0-9]+', '', title_lower).strip()
+            
+            if title_start.startswith(kw_lower):
+                score += 20
+                checks.append(("KW_START", "success", "✅ Keyword at Beginning - Perfect for SEO!"))
+            elif position < 30:
+                score += 15
+                checks.append(("KW_FIRST_HALF", "success", "✅ Keyword in First Half - Good placement"))
+            else:
+                score += 10
+                checks.append(("KW_PRESENT", "warning", "⚠️ Keyword Present - Move closer to start"))
+        else:
+            checks.append(("KW_MISSING", "error", "❌ Keyword Missing - Critical for ranking!"))
+    else:
+        score += 20
+    
+    # 3. Power Words (15 points) - Using current database
+    if isinstance(power_words, PowerWordMatcher):
+        # Only the first two are reported, so the scan can stop there
+        found_power = power_words.find(title, limit=2)
+    else:
+        # Current power words (from Gemini AI or the online DB), fallback list otherwise
+        power_words_list = power_words or FALLBACK_POWER_WORDS
+        found_power = [pw for pw in power_words_list if pw.lower() in title.lower()]
+    if found_power:
+        score += 15
+        checks.append(("POWER_WORDS", "success", f"✅ Power Words: {', '.join(found_power[:2])}"))
+    else:
+        checks.append(("NO_POWER_WORDS", "warning", "⚠️ No Power Words - Add 'BEST', 'ULTIMATE', etc."))
+    
+    # 4. Numbers (15 points)
+    numbers = re.findall(r'\d+', title)
+    if numbers:
+        score += 15
+        checks.append(("NUMBERS", "success", f"✅ Numbers: {', '.join(numbers)} - Boosts CTR by 36%"))
+    else:
+        checks.append(("NO_NUMBERS", "info", "💡 Add Numbers - Proven to increase clicks"))
+    
+    # 5. Emoji (10 points)
+    emojis = [e for e in VIRAL_EMOJIS if e in title]
+    if emojis:
+        score += 10
+        checks.append(("EMOJI", "success", f"✅ Emoji: {' '.join(emojis)} - Eye-catching"))
+    else:
+        checks.append(("NO_EMOJI", "info", "💡 Add Emoji - Increases visibility"))
+    
+    # 6. Engagement Elements (15 points)
+    engagement_score = 0
+    
+    # Check for brackets/parentheses
+    if '[' in title or '(' in title:
+        engagement_score += 5
+        checks.append(("BRACKETS", "success", "✅ Brackets Used - Adds context"))
+    
+    # Check for question mark
+    if '?' in title:
+        engagement_score += 5
+        checks.append(("QUESTION", "success", "✅ Question Format - Creates curiosity"))
+    
+    # Check for year
+    current_year = str(datetime.datetime.now().year)
+    if current_year in title:
+        engagement_score += 5
+        checks.append(("CURRENT_YEAR", "success", f"✅ Current Year ({current_year}) - Shows freshness"))
+    
+    # Penalty for all caps
+    if title.isupper():
+        engagement_score -= 10
+        checks.append(("ALL_CAPS", "error", "❌ ALL CAPS - Looks spammy"))
+    
+    score += min(engagement_score, 15)
+    
+    return min(score, 100), checks
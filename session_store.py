@@ -0,0 +1,134 @@
+"""Compact, memory-bounded storage for per-session analysis results."""
+import sys
+import time
+import threading
+import pyarrow as pa
+from collections import OrderedDict
+
+DEFAULT_SESSION_BUDGET = 8 * 1024 * 1024   # bytes of results kept per session
+DEFAULT_SESSION_ENTRIES = 20
+DEFAULT_RESULT_TTL = 15 * 60
+
+
+class KeywordResult:
+    """
+    One keyword analysis: scalar summary in slots, competitor videos as a single
+    Arrow table instead of a DataFrame plus a parallel list of dicts.
+    """
+    __slots__ = (
+        'keyword', 'region', 'median_views', 'avg_views', 'avg_engagement', 'hidden_likes', 'score',
+        'difficulty', 'difficulty_score', 'baseline', 'trending_tags', 'best_upload_time', 'best_hour',
+        'total_videos', 'videos', 'created_at'
+    )
+
+    def __init__(self, keyword, region, data):
+        self.keyword = keyword
+        self.region = region
+        self.median_views = data['median_views']
+        self.avg_views = data['avg_views']
+        self.avg_engagement = data['avg_engagement']
+        self.hidden_likes = data.get('hidden_likes', 0)
+        self.score = data['score']
+        self.difficulty = data['difficulty']
+        self.difficulty_score = data['difficulty_score']
+        self.baseline = data.get('baseline')
+        self.trending_tags = tuple(data['trending_tags'])
+        self.best_upload_time = data['best_upload_time']
+        self.best_hour = data.get('best_hour')
+        self.total_videos = data['total_videos']
+        self.videos = pa.Table.from_pandas(data['top_videos'], preserve_index=False)
+        self.created_at = time.time()
+
+    @property
+    def top_videos(self):
+        """DataFrame view, materialized only while a tab renders it"""
+        return self.videos.to_pandas()
+
+    @property
+    def competitor_titles(self):
+        return self.videos.column('Title').to_pylist()
+
+    @property
+    def competitor_data(self):
+        return self.videos.to_pylist()
+
+    @property
+    def nbytes(self):
+        overhead = sum(sys.getsizeof(tag) for tag in self.trending_tags)
+        return self.videos.nbytes + overhead + 512
+
+
+class SessionLRU:
+    """
+    Per-session result cache with a byte budget: least recently used analyses are
+    evicted once the budget or entry cap is exceeded, and entries expire after `ttl`.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_SESSION_BUDGET, max_entries=DEFAULT_SESSION_ENTRIES, ttl=DEFAULT_RESULT_TTL):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.total_bytes = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key):
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        value, size, stored_at = entry
+        if self.ttl and time.time() - stored_at > self.ttl:
+            self.pop(key)
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.pop(key)
+        size = getattr(value, 'nbytes', None) or sys.getsizeof(value)
+        self._items[key] = (value, size, time.time())
+        self.total_bytes += size
+        # Never evict the entry that was just stored, even if it alone is over budget
+        while len(self._items) > 1 and (self.total_bytes > self.max_bytes or len(self._items) > self.max_entries):
+            _, (_, old_size, _) = self._items.popitem(last=False)
+            self.total_bytes -= old_size
+            self.evictions += 1
+
+    def pop(self, key):
+        entry = self._items.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+        return entry[0] if entry else None
+
+    def clear(self):
+        self._items.clear()
+        self.total_bytes = 0
+
+
+class SharedWordLists:
+    """
+    Process-wide interning of immutable word lists: every session using the same
+    power words holds a reference to one tuple instead of its own list copy.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._lists = OrderedDict()
+        self._lock = threading.Lock()
+
+    def share(self, words):
+        key = tuple(words)
+        with self._lock:
+            shared = self._lists.get(key)
+            if shared is None:
+                shared = self._lists[key] = key
+            self._lists.move_to_end(key)
+            while len(self._lists) > self.max_entries:
+                self._lists.popitem(last=False)
+        return shared
@@ -0,0 +1,174 @@
+"""Template × power word × number × emoji title generator with batch scoring and top-k ranking."""
+import re
+import math
+import heapq
+import random
+import datetime
+import itertools
+from collections import Counter
+
+from seo import VIRAL_EMOJIS, PowerWordMatcher, title_checks, extract_core_theme, extract_keywords_from_title, smart_truncate
+
+# {theme} is truncated per template so every candidate stays within YouTube's 100 chars
+TEMPLATES = [
+    "{keyword}: {theme} - {power} {year} {emoji}",
+    "{number} {keyword} {theme} You Need ({year}) {emoji}",
+    "How to {keyword}: {theme} {emoji} [{year} {power}]",
+    "{theme} - {keyword} {power} Guide {year} {emoji}",
+    "{power} {keyword} {theme} | {year} Tutorial {emoji}",
+    "{emoji} {number} {power} {keyword} Tips: {theme} ({year})",
+    "{keyword} {theme}? {number} {power} Secrets {emoji}",
+    "{power} {keyword}: {number} {theme} Ideas [{year}] {emoji}",
+    "{keyword} ({year}) - {theme} | {power} {emoji}",
+    "{number} {power} Ways to {keyword}: {theme} {emoji}",
+]
+DEFAULT_NUMBERS = ['5', '7', '10']
+MAX_TITLE_LENGTH = 100
+TOKEN_RE = re.compile(r'\w+')
+
+
+def title_tokens(title):
+    return set(TOKEN_RE.findall(title.lower()))
+
+
+class SuggestionEngine:
+    """
+    Build once per power-word list and reuse: the power-word matcher is compiled here,
+    per-call work is expanding candidates and scoring them in one pass.
+    """
+
+    def __init__(self, power_words=None, templates=TEMPLATES, max_power_words=10, max_emojis=5,
+                 max_candidates=800, similarity_weight=10):
+        self.matcher = PowerWordMatcher(power_words)
+        self.templates = list(templates)
+        self.max_power_words = max_power_words
+        self.max_emojis = max_emojis
+        self.max_candidates = max_candidates
+        self.similarity_weight = similarity_weight
+
+    def suggest(self, original_title, keyword, competitor_titles=None, top_k=5, seed=None, similarity_model=None):
+        """
+        Top-k candidates as dicts: title, score, similarity, rank.
+        The best candidate of each template is preferred so the k results read differently.
+        `similarity_model` (a title_similarity.CompetitorModel) replaces the token-set cosine.
+        """
+        rng = random.Random(seed)
+        competitor_titles = [t for t in (competitor_titles or []) if t][:10]
+        candidates = self.expand(original_title, keyword, competitor_titles, rng)
+        scored = self.score_batch(candidates, keyword, competitor_titles, similarity_model)
+
+        def rank_key(s):
+            return (s['rank'], s['score'])
+
+        best_per_template = {}
+        for s in scored:
+            best = best_per_template.get(s['template'])
+            if best is None or rank_key(s) > rank_key(best):
+                best_per_template[s['template']] = s
+        top = heapq.nlargest(top_k, best_per_template.values(), key=rank_key)
+        if len(top) < top_k:
+            chosen = {s['title'] for s in top}
+            top += heapq.nlargest(top_k - len(top), (s for s in scored if s['title'] not in chosen), key=rank_key)
+        return top
+
+    def expand(self, original_title, keyword, competitor_titles, rng):
+        """Unique (title, template) candidates from every template × power word × number × emoji slot"""
+        theme = self._theme(original_title, keyword)
+        powers = self._power_words(competitor_titles, rng)
+        numbers = self._numbers(competitor_titles)
+        emojis = self._emojis(competitor_titles, rng)
+        year = str(datetime.datetime.now().year)
+        kw_title = keyword.title() if keyword else ""
+
+        combos = []
+        for template in self.templates:
+            slots = [
+                powers if '{power}' in template else [''],
+                numbers if '{number}' in template else [''],
+                emojis if '{emoji}' in template else ['']
+            ]
+            combos.extend((template, *combo) for combo in itertools.product(*slots))
+        if len(combos) > self.max_candidates:
+            combos = rng.sample(combos, self.max_candidates)
+
+        seen = set()
+        candidates = []
+        for template, power, number, emoji in combos:
+            fixed = template.format(keyword=kw_title, theme='', power=power, number=number, year=year, emoji=emoji)
+            theme_text = theme if template.startswith("How to") else theme.title()
+            fitted = smart_truncate(theme_text, MAX_TITLE_LENGTH - len(fixed))
+            title = template.format(keyword=kw_title, theme=fitted, power=power, number=number, year=year, emoji=emoji)
+            title = re.sub(r'\s+', ' ', title).strip()
+            if title not in seen:
+                seen.add(title)
+                candidates.append((title, template))
+        return candidates
+
+    def score_batch(self, candidates, keyword, competitor_titles, similarity_model=None):
+        """analyze_title rubric + similarity to competitor titles for every candidate"""
+        titles = [title for title, _ in candidates]
+        if similarity_model is not None and len(similarity_model):
+            similarities = [float(s) for s in similarity_model.max_similarity(titles)]
+        else:
+            similarities = self.similarities(titles, competitor_titles)
+        results = []
+        for (title, template), similarity in zip(candidates, similarities):
+            score, _ = title_checks(title, keyword, self.matcher)
+            results.append({
+                'title': title,
+                'template': template,
+                'score': score,
+                'similarity': round(similarity, 3),
+                'rank': score + self.similarity_weight * similarity
+            })
+        return results
+
+    def similarities(self, candidates, competitor_titles):
+        """Best token-set cosine of each candidate against the competitor titles"""
+        competitor_sets = [s for s in (title_tokens(t) for t in competitor_titles) if s]
+        if not competitor_sets:
+            return [0.0] * len(candidates)
+        sims = []
+        for title in candidates:
+            tokens = title_tokens(title)
+            if not tokens:
+                sims.append(0.0)
+                continue
+            sims.append(max(len(tokens & other) / math.sqrt(len(tokens) * len(other)) for other in competitor_sets))
+        return sims
+
+    def _theme(self, original_title, keyword):
+        # The title's own theme; generic leftovers fall back to its top keywords
+        theme = extract_core_theme(original_title, keyword)
+        if not theme or theme.lower() in ['guide', 'tutorial', 'video']:
+            theme_words = extract_keywords_from_title(original_title, top_n=3)
+            theme = ' '.join(theme_words[:3]) if theme_words else "Complete Guide"
+        return theme
+
+    def _power_words(self, competitor_titles, rng):
+        # Words competitors already use come first, the rest of the slots are sampled
+        found = []
+        for title in competitor_titles:
+            for word in self.matcher.find(title):
+                if word not in found:
+                    found.append(word)
+        rest = [w for w in self.matcher.words if w not in found]
+        picked = found[:self.max_power_words]
+        picked += rng.sample(rest, min(len(rest), self.max_power_words - len(picked)))
+        return [w.upper() for w in picked]
+
+    def _numbers(self, competitor_titles):
+        numbers = []
+        for title in competitor_titles:
+            for n in re.findall(r'\d+', title):
+                # Years are added by the templates themselves
+                if len(n) < 4 and n not in numbers:
+                    numbers.append(n)
+        return (numbers[:2] + [n for n in DEFAULT_NUMBERS if n not in numbers])[:4]
+
+    def _emojis(self, competitor_titles, rng):
+        counts = Counter(e for title in competitor_titles for e in VIRAL_EMOJIS if e in title)
+        picked = [e for e, _ in counts.most_common(self.max_emojis)]
+        rest = [e for e in VIRAL_EMOJIS if e not in picked]
+        picked += rng.sample(rest, min(len(rest), self.max_emojis - len(picked)))
+        return picked
@@ -0,0 +1,103 @@
+import pytest
+
+from key_pool import KeyPool, KeyPoolExhaustedError, SEARCH_COST, key_error_kind
+
+KEYS = ['A' * 39, 'B' * 39, 'C' * 39]
+
+
+class ApiError(Exception):
+    """googleapiclient-style error: the status is on .resp"""
+
+    def __init__(self, status, text):
+        super().__init__(text)
+        self.resp = type('Resp', (), {'status': status})()
+
+
+QUOTA = ApiError(403, 'The request cannot be completed because you have exceeded your quota. quotaExceeded')
+INVALID = ApiError(400, 'API key not valid. Please pass a valid API key. keyInvalid')
+
+
+def send(pool, key, failures, cost=1):
+    """The retry loop AsyncYouTubeClient.list runs: `failures` maps a key to the error it gets"""
+    tried = []
+    while True:
+        routed = pool.route(key, cost)
+        tried.append(routed)
+        error = failures.get(routed)
+        if error is None:
+            return routed, tried
+        if pool.report_error(routed, error):
+            continue
+        raise error
+
+
+def test_key_errors_are_told_apart():
+    assert key_error_kind(QUOTA) == 'quota'
+    assert key_error_kind(INVALID) == 'invalid'
+    assert key_error_kind(ApiError(403, 'rateLimitExceeded')) is None
+    assert key_error_kind(ApiError(500, 'backendError')) is None
+
+
+def test_routes_to_the_key_with_the_most_quota_left():
+    pool = KeyPool(KEYS, daily_quota=1000)
+    pool._keys[KEYS[0]]['used'] = 600
+    pool._keys[KEYS[1]]['used'] = 100
+    pool._keys[KEYS[2]]['used'] = 300
+
+    assert pool.route(KEYS[0], SEARCH_COST) == KEYS[1]
+    assert pool._keys[KEYS[1]]['used'] == 100 + SEARCH_COST
+    assert pool.route(KEYS[0], SEARCH_COST) == KEYS[1]
+    # B is now at 300 like C; the next search goes to one of them, never to A
+    assert pool.route(KEYS[0], SEARCH_COST) in KEYS[1:]
+    assert pool.remaining() == 3000 - 600 - 100 - 300 - 3 * SEARCH_COST
+
+
+def test_unpooled_keys_pass_through():
+    pool = KeyPool(KEYS)
+    assert pool.route('U' * 39) == 'U' * 39
+    assert pool.report_error('U' * 39, QUOTA) is False
+    assert sum(s['requests'] for s in pool._keys.values()) == 0
+
+
+def test_quota_error_quarantines_the_key_and_retries_another():
+    pool = KeyPool(KEYS[:2], daily_quota=1000)
+    pool._keys[KEYS[1]]['used'] = 500
+
+    routed, tried = send(pool, KEYS[0], {KEYS[0]: QUOTA})
+    assert tried == [KEYS[0], KEYS[1]]
+    assert routed == KEYS[1]
+    assert pool._keys[KEYS[0]]['reason'] == 'quota'
+    # Quarantined until the daily reset: later calls skip it
+    assert pool.route(KEYS[0]) == KEYS[1]
+    assert pool.remaining() == 1000 - 500 - 2
+    assert pool.rows()[0]['Status'].startswith('⛔ quota')
+
+
+def test_invalid_key_is_quarantined_too():
+    pool = KeyPool(KEYS[:2])
+    routed, tried = send(pool, KEYS[1], {KEYS[0]: INVALID})
+    assert tried == [KEYS[0], KEYS[1]]
+    assert pool._keys[KEYS[0]]['reason'] == 'invalid'
+
+
+def test_other_errors_do_not_quarantine():
+    pool = KeyPool(KEYS[:2])
+    error = ApiError(500, 'backendError')
+    with pytest.raises(ApiError):
+        send(pool, KEYS[0], {KEYS[0]: error})
+    assert pool.report_error(KEYS[0], error) is False
+    assert all(s['blocked_until'] == 0 for s in pool._keys.values())
+
+
+def test_exhausted_pool_stops_retrying():
+    pool = KeyPool(KEYS)
+    failures = {key: QUOTA for key in KEYS}
+
+    with pytest.raises(ApiError):
+        send(pool, KEYS[0], failures)
+    # Each key was tried once, and the last report said there was nothing left to try
+    assert sorted(s['requests'] for s in pool._keys.values()) == [1, 1, 1]
+    assert pool.report_error(KEYS[0], QUOTA) is False
+    assert pool.remaining() == 0
+    with pytest.raises(KeyPoolExhaustedError):
+        pool.route(KEYS[0])
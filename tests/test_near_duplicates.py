@@ -0,0 +1,46 @@
+from near_duplicates import NearDuplicateIndex, find_near_duplicates, normalize_title
+
+LOFI = [f"Midnight Rain | Lofi Beats to Study #{n}" for n in range(1, 7)]
+PIANO = [f"Relaxing Piano Music for Sleep - Episode {n} (Deep Calm)" for n in range(1, 5)]
+OTHERS = ["How I edit my vlogs in 10 minutes", "Cooking pasta carbonara the italian way", "Minecraft hardcore day 100"]
+
+
+def titles_of(cluster):
+    return sorted(title for _, title in cluster)
+
+
+def test_normalize_title_collapses_numbers_and_punctuation():
+    assert normalize_title("Lofi Beats #12 | 2026 🔥") == normalize_title("lofi beats #3 | 1999")
+
+
+def test_templated_titles_form_one_cluster():
+    clusters = find_near_duplicates(OTHERS[:1] + LOFI + OTHERS[1:])
+    assert len(clusters) == 1
+    assert titles_of(clusters[0]) == sorted(LOFI)
+    assert [key for key, _ in clusters[0]] == list(range(1, 1 + len(LOFI)))
+
+
+def test_unrelated_titles_stay_out_of_clusters():
+    assert find_near_duplicates(OTHERS) == []
+
+
+def test_templates_sharing_a_bucket_stay_separate():
+    index = NearDuplicateIndex()
+    titles = [LOFI[0], PIANO[0], PIANO[1], LOFI[1], PIANO[2], LOFI[2]]
+    for i, title in enumerate(titles):
+        index.add(i, title)
+    # A single bucket holding both templates, led by the lofi title: each piano title has
+    # to be grouped through another piano title, not through the bucket's first member
+    index._buckets = {(0, b'shared'): list(range(len(titles)))}
+
+    clusters = index.clusters()
+    assert sorted(titles_of(c) for c in clusters) == sorted([sorted(LOFI[:3]), sorted(PIANO[:3])])
+
+
+def test_min_size_and_largest_first():
+    index = NearDuplicateIndex()
+    for i, title in enumerate(PIANO[:2] + LOFI + OTHERS):
+        index.add(i, title)
+    clusters = index.clusters()
+    assert [len(c) for c in clusters] == [len(LOFI), 2]
+    assert len(index.clusters(min_size=1)) == 2 + len(OTHERS)
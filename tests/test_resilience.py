@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, call, call_async, is_retryable
+
+
+class Clock:
+    """Stands in for the `time` module in resilience: monotonic() only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(resilience, 'time', fake)
+    return fake
+
+
+class HttpError(Exception):
+    """googleapiclient-style error: the status is on .resp"""
+
+    def __init__(self, status, text=''):
+        super().__init__(text)
+        self.resp = type('Resp', (), {'status': status})()
+
+
+def failing(*errors, result='ok'):
+    """fn that raises `errors` in turn, then returns `result`; .calls counts attempts"""
+    pending = list(errors)
+
+    def fn():
+        fn.calls += 1
+        if pending:
+            raise pending.pop(0)
+        return result
+
+    fn.calls = 0
+    return fn
+
+
+def test_retryable_errors():
+    assert is_retryable(OSError('connection reset'))
+    assert is_retryable(HttpError(503))
+    assert is_retryable(HttpError(429))
+    assert is_retryable(HttpError(403, 'rateLimitExceeded'))
+    assert not is_retryable(HttpError(403, 'quotaExceeded'))
+    assert not is_retryable(HttpError(400))
+    assert not is_retryable(ValueError('bad'))
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_after=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_the_count(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_after=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    # One failure is enough while half-open, and the wait starts over
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow() and breaker.allow()
+
+
+def test_call_retries_transient_errors(clock):
+    breaker = CircuitBreaker('test', failure_threshold=5)
+    fn = failing(OSError('reset'), HttpError(503))
+    assert call(fn, breaker, base_delay=0) == 'ok'
+    assert fn.calls == 3
+    assert breaker.state == 'closed' and breaker._failures == 0
+
+
+def test_call_gives_up_after_attempts(clock):
+    breaker = CircuitBreaker('test', failure_threshold=10)
+    fn = failing(*[OSError('reset')] * 5)
+    with pytest.raises(OSError):
+        call(fn, breaker, attempts=3, base_delay=0)
+    assert fn.calls == 3
+    assert breaker._failures == 3
+
+
+def test_call_does_not_retry_rejected_requests(clock):
+    breaker = CircuitBreaker('test', failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    fn = failing(HttpError(400, 'badRequest'))
+    with pytest.raises(HttpError):
+        call(fn, breaker, base_delay=0)
+    assert fn.calls == 1
+    # The upstream answered, so it counts as healthy
+    assert breaker._failures == 0 and breaker.state == 'closed'
+
+
+def test_call_stops_when_the_breaker_opens(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_after=30)
+    fn = failing(*[OSError('reset')] * 5)
+    with pytest.raises(OSError):
+        call(fn, breaker, attempts=4, base_delay=0)
+    assert fn.calls == 2
+    assert breaker.state == 'open'
+
+    with pytest.raises(CircuitOpenError):
+        call(fn, breaker, base_delay=0)
+    assert fn.calls == 2
+
+    clock.now += 30
+    assert call(failing(), breaker, base_delay=0) == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_call_async_shares_the_rules():
+    breaker = CircuitBreaker('test', failure_threshold=5)
+    errors = [OSError('reset'), asyncio.TimeoutError()]
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return 'ok'
+
+    assert asyncio.run(call_async(fn, breaker, base_delay=0)) == 'ok'
+    assert len(calls) == 3
+
+    async def rejected():
+        raise HttpError(404)
+
+    with pytest.raises(HttpError):
+        asyncio.run(call_async(rejected, breaker, base_delay=0))
+    assert breaker.state == 'closed'
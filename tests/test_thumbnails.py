@@ -0,0 +1,145 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+
+from thumbnails import (
+    ThumbnailCache, NUMERIC_FEATURES, correlate_with_views, extract_features, load_thumbnails, thumbnail_features
+)
+
+
+def image_bytes(color, fmt):
+    buffer = io.BytesIO()
+    Image.new('RGB', (320, 180), color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+BLOBS = {
+    '/red.jpg': image_bytes((255, 0, 0), 'JPEG'),
+    '/white.png': image_bytes((255, 255, 255), 'PNG'),
+    '/broken.jpg': b'not an image',
+}
+
+
+@pytest.fixture
+def server():
+    """Local stand-in for the thumbnail CDN; `requests` records every path asked for"""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            body = BLOBS.get(self.path)
+            self.send_response(200 if body is not None else 404)
+            self.end_headers()
+            if body is not None:
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def item(video_id, url):
+    return {'id': video_id, 'snippet': {'thumbnails': {'medium': {'url': url}}}}
+
+
+def test_second_load_is_served_from_the_disk_cache(server, tmp_path):
+    root, requests = server
+    cache = ThumbnailCache(str(tmp_path))
+    targets = [('vidRed', f"{root}/red.jpg"), ('vidWhite', f"{root}/white.png"), ('vidGone', f"{root}/gone.jpg")]
+
+    first = load_thumbnails(targets, cache)
+    assert set(first) == {'vidRed', 'vidWhite'}
+    assert first['vidRed'] == BLOBS['/red.jpg']
+    assert cache.get('vidWhite') == BLOBS['/white.png']
+    assert cache.get('vidGone') is None
+    assert len(requests) == 3
+
+    second = load_thumbnails(targets, cache)
+    assert second == first
+    # Only the missing thumbnail is asked for again
+    assert requests[3:] == ['/gone.jpg']
+
+
+def test_undecodable_and_failed_thumbnails_are_left_out(server, tmp_path):
+    root, _ = server
+    items = [
+        item('vidRed', f"{root}/red.jpg"),
+        item('vidBroken', f"{root}/broken.jpg"),
+        item('vidGone', f"{root}/gone.jpg"),
+        item('vidWhite', f"{root}/white.png"),
+    ]
+    features = thumbnail_features(items, ThumbnailCache(str(tmp_path)))
+    assert features.index.tolist() == ['vidRed', 'vidWhite']
+    assert features.loc['vidWhite', 'brightness'] == pytest.approx(1.0, abs=0.01)
+    assert features.loc['vidRed', 'colorfulness'] == pytest.approx(85.5, abs=2)
+
+
+def test_no_thumbnails_gives_an_empty_table(tmp_path):
+    features = thumbnail_features([item('vidNone', None)], ThumbnailCache(str(tmp_path)))
+    assert features.empty
+    assert set(NUMERIC_FEATURES) <= set(features.columns)
+
+
+def test_extract_features_of_synthetic_images():
+    black = np.zeros((108, 192, 3), dtype=np.uint8)
+    white = np.full((108, 192, 3), 255, dtype=np.uint8)
+    split = black.copy()
+    split[:, 96:] = 255
+    red = np.zeros((108, 192, 3), dtype=np.uint8)
+    red[..., 0] = 255
+
+    features = extract_features(np.stack([black, white, split, red]))
+
+    assert features['brightness'].tolist() == [0.0, 1.0, 0.5, pytest.approx(0.299, abs=0.001)]
+    assert features['contrast'].tolist() == [0.0, 0.0, 0.5, 0.0]
+    # sqrt(255^2 + 127.5^2) * 0.3: a flat colour only has the mean term
+    assert features.loc[3, 'colorfulness'] == pytest.approx(85.5, abs=0.1)
+    assert features.loc[:1, 'colorfulness'].tolist() == [0.0, 0.0]
+    # The split image has one column of edges; flat images have none
+    assert features['edge_density'].tolist() == [0.0, 0.0, round(1 / 192, 3), 0.0]
+    assert features['text_area'].tolist() == [0.0, 0.0, 0.0, 0.0]
+    assert features.loc[0, 'dominant_colors'] == ['#202020']
+    assert features.loc[2, 'dominant_colors'] == ['#202020', '#e0e0e0']
+    assert features.loc[3, 'dominant_colors'] == ['#e02020']
+    assert features['dominant_share'].tolist() == [1.0, 1.0, 0.5, 1.0]
+
+
+def test_text_like_blocks_count_as_text_area():
+    # Alternating black and white stripes: dense edges and a full luma range in every block
+    stripes = np.zeros((108, 192, 3), dtype=np.uint8)
+    stripes[:, ::2] = 255
+    assert extract_features(stripes[None])['text_area'].tolist() == [1.0]
+
+
+def test_correlate_with_views_ranks_by_strength():
+    ids = pd.Index(['a', 'b', 'c', 'd', 'e'], name='video_id')
+    features = pd.DataFrame({name: [0.1, 0.3, 0.2, 0.5, 0.4] for name in NUMERIC_FEATURES}, index=ids)
+    features['brightness'] = [0.1, 0.2, 0.3, 0.4, 0.5]
+    features['contrast'] = [0.5, 0.4, 0.3, 0.2, 0.1]
+    features['text_area'] = 0.0
+    views = pd.Series([100, 200, 300, 400, 500], index=ids)
+
+    corr = correlate_with_views(features, views)
+
+    assert corr['brightness'] == 1.0
+    assert corr['contrast'] == -1.0
+    assert 'text_area' not in corr  # constant: no correlation defined
+    assert set(corr.index[:2]) == {'brightness', 'contrast'}
+    assert corr.abs().is_monotonic_decreasing
+
+
+def test_correlate_with_views_needs_three_videos():
+    ids = pd.Index(['a', 'b'], name='video_id')
+    features = pd.DataFrame({name: [0.1, 0.2] for name in NUMERIC_FEATURES}, index=ids)
+    assert correlate_with_views(features, pd.Series([1, 2], index=ids)).empty
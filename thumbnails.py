@@ -0,0 +1,208 @@
+"""
+Thumbnail features: concurrent download, on-disk cache by video ID, batch NumPy features.
+
+Every thumbnail is scaled to one small size and the whole batch is processed as one
+N x H x W x 3 array: brightness, RMS contrast, colourfulness, edge density, a text-area
+estimate and the three dominant colours. The text estimate needs no face or OCR model:
+blocks with dense, strong edges and a wide brightness range are what big overlaid text
+looks like at thumbnail size.
+"""
+import io
+import os
+import asyncio
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from async_youtube import run, _get_session
+
+DEFAULT_CACHE_DIR = os.environ.get("VIDIQ_THUMB_CACHE", "vidiq_thumbnails")
+CONCURRENCY = 16
+FEATURE_SIZE = (192, 108)   # width, height: 16 x 9 blocks of 12 px
+BLOCK = 12
+EDGE_THRESHOLD = 48         # luma step (0-255) between neighbouring pixels that counts as an edge
+TEXT_EDGE_DENSITY = 0.18
+TEXT_LUMA_RANGE = 110
+COLOR_LEVELS = 4            # per channel, so 64 colour bins
+BATCH_SIZE = 256            # images per feature pass (~250 KB of float32 each)
+NUMERIC_FEATURES = ('brightness', 'contrast', 'colorfulness', 'edge_density', 'text_area', 'dominant_share')
+
+
+def thumbnail_url(item, size='medium'):
+    """URL of a video/search item's thumbnail in `size`, falling back to any size"""
+    thumbs = item.get('snippet', {}).get('thumbnails', {})
+    thumb = thumbs.get(size) or next(iter(thumbs.values()), None)
+    return thumb.get('url') if thumb else None
+
+
+class ThumbnailCache:
+    """Raw thumbnail bytes on disk, one file per video ID (thumbnails rarely change)"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, video_id):
+        # Two-character fan-out keeps directories small for large corpora
+        return os.path.join(self.root, video_id[:2], f"{video_id}.jpg")
+
+    def get(self, video_id):
+        try:
+            with open(self.path(video_id), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, video_id, data):
+        path = self.path(video_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+async def download_thumbnails(targets, concurrency=CONCURRENCY):
+    """{video_id: bytes} for (video_id, url) pairs, at most `concurrency` downloads at a time; failures are left out"""
+    session = await _get_session()
+    limit = asyncio.Semaphore(concurrency)
+    found = {}
+
+    async def fetch(video_id, url):
+        async with limit:
+            try:
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        found[video_id] = await resp.read()
+            except Exception:
+                pass
+
+    await asyncio.gather(*(fetch(video_id, url) for video_id, url in targets))
+    return found
+
+
+def load_thumbnails(targets, cache):
+    """{video_id: bytes}: from the disk cache where possible, the rest downloaded concurrently and cached"""
+    found = {}
+    missing = []
+    for video_id, url in targets:
+        data = cache.get(video_id)
+        if data is not None:
+            found[video_id] = data
+        elif url:
+            missing.append((video_id, url))
+    if missing:
+        downloaded = run(download_thumbnails(missing))
+        for video_id, data in downloaded.items():
+            cache.put(video_id, data)
+        found.update(downloaded)
+    return found
+
+
+def decode(data, size=FEATURE_SIZE):
+    """JPEG/PNG/WebP bytes -> H x W x 3 uint8 array at `size`, or None if unreadable"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return np.asarray(img.convert('RGB').resize(size, Image.BILINEAR), dtype=np.uint8)
+    except Exception:
+        return None
+
+
+def _hex(bin_index):
+    """Centre colour of a COLOR_LEVELS^3 bin as #rrggbb"""
+    step = 256 // COLOR_LEVELS
+    r, g, b = (bin_index // (COLOR_LEVELS * COLOR_LEVELS), (bin_index // COLOR_LEVELS) % COLOR_LEVELS, bin_index % COLOR_LEVELS)
+    return '#' + ''.join(f"{c * step + step // 2:02x}" for c in (r, g, b))
+
+
+def extract_features(images):
+    """
+    Feature table for an N x H x W x 3 uint8 batch (all images the same size).
+    Scalar features are 0-1 except colourfulness (Hasler-Suesstrunk, roughly 0-150).
+    """
+    pixels = images.astype(np.float32)
+    n, h, w, _ = pixels.shape
+    red, green, blue = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    luma = 0.299 * red + 0.587 * green + 0.114 * blue
+
+    brightness = luma.mean(axis=(1, 2)) / 255
+    contrast = luma.std(axis=(1, 2)) / 255
+
+    rg = red - green
+    yb = 0.5 * (red + green) - blue
+    colorfulness = (np.sqrt(rg.std(axis=(1, 2)) ** 2 + yb.std(axis=(1, 2)) ** 2)
+                    + 0.3 * np.sqrt(rg.mean(axis=(1, 2)) ** 2 + yb.mean(axis=(1, 2)) ** 2))
+
+    # Edges: strong luma steps to the right or below each pixel
+    edges = np.zeros((n, h, w), dtype=bool)
+    edges[:, :, :-1] |= np.abs(np.diff(luma, axis=2)) > EDGE_THRESHOLD
+    edges[:, :-1, :] |= np.abs(np.diff(luma, axis=1)) > EDGE_THRESHOLD
+    edge_density = edges.mean(axis=(1, 2))
+
+    # Text-like blocks: many edges and a wide luma range inside one block
+    bh, bw = h // BLOCK, w // BLOCK
+    block_edges = edges[:, :bh * BLOCK, :bw * BLOCK].reshape(n, bh, BLOCK, bw, BLOCK).mean(axis=(2, 4))
+    block_luma = luma[:, :bh * BLOCK, :bw * BLOCK].reshape(n, bh, BLOCK, bw, BLOCK)
+    block_range = block_luma.max(axis=(2, 4)) - block_luma.min(axis=(2, 4))
+    text_area = ((block_edges > TEXT_EDGE_DENSITY) & (block_range > TEXT_LUMA_RANGE)).mean(axis=(1, 2))
+
+    # Dominant colours: one bincount over every image at once (bins offset per image)
+    quantized = (images // (256 // COLOR_LEVELS)).astype(np.int64)
+    bins = quantized[..., 0] * COLOR_LEVELS ** 2 + quantized[..., 1] * COLOR_LEVELS + quantized[..., 2]
+    n_bins = COLOR_LEVELS ** 3
+    offsets = (np.arange(n) * n_bins)[:, None, None]
+    counts = np.bincount((bins + offsets).ravel(), minlength=n * n_bins).reshape(n, n_bins)
+    top = np.argsort(-counts, axis=1, kind='stable')[:, :3]
+    top_counts = np.take_along_axis(counts, top, axis=1)
+    shares = top_counts / (h * w)
+
+    return pd.DataFrame({
+        'brightness': brightness.astype(np.float64).round(3),
+        'contrast': contrast.astype(np.float64).round(3),
+        'colorfulness': colorfulness.astype(np.float64).round(1),
+        'edge_density': edge_density.astype(np.float64).round(3),
+        'text_area': text_area.astype(np.float64).round(3),
+        'dominant_colors': [
+            [_hex(int(b)) for b, count in zip(row, row_counts) if count]
+            for row, row_counts in zip(top, top_counts)
+        ],
+        'dominant_share': shares[:, 0].round(3),
+    })
+
+
+def thumbnail_features(items, cache=None, size='medium'):
+    """
+    Feature table (indexed by video ID) for videos#video items; videos whose thumbnail
+    can't be fetched or decoded are left out.
+    """
+    cache = cache or ThumbnailCache()
+    targets = [(item['id'], thumbnail_url(item, size)) for item in items if isinstance(item.get('id'), str)]
+    blobs = load_thumbnails(targets, cache)
+
+    video_ids, images = [], []
+    for video_id, _ in targets:
+        image = decode(blobs[video_id]) if video_id in blobs else None
+        if image is not None:
+            video_ids.append(video_id)
+            images.append(image)
+    if not images:
+        return pd.DataFrame(columns=[*NUMERIC_FEATURES, 'dominant_colors'], index=pd.Index([], name='video_id'))
+    features = pd.concat([
+        extract_features(np.stack(images[start:start + BATCH_SIZE]))
+        for start in range(0, len(images), BATCH_SIZE)
+    ], ignore_index=True)
+    features.index = pd.Index(video_ids, name='video_id')
+    return features
+
+
+def correlate_with_views(features, views):
+    """
+    Spearman correlation of every numeric feature with views (a Series by video ID),
+    strongest first. Rank-based, so a single viral outlier doesn't dominate.
+    """
+    joined = features[list(NUMERIC_FEATURES)].join(views.rename('views'), how='inner').dropna()
+    if len(joined) < 3:
+        return pd.Series(dtype='float64')
+    corr = joined.corr(method='spearman')['views'].drop('views').dropna()
+    return corr.reindex(corr.abs().sort_values(ascending=False).index).round(2)
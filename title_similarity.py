@@ -0,0 +1,113 @@
+"""TF-IDF similarity of draft titles against the competitor titles for a keyword."""
+import re
+import math
+import time
+import threading
+import numpy as np
+from collections import Counter, OrderedDict
+
+from seo import STOP_WORDS
+
+TOKEN_RE = re.compile(r'\w+')
+MODEL_TTL = 3600
+MODEL_CACHE_SIZE = 128
+
+
+def tokenize(title):
+    """Unigrams + bigrams, stop words dropped"""
+    words = [w for w in TOKEN_RE.findall(title.lower()) if w not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class CompetitorModel:
+    """
+    Competitor titles as an L2-normalized TF-IDF matrix in CSR form
+    (indptr / indices / data), with the IDF table learned from those titles.
+    """
+
+    def __init__(self, competitor_titles):
+        self.titles = [t for t in competitor_titles if t]
+        docs = [Counter(tokenize(t)) for t in self.titles]
+
+        df = Counter(term for doc in docs for term in doc)
+        self.vocab = {term: i for i, term in enumerate(sorted(df))}
+        n_docs = len(docs)
+        # Smoothed IDF (same formula as scikit-learn's default)
+        self.idf = np.array(
+            [math.log((1 + n_docs) / (1 + df[term])) + 1 for term in sorted(df)],
+            dtype=np.float32
+        )
+
+        indptr = [0]
+        indices = []
+        data = []
+        for doc in docs:
+            cols = [self.vocab[term] for term in doc]
+            weights = np.array([doc[term] for term in doc], dtype=np.float32) * self.idf[cols]
+            norm = np.linalg.norm(weights)
+            indices.extend(cols)
+            data.extend((weights / norm) if norm else weights)
+            indptr.append(len(indices))
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.data = np.array(data, dtype=np.float32)
+        self.created_at = time.time()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def transform(self, drafts):
+        """Dense (len(drafts) × vocab) TF-IDF rows; terms unseen in competitors are ignored"""
+        matrix = np.zeros((len(drafts), len(self.vocab)), dtype=np.float32)
+        for row, draft in enumerate(drafts):
+            for term, count in Counter(tokenize(draft)).items():
+                col = self.vocab.get(term)
+                if col is not None:
+                    matrix[row, col] = count * self.idf[col]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def similarity_matrix(self, drafts):
+        """Cosine similarities (len(drafts) × competitors) from one sparse × dense product"""
+        if not self.titles or not drafts or not len(self.indices):
+            return np.zeros((len(drafts), len(self.titles)), dtype=np.float32)
+        queries = self.transform(drafts)
+        # Each stored entry multiplies its column of every query, then reduceat sums per competitor row
+        products = self.data[:, None] * queries[:, self.indices].T
+        sims = np.zeros((len(self.titles), len(drafts)), dtype=np.float32)
+        non_empty = np.diff(self.indptr) > 0
+        sims[non_empty] = np.add.reduceat(products, self.indptr[:-1][non_empty], axis=0)
+        return sims.T
+
+    def max_similarity(self, drafts):
+        """Best competitor match per draft"""
+        sims = self.similarity_matrix(drafts)
+        return sims.max(axis=1) if sims.size else np.zeros(len(drafts), dtype=np.float32)
+
+    def top_matches(self, draft, top_n=5):
+        """[(competitor title, similarity)] most similar first"""
+        sims = self.similarity_matrix([draft])[0]
+        order = np.argsort(-sims)[:top_n]
+        return [(self.titles[i], float(sims[i])) for i in order]
+
+
+_MODEL_CACHE = OrderedDict()
+_MODEL_LOCK = threading.Lock()
+
+
+def competitor_model(keyword, region, competitor_titles, ttl=MODEL_TTL):
+    """CompetitorModel for a keyword/region, reused until it is `ttl` seconds old"""
+    key = (keyword.strip().lower(), region)
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is not None and time.time() - model.created_at < ttl:
+            _MODEL_CACHE.move_to_end(key)
+            return model
+
+    model = CompetitorModel(competitor_titles)
+    with _MODEL_LOCK:
+        _MODEL_CACHE[key] = model
+        _MODEL_CACHE.move_to_end(key)
+        while len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+            _MODEL_CACHE.popitem(last=False)
+    return model
@@ -1,13 +1,43 @@
 import streamlit as st
+import os
 import re
+import sys
+import argparse
+import functools
+import tempfile
 import random
 import datetime
 import requests
-import statistics
 import pandas as pd
 from googleapiclient.discovery import build
 import json
+import time
 from collections import Counter
+import seo
+import resilience
+from seo import (
+    FALLBACK_POWER_WORDS, VIRAL_EMOJIS, extract_core_theme,
+    extract_keywords_from_title, generate_tags, generate_description, smart_truncate
+)
+from youtube_api import (
+    get_keyword_metrics as fetch_keyword_metrics, execute_cached, execute_measured, published_after, view_params,
+    ETAG_CACHE, PAYLOAD_STATS, YOUTUBE_BREAKER, KEY_POOL
+)
+from async_youtube import AsyncYouTubeClient, compare_keyword_regions, run, run_all, stream_keyword_metrics
+from suggestion_engine import SuggestionEngine
+from title_similarity import competitor_model
+from near_duplicates import NearDuplicateIndex
+from phrase_miner import PhraseMiner
+from cache_warmer import CacheWarmer, WARM_RESULTS, SEARCH_UNITS, load_config as load_warmup_config
+from comment_miner import COMMENT_DIGESTS, mine_comments, pick_videos
+from engagement import engagement_frame, engagement_rate, format_rate, summarize
+from thumbnails import ThumbnailCache, DEFAULT_CACHE_DIR as DEFAULT_THUMB_CACHE, correlate_with_views, thumbnail_features
+from session_store import KeywordResult, SessionLRU, SharedWordLists
+from corpus_index import CorpusIndex, DEFAULT_DB_PATH
+from jobs import JobRunner, JobStore, DEFAULT_JOBS_DB
+from watchlist import WatchlistStore, poll_watchlist, DEFAULT_WATCHLIST_DB, MAX_UPLOAD_PAGES, UPLOADS_PAGE_SIZE
+from exporters import StreamingExporter, EXPORT_FORMATS, export_filename
+from profiling import RerunProfiler, STAGES, active as profiling_active, section as profile_section, stage, staged
 
 # Note: google-generativeai will be imported dynamically when needed
 # Install with: pip install google-generativeai
@@ -15,6 +45,28 @@ from collections import Counter
 # --- 1. CONFIG ---
 st.set_page_config(page_title="YouTube VidIQ Clone", page_icon="🚀", layout="wide")
 
+# Script flags, e.g.: streamlit run vidiq.py -- --export-dir exports --export-format parquet
+def parse_cli_args():
+    parser = argparse.ArgumentParser(description="YouTube VidIQ Clone")
+    parser.add_argument("--export-dir", default=None, help="Write every keyword/audit/trend export to this folder")
+    parser.add_argument("--export-format", choices=list(EXPORT_FORMATS), default="csv", help="Default export format")
+    parser.add_argument("--profile-dir", default=None, help="Also write every profiled rerun to this folder as JSON")
+    args, _ = parser.parse_known_args(sys.argv[1:])
+    return args
+
+CLI_ARGS = parse_cli_args()
+EXPORT_DIR = CLI_ARGS.export_dir or os.path.join(tempfile.gettempdir(), "vidiq_exports")
+
+# Profiling mode (sidebar toggle): started before anything else so the whole rerun is covered
+_unfinished = st.session_state.pop('_rerun_profiler', None)
+if _unfinished is not None:
+    # The previous rerun was cut short (st.rerun / st.stop) before its report
+    _unfinished.stop()
+PROFILER = None
+if st.session_state.get('profiling_enabled'):
+    PROFILER = RerunProfiler(__file__, deterministic=st.session_state.get('profiling_mode') == "Deterministic").start()
+    st.session_state['_rerun_profiler'] = PROFILER
+
 # --- 2. CUSTOM STYLING ---
 st.markdown("""
 <style>
@@ -58,26 +110,27 @@ st.markdown("""
 
 # --- 3. DATABASE CONFIG ---
 URL_DATABASE_ONLINE = "https://gist.githubusercontent.com/rhanierex/f2d76f11df8d550376d81b58124d3668/raw/0b58a1eb02a7cffc2261a1c8d353551f3337001c/gistfile1.txt"
-FALLBACK_POWER_WORDS = ["secret", "best", "exposed", "tutorial", "guide", "how to", "tips", "tricks", "hacks", "ultimate", "complete", "full", "master", "proven", "amazing", "incredible", "perfect", "easy", "simple", "advanced"]
-VIRAL_EMOJIS = ["🔥", "😱", "🔴", "✅", "❌", "🎵", "⚠️", "⚡", "🚀", "💰", "💯", "🤯", "😭", "😡", "😴", "🌙", "✨", "💤", "🌧️", "🎹", "👀", "💪", "🎯", "⭐", "🏆"]
-STOP_WORDS = {"the", "and", "or", "for", "to", "in", "on", "at", "by", "with", "a", "an", "is", "it", "of", "that", "this", "video", "i", "you", "me", "we", "my", "your"}
 
 # --- 4. GEMINI API INTEGRATION ---
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def get_power_words_from_gemini(api_key, niche="general"):
+# Status of a power-word list served from the warm-up cache instead of the user's key
+GEMINI_PREFETCHED = "🟢 Gemini AI (prefetched)"
+
+@st.cache_resource
+def get_gemini_breaker():
+    """Shared circuit breaker: stop calling Gemini for a while after repeated failures"""
+    return resilience.CircuitBreaker('Gemini API', failure_threshold=3, reset_after=60)
+
+@st.cache_data(ttl=3600)  # Cache for 1 hour (successes only: errors are raised, never cached)
+def fetch_power_words_from_gemini(api_key, niche="general"):
     """
     Get trending power words from Gemini API based on niche
     """
-    if not api_key or len(api_key) < 30:
-        return None, "Invalid API Key"
+    import google.generativeai as genai
     
-    try:
-        import google.generativeai as genai
-        
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        
-        prompt = f"""Generate 30 powerful, high-CTR words for YouTube video titles in the {niche} niche.
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel('gemini-pro')
+    
+    prompt = f"""Generate 30 powerful, high-CTR words for YouTube video titles in the {niche} niche.
         
 Requirements:
 - Words must be proven to increase click-through rates
@@ -88,25 +141,43 @@ Requirements:
 Example format: ["ULTIMATE", "SECRET", "EXPOSED", "PROVEN", "SHOCKING"]
 
 Generate 30 words now:"""
-        
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        
-        # Extract JSON array
-        import json
-        # Remove markdown code blocks if present
-        text = text.replace('```json', '').replace('```', '').strip()
-        
-        words = json.loads(text)
-        
-        if isinstance(words, list) and len(words) > 0:
-            return words, "🟢 Gemini AI"
-        else:
-            return None, "Invalid response"
-            
+    
+    response = resilience.call(
+        lambda: model.generate_content(prompt, request_options={'timeout': 30}),
+        get_gemini_breaker(), attempts=3, deadline=45
+    )
+    text = response.text.strip()
+    
+    # Remove markdown code blocks if present
+    text = text.replace('```json', '').replace('```', '').strip()
+    
+    words = json.loads(text)
+    
+    if not isinstance(words, list) or len(words) == 0:
+        raise ValueError("Invalid response")
+    return words
+
+def get_power_words_from_gemini(api_key, niche="general"):
+    """
+    (words, status) or (None, error message). A list the warm-up already fetched comes
+    back as "prefetched": it was generated with the team's key, this key wasn't checked.
+    """
+    if not api_key or len(api_key) < 30:
+        return None, "Invalid API Key"
+    
+    warm = WARM_RESULTS.get('power_words', niche)
+    if warm is not None:
+        return warm, GEMINI_PREFETCHED
+    try:
+        return fetch_power_words_from_gemini(api_key, niche), "🟢 Gemini AI"
     except Exception as e:
         return None, f"Error: {str(e)}"
 
+@st.cache_resource
+def get_shared_word_lists():
+    """Power-word lists shared by reference across all sessions"""
+    return SharedWordLists()
+
 @st.cache_data(ttl=600) 
 def load_power_words(url):
     """Load power words from GitHub Gist"""
@@ -120,498 +191,364 @@ def load_power_words(url):
         pass
     return FALLBACK_POWER_WORDS, "🟠 Offline Fallback"
 
-# Initialize power words database
-POWER_WORDS_DB, db_status = load_power_words(URL_DATABASE_ONLINE)
+# Initialize power words database (st.cache_data hands out a fresh copy per call, so intern it)
+power_words_loaded, db_status = load_power_words(URL_DATABASE_ONLINE)
+POWER_WORDS_DB = get_shared_word_lists().share(power_words_loaded)
 
-# --- 5. HELPER FUNCTIONS ---
-def calculate_engagement_rate(stats):
-    """Calculate video engagement rate"""
+# Local corpus of every video fetched (searchable offline at zero quota cost)
+@st.cache_resource
+def get_corpus_index():
+    """One shared SQLite FTS5 connection per server process"""
+    return CorpusIndex(DEFAULT_DB_PATH)
+
+@staged('parse')
+def index_fetched_items(items, source, query="", region=""):
+    """Persist fetched videos into the corpus; indexing problems never break a tab"""
     try:
-        views = int(stats.get('viewCount', 0))
-        likes = int(stats.get('likeCount', 0))
-        comments = int(stats.get('commentCount', 0))
-        if views == 0:
-            return 0
-        engagement = ((likes + comments) / views) * 100
-        return round(engagement, 2)
-    except:
-        return 0
+        get_corpus_index().add_items(items, source, query, region)
+    except Exception:
+        pass
 
-def extract_core_theme(title, keyword):
-    """
-    FIXED: Extract the ACTUAL theme/context from the title
-    This preserves the original meaning while removing only the keyword
-    """
-    if not title:
-        return ""
-    
-    # Remove keyword but keep the rest intact
-    if keyword:
-        # Case-insensitive removal
-        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-        core = pattern.sub("", title).strip()
-    else:
-        core = title
-    
-    # Clean up extra spaces and punctuation
-    core = re.sub(r'\s+', ' ', core)
-    core = re.sub(r'^[:\-\|,\.\s]+', '', core)
-    core = re.sub(r'[:\-\|,\.\s]+$', '', core)
-    
-    # If nothing left, extract meaningful words from original title
-    if not core or len(core) < 3:
-        # Extract meaningful words (skip stop words and keyword)
-        words = re.findall(r'\b\w+\b', title.lower())
-        meaningful = [w for w in words if w not in STOP_WORDS and (not keyword or w != keyword.lower())]
-        
-        if meaningful:
-            # Take first 3-5 meaningful words
-            core = ' '.join(meaningful[:5])
-        else:
-            core = "Guide"
-    
-    return core.strip()
-
-def smart_truncate(text, max_length):
-    """Smart text truncation at word boundaries"""
-    if not text or len(text) <= max_length:
-        return text
-    
-    truncated = text[:max_length-3]
-    last_space = truncated.rfind(' ')
-    if last_space > 0:
-        truncated = truncated[:last_space]
-    return truncated + "..."
-
-def extract_keywords_from_title(title, top_n=5):
-    """Extract important keywords from title"""
-    if not title:
-        return []
-    words = re.findall(r'\b[a-z]{3,}\b', title.lower())
-    filtered = [w for w in words if w not in STOP_WORDS]
-    counter = Counter(filtered)
-    return [word for word, _ in counter.most_common(top_n)]
-
-def generate_tags(title, keyword, competitor_tags=None):
-    """Generate SEO-optimized tags"""
-    if not title:
-        return [keyword.lower()] if keyword else []
-    
-    tags = set()
-    year = datetime.datetime.now().year
-    
-    # Add main keyword
-    if keyword:
-        tags.add(keyword.lower())
-        tags.add(f"{keyword.lower()} {year}")
-        
-        # Add keyword variations
-        kw_words = keyword.lower().split()
-        if len(kw_words) > 1:
-            tags.add(kw_words[0])
-            tags.add(' '.join(kw_words[:2]))
-    
-    # Extract from title
-    clean_title = re.sub(r'[^\w\s]', '', title.lower())
-    words = clean_title.split()
-    
-    for word in words:
-        if word not in STOP_WORDS and len(word) > 2:
-            tags.add(word)
-            if len(tags) >= 12:
-                break
-    
-    # Add competitor tags
-    if competitor_tags:
-        for tag in competitor_tags[:5]:
-            if len(tags) < 18:
-                tags.add(tag.lower())
-    
-    # Add common variations
-    if keyword:
-        tags.add(f"{keyword.lower()} tutorial")
-        tags.add(f"how to {keyword.lower()}")
-    
-    return list(tags)[:20]
-
-def generate_description(title, keyword, tags, video_length="10:00"):
-    """Generate SEO-optimized description"""
-    year = datetime.datetime.now().year
-    month = datetime.datetime.now().strftime("%B")
-    
+# Shared YouTube keys: [youtube] api_keys = ["AIza...", ...] in .streamlit/secrets.toml
+@st.cache_resource
+def load_key_pool():
+    """Adds the keys from secrets to the process-wide pool (once per server process)"""
     try:
-        duration_mins = int(video_length.split(':')[0])
-    except:
-        duration_mins = 10
-    
-    tag_text = ', '.join(tags[:5]) if tags else keyword
-    hashtags = ' '.join([f"#{tag.replace(' ', '')}" for tag in tags[:5]]) if tags else f"#{keyword.replace(' ', '')}"
-    
-    return f"""🎬 {title}
+        keys = st.secrets["youtube"]["api_keys"]
+    except Exception:
+        keys = []
+    KEY_POOL.add(keys)
+    return KEY_POOL
 
-📌 **About This Video:**
-In this comprehensive {video_length} video, we dive deep into **{keyword}**. Whether you're a beginner or looking to advance your skills, this {year} guide will help you master {keyword}.
+# Background jobs keep running across reruns, sessions and widget interactions
+@st.cache_resource
+def get_job_runner():
+    """Process-wide job runner; jobs left over from a previous process come back as interrupted"""
+    return JobRunner(JobStore(DEFAULT_JOBS_DB), on_items=get_corpus_index().add_items)
 
-⏱️ **Timestamps:**
-0:00 - Introduction
-0:45 - What is {keyword}?
-2:30 - Step-by-step {keyword} tutorial
-{max(duration_mins-3, 5)}:00 - Pro tips and advanced techniques
-{max(duration_mins-2, 7)}:00 - Common mistakes to avoid
-{max(duration_mins-1, 9)}:00 - Conclusion & next steps
+# Competitor watchlist (also polled headless by `python watchlist.py run`)
+@st.cache_resource
+def get_watchlist_store():
+    """Shared watchlist database connection"""
+    return WatchlistStore(DEFAULT_WATCHLIST_DB)
 
-🔥 **What You'll Learn:**
-✅ Complete {keyword} fundamentals
-✅ Practical examples and demonstrations
-✅ Expert insights and strategies
-✅ Proven techniques that work in {year}
+# Downloaded thumbnails, kept on disk by video ID (VIDIQ_THUMB_CACHE)
+@st.cache_resource
+def get_thumbnail_cache():
+    return ThumbnailCache(DEFAULT_THUMB_CACHE)
 
-💡 **Related Topics:**
-{tag_text}
+# --- 5. HELPER FUNCTIONS ---
+# Scoring rubric & generators live in seo.py, YouTube fetching in youtube_api.py
+def current_power_words():
+    """Power words for this session: Gemini list if generated, else the shared DB"""
+    return st.session_state.get('power_words', POWER_WORDS_DB)
 
-🔔 **Don't Forget to:**
-• SUBSCRIBE for more {keyword} content
-• LIKE if this video helped you
-• COMMENT your questions below
-• SHARE with anyone who needs this
+@staged('score')
+def analyze_title(title, keyword=""):
+    """Comprehensive title SEO analysis with the session's power words"""
+    return seo.analyze_title(title, keyword, current_power_words())
 
-📱 **Connect With Us:**
-[Add your social media links here]
+@st.cache_resource(max_entries=16)
+def get_suggestion_engine(power_words):
+    """One compiled engine per power-word list (passed as a tuple so it can be cached)"""
+    return SuggestionEngine(list(power_words))
 
-{hashtags}
+@staged('score')
+def suggest_titles(original_title, keyword, competitor_titles=None, top_k=5, similarity_model=None):
+    """Best-scoring title candidates for the session's power words"""
+    engine = get_suggestion_engine(tuple(current_power_words()))
+    return engine.suggest(original_title, keyword, competitor_titles, top_k=top_k, similarity_model=similarity_model)
 
----
-© {year} | {keyword.title()} Tutorial | All Rights Reserved
-"""
+def session_results():
+    """This session's LRU of recent analyses (byte-budgeted, oldest evicted first)"""
+    if 'analysis_cache' not in st.session_state:
+        st.session_state['analysis_cache'] = SessionLRU()
+    return st.session_state['analysis_cache']
 
-def generate_smart_suggestions(original_title, keyword, api_key=None, competitor_data=None):
+def get_keyword_metrics(api_key, keyword, on_progress=None):
     """
-    FIXED: Generate suggestions that PRESERVE the original title's theme
+    Keyword metrics as a compact KeywordResult; fetched videos are added to the local corpus
+    and recent analyses are reused from the session cache. With `on_progress`, results are
+    streamed (search snippets first, statistics as they land) instead of fetched in one go.
     """
-    suggestions = []
-    year = datetime.datetime.now().year
-    
-    # Get current power words (from Gemini AI or default)
-    if 'power_words' in st.session_state:
-        power_words_list = st.session_state['power_words']
+    cache_key = ('keyword', keyword.strip().lower(), 'ID')
+    cached = session_results().get(cache_key)
+    if cached is not None:
+        return cached, None
+    warm = WARM_RESULTS.get('keyword', keyword)
+    if warm is not None:
+        session_results().put(cache_key, warm)
+        return warm, None
+    
+    if on_progress:
+        data, err = stream_keyword_metrics(api_key, keyword, on_items=index_fetched_items, on_progress=on_progress)
     else:
-        power_words_list = POWER_WORDS_DB
+        data, err = fetch_keyword_metrics(api_key, keyword, on_items=index_fetched_items)
+    if err:
+        return None, err
+    result = KeywordResult(keyword, 'ID', data)
+    session_results().put(cache_key, result)
+    return result, None
+
+# Markets the keyword comparison offers (YouTube regionCode); ID is the main analysis
+REGION_CODES = ['ID', 'MY', 'SG', 'PH', 'TH', 'VN', 'IN', 'JP', 'KR', 'US', 'GB', 'AU', 'CA', 'DE', 'FR', 'BR', 'MX']
+
+def compare_regions(api_key, keyword, regions):
+    """
+    ({region: (KeywordResult, error)}, fetch counts) for several regions. Regions already
+    in the session cache (e.g. the main ID analysis) cost nothing; the rest are fetched
+    together and cached per region.
+    """
+    results = {}
+    for region in regions:
+        cached = session_results().get(('keyword', keyword.strip().lower(), region))
+        if cached is not None:
+            results[region] = (cached, None)
+    missing = [region for region in regions if region not in results]
+    
+    fetched, counts = compare_keyword_regions(api_key, keyword, missing, on_items=index_fetched_items)
+    if fetched is None:
+        # Nothing reached YouTube: every missing region gets the same error
+        fetched = {region: (None, counts) for region in missing}
+        counts = {}
+    for region, (data, err) in fetched.items():
+        if data is None:
+            results[region] = (None, err)
+            continue
+        result = KeywordResult(keyword, region, data)
+        session_results().put(('keyword', keyword.strip().lower(), region), result)
+        results[region] = (result, None)
+    return {region: results[region] for region in regions}, counts
+
+def region_matrix(results):
+    """Region x metric table for the comparison view"""
+    rows = []
+    for region, (data, err) in results.items():
+        if data is None:
+            rows.append({'Region': region, 'Error': err})
+            continue
+        rows.append({
+            'Region': region,
+            'Median Views': int(data.median_views),
+            'Avg Views': int(data.avg_views),
+            'Competition': data.difficulty,
+            'Opportunity': data.score,
+            'Avg Engagement': format_rate(data.avg_engagement),
+            'Best Hour (UTC)': "–" if data.best_hour is None else f"{data.best_hour:02d}:00",
+            'Videos': data.total_videos,
+            'Error': ''
+        })
+    frame = pd.DataFrame(rows).set_index('Region')
+    if not frame['Error'].astype(bool).any():
+        frame = frame.drop(columns='Error')
+    return frame
+
+def render_region_comparison(api_key, keyword, regions, refresh=False):
+    """Region x metric matrix for one keyword (fetched again only on refresh)"""
+    st.divider()
+    st.markdown(f"### 🌍 '{keyword}' Across {len(regions)} Regions")
+    with st.spinner(f"🔄 Searching {len(regions)} regions..."):
+        region_view = session_view(
+            'region_view', (keyword, tuple(regions)), lambda: compare_regions(api_key, keyword, regions), refresh=refresh
+        )
+        results, counts = region_view['result']
+    
+    matrix = region_matrix(results)
+    st.dataframe(matrix)
+    if counts.get('searches'):
+        st.caption(
+            f"♻️ {counts['searches']} searches found {counts['videos']} videos, {counts['distinct']} distinct: "
+            f"{counts['fetched']} fetched, {counts['cached']} reused from earlier searches"
+        )
+    if 'Median Views' in matrix and matrix['Median Views'].notna().any():
+        st.bar_chart(matrix['Median Views'].dropna())
     
-    # Extract the ACTUAL theme from the original title
-    theme = extract_core_theme(original_title, keyword)
+    export_on_demand(region_view, 'regions', keyword, "region comparison", "dl_regions",
+                     lambda exporter: exporter.write_frame(matrix.reset_index()))
+
+def render_comment_insights(api_key, keyword, top_videos, refresh=False):
+    """Phrases and questions from the comments of a keyword's most viewed videos (read again only on refresh)"""
+    st.divider()
+    st.markdown(f"### 💬 What Viewers Say About '{keyword}'")
+    targets = pick_videos(top_videos)
+    with st.spinner(f"🔄 Reading comments of {len(targets)} top videos..."):
+        comments_view = session_view(
+            'comments_view', (keyword, tuple(targets)), lambda: mine_comments(api_key, targets), refresh=refresh
+        )
+        insights, err = comments_view['result']
+    if err:
+        st.error(err)
+        return
     
-    # If theme is empty or generic, use extracted keywords
-    if not theme or theme.lower() in ['guide', 'tutorial', 'video']:
-        theme_words = extract_keywords_from_title(original_title, top_n=3)
-        if theme_words:
-            theme = ' '.join(theme_words[:3])
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Comments Read", f"{insights['comments']:,}")
+    c2.metric("Questions Asked", f"{insights['questions_asked']:,}")
+    c3.metric("Videos", insights['videos'])
+    notes = [f"♻️ {insights['cached']} videos reused (no new comments since last read)"] if insights['cached'] else []
+    if insights['failed']:
+        notes.append(f"⚠️ {insights['failed']} videos failed")
+    if insights['disabled']:
+        notes.append(f"🔇 {insights['disabled']} videos have comments turned off")
+    if notes:
+        st.caption(" · ".join(notes))
+    
+    col_phrases, col_questions = st.columns([1, 2])
+    with col_phrases:
+        st.markdown("#### 🗣️ Recurring Phrases")
+        st.dataframe(insights['phrases'], hide_index=True)
+    with col_questions:
+        st.markdown("#### ❓ Top Viewer Questions")
+        if insights['questions'].empty:
+            st.info("No questions found in the comments read")
         else:
-            theme = "Complete Guide"
-    
-    # Analyze competitor patterns
-    power_word = random.choice(power_words_list).upper()
-    number = random.choice(['5', '7', '10'])
-    emoji = random.choice(VIRAL_EMOJIS)
-    
-    if competitor_data and len(competitor_data) > 0:
-        top_title = competitor_data[0].get('title', '')
-        
-        # Extract numbers from top videos
-        numbers = re.findall(r'\d+', top_title)
-        if numbers:
-            number = numbers[0]
-        
-        # Find power words in competitor titles
-        for word in power_words_list:
-            if word.lower() in top_title.lower():
-                power_word = word.upper()
-                break
-    
-    # Ensure theme fits within length limits
-    # Calculate space for other elements
-    
-    # FORMULA 1: Keyword-First with Theme
-    # Template: "{Keyword}: {Theme} - {Power} {Year} {Emoji}"
-    extra_1 = len(keyword) + len(power_word) + len(str(year)) + len(emoji) + 10
-    allowed_theme_1 = 100 - extra_1
-    theme_1 = smart_truncate(theme.title(), allowed_theme_1)
-    sug1 = f"{keyword.title()}: {theme_1} - {power_word} {year} {emoji}"
-    suggestions.append(sug1)
-    
-    # FORMULA 2: Number Hook with Theme
-    # Template: "{Number} {Keyword} {Theme} You Need ({Year}) {Emoji}"
-    extra_2 = len(number) + len(keyword) + len(str(year)) + len(emoji) + 15
-    allowed_theme_2 = 100 - extra_2
-    theme_2 = smart_truncate(theme.title(), allowed_theme_2)
-    sug2 = f"{number} {keyword.title()} {theme_2} You Need ({year}) {emoji}"
-    suggestions.append(sug2)
-    
-    # FORMULA 3: How-To Format with Theme
-    # Template: "How to {Keyword}: {Theme} {Emoji} [{Year} {Power}]"
-    extra_3 = len(keyword) + len(power_word) + len(str(year)) + len(emoji) + 18
-    allowed_theme_3 = 100 - extra_3
-    theme_3 = smart_truncate(theme, allowed_theme_3)
-    sug3 = f"How to {keyword.title()}: {theme_3} {emoji} [{year} {power_word}]"
-    suggestions.append(sug3)
-    
-    # FORMULA 4: Theme-First Approach
-    # Template: "{Theme} - {Keyword} {Power} Guide {Year} {Emoji}"
-    extra_4 = len(keyword) + len(power_word) + len(str(year)) + len(emoji) + 12
-    allowed_theme_4 = 100 - extra_4
-    theme_4 = smart_truncate(theme.title(), allowed_theme_4)
-    sug4 = f"{theme_4} - {keyword.title()} {power_word} Guide {year} {emoji}"
-    suggestions.append(sug4)
-    
-    # FORMULA 5: Power Word First with Theme
-    # Template: "{Power} {Keyword} {Theme} | {Year} Tutorial {Emoji}"
-    extra_5 = len(keyword) + len(power_word) + len(str(year)) + len(emoji) + 15
-    allowed_theme_5 = 100 - extra_5
-    theme_5 = smart_truncate(theme, allowed_theme_5)
-    sug5 = f"{power_word} {keyword.title()} {theme_5} | {year} Tutorial {emoji}"
-    suggestions.append(sug5)
-    
-    return suggestions
+            st.dataframe(insights['questions'][['Question', 'Likes']], hide_index=True)
+            st.caption("💡 Questions many viewers like are ready-made titles and video ideas")
 
-def analyze_title(title, keyword=""):
-    """Comprehensive title SEO analysis"""
-    score = 0
-    checks = []
-    
-    # Get current power words
-    if 'power_words' in st.session_state:
-        power_words_list = st.session_state['power_words']
-    else:
-        power_words_list = POWER_WORDS_DB
-    
-    if not title:
-        return 0, [("error", "Title is empty")]
-    
-    title_len = len(title)
-    
-    # 1. Length Analysis (25 points)
-    if 40 <= title_len <= 70:
-        score += 25
-        checks.append(("success", f"✅ Perfect Length ({title_len} chars) - Ideal for SEO"))
-    elif 30 <= title_len <= 90:
-        score += 20
-        checks.append(("warning", f"⚠️ Good Length ({title_len} chars) - Can be optimized"))
-    elif title_len < 30:
-        score += 10
-        checks.append(("error", f"❌ Too Short ({title_len} chars) - Add more details"))
-    else:
-        score += 5
-        checks.append(("error", f"❌ Too Long ({title_len} chars) - Will be truncated"))
-    
-    # 2. Keyword Analysis (20 points)
-    if keyword:
-        kw_lower = keyword.lower()
-        title_lower = title.lower()
-        
-        if kw_lower in title_lower:
-            # Check position
-            position = title_lower.find(kw_lower)
-            title_start = re.sub(r'^[^a-zA-Z0-9]+', '', title_lower).strip()
-            
-            if title_start.startswith(kw_lower):
-                score += 20
-                checks.append(("success", "✅ Keyword at Beginning - Perfect for SEO!"))
-            elif position < 30:
-                score += 15
-                checks.append(("success", "✅ Keyword in First Half - Good placement"))
-            else:
-                score += 10
-                checks.append(("warning", "⚠️ Keyword Present - Move closer to start"))
+def live_keyword_table(placeholder):
+    """on_progress callback: titles & channels right after the search, views/engagement as statistics arrive"""
+    rows = {}
+    
+    def on_progress(event, payload):
+        if event == 'snippets':
+            for row in payload:
+                rows.setdefault(row['video_id'], {
+                    'Title': row['Title'], 'Channel': row['Channel'], 'Date': row['Date'],
+                    'Views': None, 'Engagement': None
+                })
         else:
-            checks.append(("error", "❌ Keyword Missing - Critical for ranking!"))
-    else:
-        score += 20
-    
-    # 3. Power Words (15 points) - Using current database
-    found_power = [pw for pw in power_words_list if pw.lower() in title.lower()]
-    if found_power:
-        score += 15
-        checks.append(("success", f"✅ Power Words: {', '.join(found_power[:2])}"))
-    else:
-        checks.append(("warning", "⚠️ No Power Words - Add 'BEST', 'ULTIMATE', etc."))
-    
-    # 4. Numbers (15 points)
-    numbers = re.findall(r'\d+', title)
-    if numbers:
-        score += 15
-        checks.append(("success", f"✅ Numbers: {', '.join(numbers)} - Boosts CTR by 36%"))
-    else:
-        checks.append(("info", "💡 Add Numbers - Proven to increase clicks"))
-    
-    # 5. Emoji (10 points)
-    emojis = [e for e in VIRAL_EMOJIS if e in title]
-    if emojis:
-        score += 10
-        checks.append(("success", f"✅ Emoji: {' '.join(emojis)} - Eye-catching"))
-    else:
-        checks.append(("info", "💡 Add Emoji - Increases visibility"))
-    
-    # 6. Engagement Elements (15 points)
-    engagement_score = 0
-    
-    # Check for brackets/parentheses
-    if '[' in title or '(' in title:
-        engagement_score += 5
-        checks.append(("success", "✅ Brackets Used - Adds context"))
-    
-    # Check for question mark
-    if '?' in title:
-        engagement_score += 5
-        checks.append(("success", "✅ Question Format - Creates curiosity"))
-    
-    # Check for year
-    current_year = str(datetime.datetime.now().year)
-    if current_year in title:
-        engagement_score += 5
-        checks.append(("success", f"✅ Current Year ({current_year}) - Shows freshness"))
-    
-    # Penalty for all caps
-    if title.isupper():
-        engagement_score -= 10
-        checks.append(("error", "❌ ALL CAPS - Looks spammy"))
-    
-    score += min(engagement_score, 15)
-    
-    return min(score, 100), checks
+            for item in payload:
+                row = rows.get(item['id'])
+                if row is not None:
+                    stats = item.get('statistics', {})
+                    row['Views'] = int(stats.get('viewCount', 0))
+                    row['Engagement'] = engagement_rate(stats)
+        loaded = sum(1 for row in rows.values() if row['Views'] is not None)
+        with placeholder.container():
+            st.caption(f"⏳ Statistics {loaded}/{len(rows)} videos")
+            st.dataframe(pd.DataFrame(list(rows.values())), hide_index=True)
+    
+    return on_progress
 
-def get_keyword_metrics(api_key, keyword):
-    """Get comprehensive keyword metrics from YouTube"""
-    if not api_key or len(api_key) < 30:
-        return None, "❌ Invalid API Key"
-    
-    if not keyword:
-        return None, "❌ Keyword required"
-    
+def session_view(name, request, compute, refresh=False):
+    """
+    {'request', 'result'} for `request`, kept in session state so a tab re-renders its last
+    result on later reruns without calling the API again: compute() only runs for a new
+    request or on refresh (an explicit button click). Exceptions are raised, never kept.
+    Anything derived from the result (export files, suggestions) goes in the same dict, so
+    it is dropped together with the result.
+    """
+    view = st.session_state.get(name)
+    if refresh or view is None or view['request'] != request:
+        view = st.session_state[name] = {'request': request, 'result': compute()}
+    return view
+
+def fetch_channel_audit(api_key, channel_id, video_limit):
+    """
+    (channel, first uploads page, engagement frame of those uploads) for the audit,
+    or (None, None, None) if the channel doesn't exist
+    """
+    yt = AsyncYouTubeClient(api_key)
+    
+    # Channel info and its uploads playlist don't depend on each other: fetch both at once
+    ch, vids_res = run_all(
+        yt.channel(channel_id),
+        yt.uploads(channel_id, video_limit),
+        return_exceptions=True
+    )
+    if isinstance(ch, Exception):
+        raise ch
+    if not ch:
+        return None, None, None
+    
+    # The channel's reported uploads playlist if the usual UU... ID failed
+    if isinstance(vids_res, Exception):
+        vids_res = run(yt.list(
+            'playlistItems', 'audit_uploads',
+            playlistId=ch['contentDetails']['relatedPlaylists']['uploads'],
+            maxResults=video_limit
+        ))
+    
+    index_fetched_items(vids_res.get('items', []), 'audit')
+    
+    # One 1-unit videos call for the whole page; ratios are computed column-wise
+    video_ids = [item['snippet']['resourceId']['videoId'] for item in vids_res.get('items', [])]
+    stats_items = run(yt.videos(video_ids, 'audit_videos')).get('items', []) if video_ids else []
+    video_stats = engagement_frame(stats_items, ch['statistics'].get('subscriberCount', float('nan')))
+    return ch, vids_res, video_stats
+
+def fetch_trending_videos(api_key, niche, days):
+    """(search response, videos response) for the most viewed recent uploads in a niche; no videos call if the search is empty"""
+    yt = build('youtube', 'v3', developerKey=api_key)
+    
+    # Search trending videos
+    trends_res = execute_measured(yt.search().list(
+        q=niche,
+        type='video',
+        maxResults=20,
+        order='viewCount',
+        publishedAfter=published_after(days),
+        regionCode='ID',
+        **view_params('trend_search')
+    ), 'trend_search')
+    if not trends_res.get('items'):
+        return trends_res, None
+    
+    video_ids = [item['id']['videoId'] for item in trends_res['items'] if 'videoId' in item.get('id', {})]
+    
+    # Get detailed stats
+    stats_res = execute_cached(yt.videos().list(
+        id=','.join(video_ids),
+        **view_params('trend')
+    ), 'trend')
+    
+    index_fetched_items(stats_res.get('items', []), 'trend', niche, 'ID')
+    return trends_res, stats_res
+
+def trending_videos(api_key, niche, days):
+    """fetch_trending_videos(), answered by the warm-up cache when the niche was prefetched"""
+    warm = WARM_RESULTS.get('trend', (niche, days))
+    return warm if warm is not None else fetch_trending_videos(api_key, niche, days)
+
+def warm_keyword_metrics(api_key, keyword):
+    """(KeywordResult, err) for the warm-up thread; sessions pick it up in get_keyword_metrics"""
+    data, err = fetch_keyword_metrics(api_key, keyword, on_items=index_fetched_items)
+    return (KeywordResult(keyword, 'ID', data) if data else None), err
+
+def gemini_server_key():
+    """Gemini key for server-side work: [gemini] api_key in secrets, else GEMINI_API_KEY"""
     try:
-        youtube = build('youtube', 'v3', developerKey=api_key)
-        
-        # Search for videos
-        search_res = youtube.search().list(
-            q=keyword,
-            type='video',
-            part='id,snippet',
-            maxResults=20,
-            order='relevance',
-            regionCode='ID'
-        ).execute()
-        
-        if not search_res.get('items'):
-            return None, f"❌ No videos found for '{keyword}'"
-        
-        # Get video IDs
-        video_ids = [item['id']['videoId'] for item in search_res['items'] if 'videoId' in item.get('id', {})]
-        
-        if not video_ids:
-            return None, "❌ No valid videos found"
-        
-        # Get detailed statistics
-        stats_res = youtube.videos().list(
-            id=','.join(video_ids),
-            part='statistics,snippet,contentDetails'
-        ).execute()
-        
-        # Process data
-        metrics = []
-        all_tags = []
-        upload_times = []
-        
-        for item in stats_res.get('items', []):
-            snippet = item.get('snippet', {})
-            stats = item.get('statistics', {})
-            
-            views = int(stats.get('viewCount', 0))
-            likes = int(stats.get('likeCount', 0))
-            comments = int(stats.get('commentCount', 0))
-            engagement = calculate_engagement_rate(stats)
-            
-            tags = snippet.get('tags', [])
-            all_tags.extend(tags)
-            
-            published = snippet.get('publishedAt', '')
-            if published:
-                upload_times.append(published)
-            
-            metrics.append({
-                'title': snippet.get('title', ''),
-                'Title': snippet.get('title', 'Unknown'),
-                'Views': views,
-                'Likes': likes,
-                'Comments': comments,
-                'Engagement': engagement,
-                'Channel': snippet.get('channelTitle', 'Unknown'),
-                'Date': published[:10] if published else 'N/A',
-                'tags': tags,
-                'publishedAt': published
-            })
-        
-        if not metrics:
-            return None, "❌ No data available"
-        
-        # Create DataFrame
-        df = pd.DataFrame(metrics)
-        
-        # Calculate metrics
-        view_counts = [m['Views'] for m in metrics if m['Views'] > 0]
-        engagement_rates = [m['Engagement'] for m in metrics if m['Engagement'] > 0]
-        
-        median_views = statistics.median(view_counts) if view_counts else 0
-        avg_views = statistics.mean(view_counts) if view_counts else 0
-        avg_engagement = statistics.mean(engagement_rates) if engagement_rates else 0
-        
-        # Trending tags
-        trending_tags = []
-        if all_tags:
-            tag_counts = Counter(all_tags)
-            trending_tags = [tag for tag, _ in tag_counts.most_common(15)]
-        
-        # Best upload time
-        best_time = "Unknown"
-        if upload_times:
-            hours = [int(t[11:13]) for t in upload_times if len(t) > 13]
-            if hours:
-                most_common_hour = Counter(hours).most_common(1)[0][0]
-                best_time = f"{most_common_hour:02d}:00 - {(most_common_hour+1):02d}:00 WIB"
-        
-        # Competition level
-        if median_views > 500000:
-            difficulty = "🔴 High"
-            diff_score = 30
-        elif median_views > 100000:
-            difficulty = "🟡 Medium"
-            diff_score = 60
-        else:
-            difficulty = "🟢 Low"
-            diff_score = 90
-        
-        # Opportunity score
-        opportunity_score = diff_score
-        
-        return {
-            'median_views': median_views,
-            'avg_views': avg_views,
-            'avg_engagement': avg_engagement,
-            'score': opportunity_score,
-            'difficulty': difficulty,
-            'difficulty_score': diff_score,
-            'trending_tags': trending_tags,
-            'best_upload_time': best_time,
-            'total_videos': len(metrics),
-            'top_videos': df,
-            'competitor_data': metrics
-        }, None
-        
-    except Exception as e:
-        error_msg = str(e)
-        if "API key not valid" in error_msg:
-            return None, "❌ API Key tidak valid!"
-        elif "quota" in error_msg.lower():
-            return None, "❌ Quota API habis!"
-        else:
-            return None, f"❌ Error: {error_msg}"
+        return st.secrets["gemini"]["api_key"]
+    except Exception:
+        return os.environ.get("GEMINI_API_KEY", "")
+
+# Prefetches the team's keywords, trend niches and Gemini lists ([warmup] in secrets.toml)
+@st.cache_resource
+def get_cache_warmer():
+    """Process-wide warm-up thread, started by the first script run after a deploy"""
+    try:
+        settings = st.secrets["warmup"]
+    except Exception:
+        settings = {}
+    key_pool = load_key_pool()
+    fetchers = {}
+    if len(key_pool):
+        # YouTube targets are fetched with the shared pool, never with a visitor's key
+        pool_key = key_pool.any_key()
+        fetchers['keyword'] = (lambda keyword: warm_keyword_metrics(pool_key, keyword), SEARCH_UNITS)
+        fetchers['trend'] = (lambda target: (fetch_trending_videos(pool_key, *target), None), SEARCH_UNITS)
+    gemini_key = gemini_server_key()
+    if gemini_key:
+        fetchers['power_words'] = (lambda niche: (fetch_power_words_from_gemini(gemini_key, niche), None), 0)
+    warmer = CacheWarmer(load_warmup_config(settings), fetchers, quota_left=key_pool.remaining)
+    warmer.start()
+    return warmer
+
+get_cache_warmer()
+
+def new_exporter(kind, label=""):
+    """Streaming exporter in the format picked in the sidebar (or via --export-format)"""
+    fmt = st.session_state.get('export_format', CLI_ARGS.export_format)
+    return StreamingExporter(os.path.join(EXPORT_DIR, export_filename(kind, label, fmt)), fmt)
 
 # --- 6. UI COMPONENTS ---
 def draw_competitor_chart(df):
@@ -631,12 +568,14 @@ def draw_competitor_chart(df):
         if len(title) > 60:
             title = title[:60] + "..."
         
-        views = row['Views']
-        engagement = row.get('Engagement', 0)
+        views = int(row['Views'])
+        engagement = row.get('Engagement')
         width_pct = int((views / max_views) * 100)
         
-        # Color based on engagement
-        if engagement > 5:
+        # Color based on engagement (grey: likes hidden)
+        if pd.isna(engagement):
+            color = "#6b7280"
+        elif engagement > 5:
             color = "#10b981"
         elif engagement > 2:
             color = "#f59e0b"
@@ -647,7 +586,7 @@ def draw_competitor_chart(df):
         <div style="background: #1e1e1e; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
             <div style="color: white; font-weight: bold; font-size: 14px; margin-bottom: 0.5rem;">{title}</div>
             <div style="color: #888; font-size: 12px; margin-bottom: 0.5rem;">
-                {row['Channel']} • {views:,} views • {engagement}% engagement
+                {row['Channel']} • {views:,} views • {format_rate(engagement)} engagement
             </div>
             <div style="background: #333; width: 100%; height: 10px; border-radius: 5px; overflow: hidden;">
                 <div style="background: {color}; width: {width_pct}%; height: 10px;"></div>
@@ -655,8 +594,247 @@ def draw_competitor_chart(df):
         </div>
         """, unsafe_allow_html=True)
 
+def draw_duplicate_clusters(clusters, total_videos):
+    """Near-duplicate title groups found by MinHash/LSH"""
+    st.markdown("### 🧬 Near-Duplicate Titles")
+    if not clusters:
+        st.success("✅ No templated or near-duplicate titles detected")
+        return
+    
+    involved = sum(len(c) for c in clusters)
+    st.warning(f"⚠️ {involved}/{total_videos} videos fall into {len(clusters)} near-duplicate groups - they may compete with each other in search")
+    for cluster in clusters[:10]:
+        with st.expander(f"{len(cluster)} similar titles - e.g. \"{smart_truncate(cluster[0][1], 60)}\""):
+            for rank, cluster_title in cluster[:50]:
+                st.markdown(f"- #{rank}. {cluster_title}")
+            if len(cluster) > 50:
+                st.caption(f"...and {len(cluster) - 50} more")
+
+def draw_thumbnail_insights(items, views):
+    """Thumbnail features of the given videos and how each one tracks their views"""
+    st.markdown("### 🖼️ Thumbnail Insights")
+    with stage('score'):
+        features = thumbnail_features(items, get_thumbnail_cache())
+    if features.empty:
+        st.info("No thumbnails could be loaded")
+        return
+    
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        st.metric("☀️ Avg Brightness", f"{features['brightness'].mean():.0%}")
+    with m2:
+        st.metric("🌓 Avg Contrast", f"{features['contrast'].mean():.2f}")
+    with m3:
+        st.metric("🎨 Avg Colorfulness", f"{features['colorfulness'].mean():.0f}")
+    with m4:
+        st.metric("🔤 With Big Text", f"{int((features['text_area'] > 0.1).sum())}/{len(features)}")
+    
+    col_corr, col_colors = st.columns([2, 1])
+    with col_corr:
+        corr = correlate_with_views(features, views)
+        if corr.empty:
+            st.caption("Too few thumbnails to relate features to views")
+        else:
+            st.markdown("#### 📈 What Tracks Views")
+            st.bar_chart(corr)
+            strongest = corr.index[0]
+            direction = "more" if corr.iloc[0] > 0 else "less"
+            st.caption(
+                f"Rank correlation over {len(features)} videos; the strongest signal is {strongest.replace('_', ' ')} "
+                f"({corr.iloc[0]:+.2f}): top videos tend to have {direction} of it. Small samples are noisy."
+            )
+    with col_colors:
+        st.markdown("#### 🎨 Dominant Colors")
+        palette = Counter(colors[0] for colors in features['dominant_colors'] if colors)
+        swatches = "".join(
+            f"<div style='display: inline-block; width: 48px; height: 48px; margin: 4px; border-radius: 8px; "
+            f"background: {color};' title='{color} ({count} thumbnails)'></div>"
+            for color, count in palette.most_common(8)
+        )
+        st.markdown(swatches, unsafe_allow_html=True)
+
+def export_download_button(export, label, key):
+    """Download button for a finished export: {'path', 'fmt', 'rows'}"""
+    mime = "text/csv" if export['fmt'] == "csv" else "application/octet-stream"
+    with open(export['path'], "rb") as f:
+        st.download_button(
+            f"📥 Download {label} ({export['rows']:,} rows, {export['fmt'].upper()})",
+            f,
+            file_name=os.path.basename(export['path']),
+            mime=mime,
+            key=key,
+            on_click="ignore"
+        )
+    if CLI_ARGS.export_dir:
+        st.caption(f"💾 Saved to {export['path']}")
+
+def write_export(kind, label, write):
+    """Write one export file with write(exporter); returns its {'path', 'fmt', 'rows'}"""
+    with new_exporter(kind, label) as exporter:
+        write(exporter)
+    return {'path': exporter.path, 'fmt': exporter.fmt, 'rows': exporter.rows_written}
+
+def export_on_demand(view, kind, label, description, key, write):
+    """
+    Export button for a stored session_view result. The file is only written when the user
+    asks for it; its path is kept in the view, so reruns offer the same file and a new
+    result starts without one.
+    """
+    exports = view.setdefault('exports', {})
+    export = exports.get(key)
+    if export is None or not os.path.exists(export['path']):
+        if not st.button(f"📤 Export {description}", key=f"{key}_write"):
+            return
+        export = exports[key] = write_export(kind, label, write)
+    export_download_button(export, description, key)
+
+JOB_STATUS_ICONS = {
+    'queued': '⏳', 'running': '🔄', 'done': '✅', 'failed': '❌', 'cancelled': '⏹️', 'interrupted': '⏸️'
+}
+
+def render_job_list(runner, was_polling):
+    """Job progress; re-executed on a timer while jobs are active"""
+    jobs = runner.store.list()
+    if not jobs:
+        st.info("💡 No jobs yet - start one above")
+        return
+    
+    for job in jobs:
+        icon = JOB_STATUS_ICONS.get(job['status'], '•')
+        col_info, col_action = st.columns([5, 1])
+        with col_info:
+            st.markdown(f"**{icon} #{job['id']} {job['label']}** · {job['status']}")
+            if job['total']:
+                st.progress(min(job['progress'] / job['total'], 1.0), text=f"{job['progress']:,} / {job['total']:,}")
+            if job['error']:
+                st.caption(f"❌ {job['error']}")
+        with col_action:
+            if job['status'] in ('queued', 'running'):
+                if st.button("⏹️ Cancel", key=f"cancel_job_{job['id']}"):
+                    runner.cancel(job['id'])
+            elif job['status'] in ('interrupted', 'failed', 'cancelled'):
+                if st.button("▶️ Resume", key=f"resume_job_{job['id']}"):
+                    if not api_key or len(api_key) < 30:
+                        st.error("⚠️ API Key required")
+                    else:
+                        runner.resume(job['id'], api_key)
+    
+    # Last job just finished: one full rerun so the results viewer picks it up and polling stops
+    if was_polling and not runner.has_active():
+        st.rerun()
+
+def render_job_results(runner, job):
+    """Summary + preview of a job's result rows (streamed from the job table)"""
+    preview = []
+    scores = []
+    miner = PhraseMiner()
+    dup_index = NearDuplicateIndex()
+    for row in runner.store.iter_rows(job['id']):
+        if len(preview) < 500:
+            preview.append(row)
+        if job['kind'] == 'channel_audit':
+            scores.append(row['Score'])
+            dup_index.add(row['Rank'], row['Title'])
+        elif job['kind'] == 'channel_optimize':
+            scores.append((row['Original Score'], row['Proposed Score']))
+        elif job['kind'] == 'trend_scan':
+            miner.add(row['title'], row['tags'])
+    
+    if not preview:
+        st.info("No results yet")
+        return
+    
+    if job['kind'] == 'channel_audit':
+        m1, m2, m3, m4 = st.columns(4)
+        with m1:
+            st.metric("Average Score", f"{int(sum(scores) / len(scores))}/100")
+        with m2:
+            st.metric("🔥 Excellent", f"{sum(1 for s in scores if s >= 80)}/{len(scores)}")
+        with m3:
+            st.metric("📈 Good", f"{sum(1 for s in scores if 60 <= s < 80)}/{len(scores)}")
+        with m4:
+            st.metric("⚠️ Needs Work", f"{sum(1 for s in scores if s < 60)}/{len(scores)}")
+        draw_duplicate_clusters(dup_index.clusters(), len(scores))
+    elif job['kind'] == 'channel_optimize':
+        before = sum(original for original, _ in scores) / len(scores)
+        after = sum(proposed for _, proposed in scores) / len(scores)
+        m1, m2, m3 = st.columns(3)
+        with m1:
+            st.metric("Current Avg Score", f"{int(before)}/100")
+        with m2:
+            st.metric("Proposed Avg Score", f"{int(after)}/100", delta=f"{after - before:+.1f}")
+        with m3:
+            st.metric("📈 Improved", f"{sum(1 for original, proposed in scores if proposed > original)}/{len(scores)}")
+        st.caption("📤 Export the results for the full review sheet (original vs. proposed title, tags and description)")
+    elif job['kind'] == 'trend_scan':
+        col_words, col_tags = st.columns(2)
+        with col_words:
+            st.markdown("#### 🔥 Hot Keywords")
+            st.write(", ".join(f"{w} ({c})" for w, c in miner.most_common(15)))
+        with col_tags:
+            st.markdown("#### 🏷️ Trending Tags")
+            st.write(", ".join(f"#{t} ({c})" for t, c in miner.tags.most_common(15, guaranteed=True)))
+    
+    st.dataframe(pd.DataFrame(preview), use_container_width=True, hide_index=True)
+    if len(preview) == 500:
+        st.caption("Showing the first 500 rows - export for the full result")
+    
+    if st.button("📤 Export Results", key=f"export_job_{job['id']}"):
+        export = write_export(job['kind'], job['label'], lambda exporter: exporter.write_rows(runner.store.iter_rows(job['id'])))
+        export_download_button(export, "job results", key=f"dl_job_{job['id']}")
+
+def render_profile_report(profiler, key="dl_profile"):
+    """Where the last rerun's time went: per-tab stages, flame summary, hot functions, JSON dump"""
+    st.markdown("### 🩺 Last Rerun Profile")
+    st.caption(f"⏱️ {profiler.wall * 1000:,.0f} ms · {profiler.samples} samples · {'cProfile' if profiler.deterministic else 'sampling'}")
+    
+    totals = profiler.stage_totals()
+    if totals:
+        st.dataframe(pd.DataFrame([totals], index=["ms"]))
+    by_section = pd.DataFrame(profiler.stage_rows())
+    if not by_section.empty:
+        by_section = by_section.pivot_table(index='Section', columns='Stage', values='ms', aggfunc='sum', fill_value=0)
+        by_section = by_section.reindex(columns=[c for c in STAGES if c in by_section.columns])
+        st.dataframe(by_section.loc[by_section.sum(axis=1).sort_values(ascending=False).index])
+    
+    with st.expander("🔥 Flame summary"):
+        st.code(profiler.flame_summary(), language='text')
+    with st.expander("🐢 Hot functions"):
+        st.dataframe(pd.DataFrame(profiler.hot_functions()), hide_index=True)
+    
+    stamp = datetime.datetime.fromtimestamp(profiler.started_at).strftime('%Y%m%d_%H%M%S')
+    st.download_button(
+        "💾 Download profile (JSON)", profiler.dumps(), file_name=f"vidiq_profile_{stamp}.json",
+        mime="application/json", key=key,
+        help="Stages, hot functions and collapsed stacks (flamegraph.pl / speedscope format)"
+    )
+
+def tab_fragment(name):
+    """
+    Run a tab body as an st.fragment: its own widgets rerun only that tab, so typing in one
+    tab never re-executes the sidebar or re-renders another tab's output. Fragment-only
+    reruns are profiled on their own and reported inside the tab.
+    """
+    def decorate(body):
+        @functools.wraps(body)
+        def run_tab():
+            if profiling_active() is not None or not st.session_state.get('profiling_enabled'):
+                with profile_section(name):
+                    body()
+                return
+            profiler = RerunProfiler(__file__, deterministic=st.session_state.get('profiling_mode') == "Deterministic").start()
+            try:
+                with profile_section(name):
+                    body()
+            finally:
+                profiler.stop()
+            with st.expander(f"🩺 Tab rerun: {profiler.wall * 1000:,.0f} ms"):
+                render_profile_report(profiler, key=f"dl_profile_{body.__name__}")
+        return st.fragment(run_tab)
+    return decorate
+
 # --- 7. SIDEBAR ---
-with st.sidebar:
+with st.sidebar, profile_section("Sidebar"):
     st.markdown("## ⚙️ Settings")
     
     # Display current database status
@@ -689,9 +867,13 @@ with st.sidebar:
                 
                 if ai_words:
                     # Update session state
-                    st.session_state['power_words'] = ai_words
-                    st.session_state['db_source'] = f"🤖 Gemini AI ({niche_option})"
-                    st.success(f"✅ Loaded {len(ai_words)} AI power words!")
+                    st.session_state['power_words'] = get_shared_word_lists().share(ai_words)
+                    prefetched = ai_status == GEMINI_PREFETCHED
+                    st.session_state['db_source'] = f"🤖 Gemini AI ({niche_option}{', prefetched' if prefetched else ''})"
+                    if prefetched:
+                        st.success(f"✅ Loaded {len(ai_words)} prefetched AI power words (your Gemini key was not used)")
+                    else:
+                        st.success(f"✅ Loaded {len(ai_words)} AI power words!")
                     st.rerun()
                 else:
                     st.error(f"❌ {ai_status}")
@@ -718,12 +900,25 @@ with st.sidebar:
     
     # === YOUTUBE API SECTION ===
     st.markdown("### 🔑 YouTube API")
-    api_key = st.text_input("YouTube API Key:", type="password", placeholder="AIzaSy...", key="yt_key")
+    key_pool = load_key_pool()
+    api_key = st.text_input(
+        "YouTube API Key (optional):" if len(key_pool) else "YouTube API Key:",
+        type="password", placeholder="AIzaSy...", key="yt_key"
+    )
     
     if api_key and len(api_key) > 30:
         st.success("🟢 YouTube Connected")
     elif api_key:
         st.warning("⚠️ Key too short")
+    elif len(key_pool):
+        # Requests made with any pooled key are spread over the whole pool
+        api_key = key_pool.any_key()
+        st.success(f"🟢 Key pool: {len(key_pool)} keys · ~{key_pool.remaining():,} units left today")
+    
+    if len(key_pool):
+        with st.expander("🔑 Key pool usage"):
+            st.dataframe(pd.DataFrame(key_pool.rows()), hide_index=True)
+            st.caption("Each request goes to the key with the most quota left; a key that runs out sits out until the daily reset (midnight Pacific), a rejected key for an hour.")
     
     with st.expander("📖 Get YouTube API Key"):
         st.markdown("""
@@ -738,6 +933,29 @@ with st.sidebar:
     
     st.divider()
     
+    # === EXPORT ===
+    st.markdown("### 📤 Export")
+    st.selectbox(
+        "Export format:",
+        list(EXPORT_FORMATS),
+        index=list(EXPORT_FORMATS).index(CLI_ARGS.export_format),
+        key="export_format",
+        help="Results are written to disk batch by batch while they are computed"
+    )
+    
+    st.divider()
+    
+    # === PROFILING ===
+    st.markdown("### 🩺 Profiling")
+    st.toggle("Profile each rerun", key="profiling_enabled", help="Stage timings per tab, a flame summary and the hottest functions, shown at the bottom of the sidebar")
+    if st.session_state.get('profiling_enabled'):
+        st.radio(
+            "Profiler:", ["Sampling", "Deterministic"], key="profiling_mode", horizontal=True,
+            help="Sampling barely slows the app down; Deterministic (cProfile) counts every call but inflates timings"
+        )
+    
+    st.divider()
+    
     # === STATS ===
     st.markdown("### 📊 Database Stats")
     
@@ -752,6 +970,28 @@ with st.sidebar:
     st.metric("Power Words", len(current_words))
     st.metric("Viral Emojis", len(VIRAL_EMOJIS))
     
+    results_cache = session_results()
+    st.caption(f"🧠 Session cache: {len(results_cache)} analyses · {results_cache.total_bytes / 1024:,.0f} KB · {results_cache.evictions} evicted")
+    st.caption(f"🏷️ ETag cache: {len(ETAG_CACHE)} responses · {ETAG_CACHE.hits} not modified / {ETAG_CACHE.misses} fetched")
+    warm_cycle = get_cache_warmer().last_cycle
+    if warm_cycle:
+        st.caption(
+            f"🔥 Warm-up: {len(WARM_RESULTS)} results ready · {WARM_RESULTS.hits} served · last cycle "
+            f"{warm_cycle['warmed']} warmed, {warm_cycle['skipped']} skipped for quota, {warm_cycle['failed']} failed "
+            f"({warm_cycle['units']} units, {time.strftime('%H:%M', time.localtime(warm_cycle['finished_at']))})"
+        )
+    if len(COMMENT_DIGESTS):
+        st.caption(f"💬 Comment digests: {len(COMMENT_DIGESTS)} videos · {COMMENT_DIGESTS.hits} reused / {COMMENT_DIGESTS.misses} read")
+    if YOUTUBE_BREAKER.state != 'closed':
+        st.warning(f"🔌 YouTube API unhealthy ({YOUTUBE_BREAKER.state}) — serving cached responses where available")
+    elif ETAG_CACHE.stale:
+        st.caption(f"🔌 {ETAG_CACHE.stale} responses served from cache during API errors")
+    payload_rows = PAYLOAD_STATS.rows()
+    if payload_rows:
+        with st.expander("📦 API payload sizes"):
+            st.dataframe(pd.DataFrame(payload_rows), hide_index=True)
+            st.caption("Field masks trim each response to what the tab reads; savings are estimated from one unmasked sample per view.")
+    
     # Display source badge
     if "Gemini" in source:
         st.markdown('<span class="api-badge" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;">🤖 AI-Powered</span>', unsafe_allow_html=True)
@@ -787,10 +1027,11 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-tab1, tab2, tab3, tab4 = st.tabs(["🔍 Keyword Research", "📝 Title Optimizer", "📺 Channel Audit", "🎯 Trend Finder"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["🔍 Keyword Research", "📝 Title Optimizer", "📺 Channel Audit", "🎯 Trend Finder", "🗂️ My Corpus", "🧵 Jobs", "👀 Watchlist"])
 
 # TAB 1: KEYWORD RESEARCH
-with tab1:
+@tab_fragment("Keyword Research")
+def keyword_research_tab():
     st.markdown("### 🔍 Keyword Research & Analysis")
     
     col_input, col_btn = st.columns([3, 1])
@@ -801,14 +1042,39 @@ with tab1:
         st.write("")
         analyze_btn = st.button("🚀 Analyze", type="primary", use_container_width=True)
     
+    compare_with = st.multiselect(
+        "🌍 Compare with other regions (optional):", [r for r in REGION_CODES if r != 'ID'],
+        help="Each region runs its own search (100 quota units); videos ranking in several regions are fetched once"
+    )
+    
+    mine_viewer_comments = st.checkbox(
+        "💬 Mine viewer comments of the top videos",
+        help="Reads up to 500 comments of each of the 5 most viewed videos (about 1 quota unit per 100 comments); videos without new comments are reused"
+    )
+    
     if analyze_btn:
+        st.session_state['keyword_request'] = kw_input
+        st.session_state['region_request'] = (kw_input, tuple(compare_with))
+        st.session_state['comments_request'] = kw_input if mine_viewer_comments else None
+    
+    # The last analysis stays on screen across reruns; only Analyze fetches again
+    kw_request = st.session_state.get('keyword_request')
+    if kw_request is not None:
+        kw_input = kw_request
         if not api_key or len(api_key) < 30:
             st.error("⚠️ Please enter valid API Key in sidebar")
         elif not kw_input:
             st.warning("⚠️ Enter a keyword first")
         else:
             with st.spinner(f"🔄 Analyzing '{kw_input}'..."):
-                data, err = get_keyword_metrics(api_key, kw_input)
+                live_box = st.empty()
+                keyword_view = session_view(
+                    'keyword_view', kw_input,
+                    lambda: get_keyword_metrics(api_key, kw_input, on_progress=live_keyword_table(live_box)),
+                    refresh=analyze_btn
+                )
+                data, err = keyword_view['result']
+                live_box.empty()
                 
                 if err:
                     st.error(err)
@@ -820,13 +1086,28 @@ with tab1:
                     m1, m2, m3, m4 = st.columns(4)
                     
                     with m1:
-                        st.metric("Opportunity", f"{data['score']}/100")
+                        st.metric("Opportunity", f"{data.score}/100")
                     with m2:
-                        st.metric("Competition", data['difficulty'])
+                        st.metric("Competition", data.difficulty)
                     with m3:
-                        st.metric("Avg Views", f"{int(data['avg_views']):,}")
+                        st.metric("Avg Views", f"{int(data.avg_views):,}")
                     with m4:
-                        st.metric("Videos Analyzed", data['total_videos'])
+                        st.metric("Videos Analyzed", data.total_videos)
+                    
+                    baseline = data.baseline
+                    if baseline:
+                        niche = "all niches" if baseline['niche'] == '*' else f"'{baseline['niche']}'"
+                        region = "all regions" if baseline['region'] == '*' else baseline['region']
+                        engagement_pct = baseline['engagement_percentile']
+                        engagement_note = "engagement is unknown" if engagement_pct is None else f"engagement beats {engagement_pct:.0f}%"
+                        st.caption(
+                            f"📐 Median views beat {baseline['views_percentile']:.0f}% and {engagement_note} "
+                            f"of {baseline['videos']:,} {niche} videos in {region}"
+                        )
+                    else:
+                        st.caption("📐 Competition uses fixed view thresholds - run `python baselines.py build` to rate keywords against their niche")
+                    if data.hidden_likes:
+                        st.caption(f"🙈 {data.hidden_likes}/{data.total_videos} videos hide their likes - left out of engagement (avg {format_rate(data.avg_engagement)})")
                     
                     st.divider()
                     
@@ -834,20 +1115,34 @@ with tab1:
                     col_chart, col_tags = st.columns([2, 1])
                     
                     with col_chart:
-                        draw_competitor_chart(data['top_videos'])
+                        draw_competitor_chart(data.top_videos)
                     
                     with col_tags:
                         st.markdown("### 🏷️ Trending Tags")
-                        if data['trending_tags']:
-                            for tag in data['trending_tags'][:10]:
+                        if data.trending_tags:
+                            for tag in data.trending_tags[:10]:
                                 st.code(tag, language='text')
                         
                         st.divider()
                         st.markdown("### ⏰ Best Upload Time")
-                        st.info(data['best_upload_time'])
+                        st.info(data.best_upload_time)
+                    
+                    export_on_demand(keyword_view, 'keyword', kw_input, "keyword metrics", "dl_keyword",
+                                     lambda exporter: exporter.write_frame(data.top_videos))
+                    
+                    if st.session_state.get('comments_request') == kw_input:
+                        render_comment_insights(api_key, kw_input, data.top_videos, refresh=analyze_btn)
+                    
+                    region_request = st.session_state.get('region_request')
+                    if region_request and region_request[0] == kw_input and region_request[1]:
+                        render_region_comparison(api_key, kw_input, ['ID', *region_request[1]], refresh=analyze_btn)
+
+with tab1:
+    keyword_research_tab()
 
 # TAB 2: TITLE OPTIMIZER (FIXED)
-with tab2:
+@tab_fragment("Title Optimizer")
+def title_optimizer_tab():
     st.markdown("### ✍️ Title Optimizer")
     
     col_kw, col_title = st.columns([1, 2])
@@ -857,12 +1152,28 @@ with tab2:
         title = st.text_input("📝 Your Title:", placeholder="Paste your title here...")
     
     if st.button("🔍 Analyze & Get Suggestions", type="primary"):
+        st.session_state['title_request'] = (title, keyword)
+    
+    # Kept so the copy buttons below don't wipe the analysis they belong to
+    title_request = st.session_state.get('title_request')
+    if title_request is not None:
+        title, keyword = title_request
         if not title:
             st.warning("⚠️ Enter a title to analyze")
         else:
             # Analyze current title
             score, checks = analyze_title(title, keyword)
             
+            # Competitor data (one fetch shared by similarity, suggestions and tags)
+            keyword_data = None
+            similarity_model = None
+            if api_key and len(api_key) > 30 and keyword:
+                with st.spinner("📊 Analyzing competitors..."):
+                    keyword_data, _ = get_keyword_metrics(api_key, keyword)
+                if keyword_data:
+                    with stage('score'):
+                        similarity_model = competitor_model(keyword, 'ID', keyword_data.competitor_titles)
+            
             # Display score
             st.markdown("---")
             if score >= 80:
@@ -890,6 +1201,22 @@ with tab2:
             with col_grade:
                 st.markdown(f"<h1 style='color:{color}; text-align:center; font-size:4rem; margin:0;'>{grade}</h1>", unsafe_allow_html=True)
             
+            # Similarity to what already ranks for the keyword (TF-IDF over competitor titles)
+            if similarity_model is not None and len(similarity_model):
+                matches = similarity_model.top_matches(title, top_n=5)
+                top_similarity = matches[0][1] if matches else 0
+                avg_similarity = sum(sim for _, sim in matches) / len(matches) if matches else 0
+                
+                st.markdown("### 🎯 Competitor Similarity")
+                col_best, col_avg = st.columns(2)
+                with col_best:
+                    st.metric("Closest Competitor", f"{int(top_similarity * 100)}%")
+                with col_avg:
+                    st.metric(f"Avg vs Top {len(matches)}", f"{int(avg_similarity * 100)}%")
+                with st.expander("🔎 Most similar competitor titles"):
+                    for match_title, sim in matches:
+                        st.markdown(f"- **{int(sim * 100)}%** {match_title}")
+            
             # Analysis details
             st.markdown("---")
             st.markdown("### 📋 SEO Analysis")
@@ -910,25 +1237,26 @@ with tab2:
             if score < 85 and keyword:
                 st.markdown("---")
                 st.markdown("### 💡 AI-Powered Title Suggestions")
-                st.caption(f"**Original Theme Preserved:** These suggestions maintain your title's original context")
+                st.caption(f"**Original Theme Preserved:** Hundreds of template × power word × number × emoji combinations are scored - these are the best")
                 
                 # Show what theme was extracted
                 extracted_theme = extract_core_theme(title, keyword)
                 st.info(f"🎯 **Detected Theme:** {extracted_theme}")
                 
-                # Get competitor data if API available
-                competitor_data = None
-                if api_key and len(api_key) > 30:
-                    with st.spinner("📊 Analyzing competitors..."):
-                        result, _ = get_keyword_metrics(api_key, keyword)
-                        if result:
-                            competitor_data = result.get('competitor_data', [])
+                competitor_titles = keyword_data.competitor_titles if keyword_data else None
                 
-                # Generate suggestions
-                suggestions = generate_smart_suggestions(title, keyword, api_key, competitor_data)
+                # Generated once per title / keyword / power-word list: candidates are sampled at
+                # random, and the copy buttons below must show the title that was clicked
+                suggestion_view = session_view(
+                    'title_suggestions',
+                    (title, keyword, id(current_power_words()), tuple(competitor_titles or ())),
+                    lambda: suggest_titles(title, keyword, competitor_titles, similarity_model=similarity_model)
+                )
+                suggestions = suggestion_view['result']
                 
-                for i, sug in enumerate(suggestions, 1):
-                    sug_score, _ = analyze_title(sug, keyword)
+                for i, suggestion in enumerate(suggestions, 1):
+                    sug = suggestion['title']
+                    sug_score = suggestion['score']
                     
                     # Color based on improvement
                     if sug_score > score:
@@ -949,7 +1277,7 @@ with tab2:
                         </div>
                         <div style="font-size: 1rem; line-height: 1.4;">{sug}</div>
                         <div style="margin-top: 0.5rem; font-size: 0.85rem; opacity: 0.8;">
-                            Length: {len(sug)} chars
+                            Length: {len(sug)} chars{f" • Competitor match: {int(suggestion['similarity'] * 100)}%" if competitor_titles else ""}
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
@@ -964,13 +1292,8 @@ with tab2:
             
             tab_tags, tab_desc = st.tabs(["🏷️ Tags", "📄 Description"])
             
-            # Get trending tags if available
-            trending_tags = []
-            if api_key and len(api_key) > 30 and keyword:
-                with st.spinner("Getting trending tags..."):
-                    result, _ = get_keyword_metrics(api_key, keyword)
-                    if result:
-                        trending_tags = result.get('trending_tags', [])
+            # Trending tags if competitor data is available
+            trending_tags = list(keyword_data.trending_tags) if keyword_data else []
             
             generated_tags = generate_tags(title, keyword, trending_tags)
             
@@ -993,8 +1316,12 @@ with tab2:
                 )
                 st.caption(f"✅ {len(description)} characters | Includes timestamps, hashtags & CTAs")
 
+with tab2:
+    title_optimizer_tab()
+
 # TAB 3: CHANNEL AUDIT
-with tab3:
+@tab_fragment("Channel Audit")
+def channel_audit_tab():
     st.markdown("### 📺 Channel Performance Audit")
     
     col_id, col_limit, col_btn = st.columns([3, 1, 1])
@@ -1008,6 +1335,11 @@ with tab3:
         audit_btn = st.button("🔍 Audit", type="primary", use_container_width=True)
     
     if audit_btn:
+        st.session_state['audit_request'] = (channel_id, video_limit)
+    
+    audit_request = st.session_state.get('audit_request')
+    if audit_request is not None:
+        channel_id, video_limit = audit_request
         if not api_key or len(api_key) < 30:
             st.error("⚠️ API Key required")
         elif not channel_id or not channel_id.startswith("UC"):
@@ -1015,18 +1347,17 @@ with tab3:
         else:
             with st.spinner("🔄 Auditing channel..."):
                 try:
-                    yt = build('youtube', 'v3', developerKey=api_key)
-                    
-                    # Get channel info
-                    ch_res = yt.channels().list(
-                        id=channel_id,
-                        part='snippet,statistics,contentDetails'
-                    ).execute()
+                    # Re-rendered from session state on later reruns; the Audit button refetches
+                    audit_view = session_view(
+                        'audit_view', audit_request,
+                        lambda: fetch_channel_audit(api_key, channel_id, video_limit),
+                        refresh=audit_btn
+                    )
+                    ch, vids_res, video_stats = audit_view['result']
                     
-                    if not ch_res.get('items'):
+                    if not ch:
                         st.error("❌ Channel not found")
                     else:
-                        ch = ch_res['items'][0]
                         snippet = ch['snippet']
                         stats = ch['statistics']
                         
@@ -1054,23 +1385,25 @@ with tab3:
                         
                         st.markdown("---")
                         
-                        # Get videos
-                        upload_id = ch['contentDetails']['relatedPlaylists']['uploads']
-                        vids_res = yt.playlistItems().list(
-                            playlistId=upload_id,
-                            part='snippet',
-                            maxResults=video_limit
-                        ).execute()
-                        
                         st.markdown(f"### 📹 Analyzing {len(vids_res['items'])} Recent Videos")
                         
                         total_score = 0
                         video_scores = []
+                        audit_rows = []
+                        dup_index = NearDuplicateIndex()
+                        # Suggestions are kept with the audit result (until the power words change)
+                        power_words = current_power_words()
+                        if audit_view.get('suggestion_words') != power_words:
+                            audit_view['suggestion_words'] = power_words
+                            audit_view['suggestions'] = {}
+                        suggestions = audit_view['suggestions']
                         
                         for idx, item in enumerate(vids_res['items'], 1):
                             vid_title = item['snippet']['title']
                             vid_thumb = item['snippet']['thumbnails']['default']['url']
                             vid_date = item['snippet']['publishedAt'][:10]
+                            vid_id = item['snippet']['resourceId']['videoId']
+                            vid_stats = video_stats.loc[vid_id] if vid_id in video_stats.index else None
                             
                             # Extract keyword
                             vid_keywords = extract_keywords_from_title(vid_title, top_n=1)
@@ -1080,6 +1413,18 @@ with tab3:
                             vid_score, vid_checks = analyze_title(vid_title, vid_keyword)
                             total_score += vid_score
                             video_scores.append(vid_score)
+                            dup_index.add(idx, vid_title)
+                            audit_rows.append({
+                                'Rank': idx,
+                                'Title': vid_title,
+                                'Date': vid_date,
+                                'Keyword': vid_keyword,
+                                'Score': vid_score,
+                                'Views': None if vid_stats is None else vid_stats['views'],
+                                'Engagement': None if vid_stats is None else vid_stats['engagement'],
+                                'Views/Subscriber': None if vid_stats is None else vid_stats.get('views_per_subscriber'),
+                                'Checks': [message for _, message in vid_checks]
+                            })
                             
                             # Display
                             with st.container():
@@ -1090,7 +1435,14 @@ with tab3:
                                 
                                 with col_content:
                                     st.markdown(f"**#{idx}. {vid_title}**")
-                                    st.caption(f"📅 {vid_date}")
+                                    if vid_stats is None:
+                                        st.caption(f"📅 {vid_date}")
+                                    else:
+                                        st.caption(
+                                            f"📅 {vid_date} • 👁️ {vid_stats['views']:,.0f} views • "
+                                            f"💬 {format_rate(vid_stats['engagement'])} engagement • "
+                                            f"👥 {format_rate(vid_stats.get('views_per_subscriber'), 2, 'x')} views/subscriber"
+                                        )
                                     
                                     if vid_score >= 80:
                                         st.success(f"✅ Excellent SEO ({vid_score}/100)", icon="🔥")
@@ -1101,9 +1453,10 @@ with tab3:
                                     
                                     if vid_score < 80:
                                         with st.expander("💡 See Improvement Suggestions"):
-                                            suggestions = generate_smart_suggestions(vid_title, vid_keyword, api_key)
-                                            for sug in suggestions[:3]:
-                                                st.code(sug, language='text')
+                                            if vid_id not in suggestions:
+                                                suggestions[vid_id] = suggest_titles(vid_title, vid_keyword, top_k=3)
+                                            for suggestion in suggestions[vid_id]:
+                                                st.code(f"{suggestion['title']}  ({suggestion['score']}/100)", language='text')
                                 
                                 with col_score:
                                     score_color = "#10b981" if vid_score >= 80 else "#f59e0b" if vid_score >= 60 else "#ef4444"
@@ -1116,6 +1469,7 @@ with tab3:
                                 
                                 st.divider()
                         
+                        
                         # Channel summary
                         if video_scores:
                             st.markdown("---")
@@ -1136,6 +1490,18 @@ with tab3:
                             with m4:
                                 st.metric("⚠️ Needs Work", f"{poor}/{len(video_scores)}")
                             
+                            if len(video_stats):
+                                engagement_summary = summarize(video_stats)
+                                e1, e2, e3, e4 = st.columns(4)
+                                with e1:
+                                    st.metric("💬 Avg Engagement", format_rate(engagement_summary['avg_engagement']))
+                                with e2:
+                                    st.metric("💬 Median Engagement", format_rate(engagement_summary['median_engagement']))
+                                with e3:
+                                    st.metric("👥 Median Views/Subscriber", format_rate(engagement_summary['median_views_per_subscriber'], 2, 'x'))
+                                with e4:
+                                    st.metric("🙈 Likes Hidden", f"{engagement_summary['hidden_likes']}/{engagement_summary['videos']}")
+                            
                             # Recommendations
                             st.markdown("---")
                             st.markdown("### 💡 Overall Recommendations")
@@ -1156,13 +1522,23 @@ with tab3:
                                 - Include power words and numbers
                                 - Use emojis for better visibility
                                 """)
+                            
+                            st.markdown("---")
+                            draw_duplicate_clusters(dup_index.clusters(), len(video_scores))
+                            
+                            export_on_demand(audit_view, 'audit', snippet['title'], "audit scores", "dl_audit",
+                                             lambda exporter: exporter.write_rows(audit_rows))
                 
                 except Exception as e:
                     st.error(f"❌ Error: {str(e)}")
                     st.caption("Check your API key and Channel ID")
 
+with tab3:
+    channel_audit_tab()
+
 # TAB 4: TREND FINDER (Enhanced UI)
-with tab4:
+@tab_fragment("Trend Finder")
+def trend_finder_tab():
     st.markdown("""
     <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 2rem; border-radius: 15px; margin-bottom: 2rem;'>
         <h2 style='color: white; margin: 0; text-align: center;'>🎯 Discover Trending Topics</h2>
@@ -1181,6 +1557,11 @@ with tab4:
         trend_btn = st.button("🔥 Find Trends", type="primary", use_container_width=True)
     
     if trend_btn:
+        st.session_state['trend_request'] = (niche, days_filter)
+    
+    trend_request = st.session_state.get('trend_request')
+    if trend_request is not None:
+        niche, days_filter = trend_request
         if not api_key or len(api_key) < 30:
             st.error("⚠️ API Key required in sidebar")
         elif not niche:
@@ -1191,74 +1572,57 @@ with tab4:
             
             with st.spinner(f"🔍 Analyzing trending videos in '{niche}' (last {days} days)..."):
                 try:
-                    yt = build('youtube', 'v3', developerKey=api_key)
-                    
-                    # Calculate date filter
-                    published_after = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat() + 'Z'
-                    
-                    # Search trending videos
-                    trends_res = yt.search().list(
-                        q=niche,
-                        type='video',
-                        part='id,snippet',
-                        maxResults=20,
-                        order='viewCount',
-                        publishedAfter=published_after,
-                        regionCode='ID'
-                    ).execute()
+                    # A search costs 100 quota units: reruns (e.g. the title generator below) reuse it
+                    trend_view = session_view(
+                        'trend_view', trend_request,
+                        lambda: trending_videos(api_key, niche, days),
+                        refresh=trend_btn
+                    )
+                    trends_res, stats_res = trend_view['result']
                     
                     if not trends_res.get('items'):
                         st.warning(f"No trending videos found for '{niche}' in the last {days} days")
                     else:
-                        video_ids = [item['id']['videoId'] for item in trends_res['items'] if 'videoId' in item.get('id', {})]
-                        
-                        # Get detailed stats
-                        stats_res = yt.videos().list(
-                            id=','.join(video_ids),
-                            part='statistics,snippet,contentDetails'
-                        ).execute()
-                        
                         if stats_res.get('items'):
                             st.success(f"✅ Found {len(stats_res['items'])} trending videos in the last {days} days!")
                             
-                            # Extract data
-                            all_words = []
-                            all_tags = []
+                            # Extract data (phrases & tags go into fixed-size heavy-hitter sketches)
+                            miner = PhraseMiner()
                             all_emojis = []
                             trend_data = []
                             
-                            for item in stats_res['items']:
-                                snippet = item['snippet']
-                                stats = item['statistics']
-                                
-                                title = snippet['title']
-                                tags = snippet.get('tags', [])
-                                views = int(stats.get('viewCount', 0))
-                                engagement = calculate_engagement_rate(stats)
+                            with stage('aggregate'):
+                                ratios = engagement_frame(stats_res['items'])
+                                views_col = ratios['views'].fillna(0).astype('int64').tolist()
+                                engagement_col = ratios['engagement'].tolist()
+                            
+                            with stage('parse'):
+                                for item, views, engagement in zip(stats_res['items'], views_col, engagement_col):
+                                    snippet = item['snippet']
                                 
-                                # Extract words
-                                words = re.findall(r'\b[a-zA-Z]{4,}\b', title.lower())
-                                all_words.extend([w for w in words if w not in STOP_WORDS])
+                                    title = snippet['title']
+                                    tags = snippet.get('tags', [])
                                 
-                                # Extract tags
-                                all_tags.extend(tags)
+                                    # Extract phrases (1-3 words) and tags
+                                    miner.add(title, tags)
                                 
-                                # Extract emojis
-                                emojis = [char for char in title if char in VIRAL_EMOJIS]
-                                all_emojis.extend(emojis)
+                                    # Extract emojis
+                                    emojis = [char for char in title if char in VIRAL_EMOJIS]
+                                    all_emojis.extend(emojis)
                                 
-                                trend_data.append({
-                                    'title': title,
-                                    'channel': snippet['channelTitle'],
-                                    'views': views,
-                                    'engagement': engagement,
-                                    'thumbnail': snippet['thumbnails']['medium']['url'],
-                                    'published': snippet['publishedAt'][:10]
-                                })
+                                    trend_data.append({
+                                        'title': title,
+                                        'channel': snippet['channelTitle'],
+                                        'views': views,
+                                        'engagement': engagement,
+                                        'thumbnail': snippet['thumbnails']['medium']['url'],
+                                        'published': snippet['publishedAt'][:10]
+                                    })
                             
                             # Calculate trending patterns
-                            word_counts = Counter(all_words)
-                            tag_counts = Counter(all_tags)
+                            with stage('aggregate'):
+                                top_phrases = miner.most_common(12)
+                            tag_counts = miner.tags
                             emoji_counts = Counter(all_emojis)
                             
                             # Sort trend data by views
@@ -1270,7 +1634,8 @@ with tab4:
                             
                             # Top metrics
                             total_views = sum(d['views'] for d in trend_data)
-                            avg_engagement = sum(d['engagement'] for d in trend_data) / len(trend_data) if trend_data else 0
+                            trend_summary = summarize(ratios)
+                            avg_engagement = trend_summary['avg_engagement']
                             
                             m1, m2, m3, m4 = st.columns(4)
                             with m1:
@@ -1278,9 +1643,12 @@ with tab4:
                             with m2:
                                 st.metric("👁️ Total Views", f"{total_views:,}")
                             with m3:
-                                st.metric("📈 Avg Engagement", f"{avg_engagement:.2f}%")
+                                st.metric(
+                                    "📈 Avg Engagement", format_rate(avg_engagement),
+                                    help=f"{trend_summary['hidden_likes']} videos hide their likes and are left out" if trend_summary['hidden_likes'] else None
+                                )
                             with m4:
-                                st.metric("🏷️ Unique Tags", len(set(all_tags)))
+                                st.metric("🏷️ Unique Tags", len(tag_counts))
                             
                             st.markdown("---")
                             
@@ -1294,9 +1662,9 @@ with tab4:
                                 </div>
                                 """, unsafe_allow_html=True)
                                 
-                                for word, count in word_counts.most_common(12):
+                                for word, count in top_phrases:
                                     # Calculate popularity bar
-                                    max_count = word_counts.most_common(1)[0][1]
+                                    max_count = top_phrases[0][1]
                                     width = int((count / max_count) * 100)
                                     
                                     st.markdown(f"""
@@ -1377,7 +1745,10 @@ with tab4:
                                     rank_icon = "🥉"
                                 
                                 # Engagement color
-                                if video['engagement'] > 5:
+                                if pd.isna(video['engagement']):
+                                    eng_color = "#6b7280"
+                                    eng_label = "🙈 Likes hidden"
+                                elif video['engagement'] > 5:
                                     eng_color = "#10b981"
                                     eng_label = "🔥 High"
                                 elif video['engagement'] > 2:
@@ -1406,7 +1777,7 @@ with tab4:
                                                     👁️ {video['views']:,} views
                                                 </span>
                                                 <span style='color: {eng_color}; font-size: 0.9rem; font-weight: bold;'>
-                                                    {eng_label} ({video['engagement']:.2f}%)
+                                                    {eng_label} ({format_rate(video['engagement'])})
                                                 </span>
                                                 <span style='color: #aaa; font-size: 0.9rem;'>
                                                     📅 {video['published']}
@@ -1417,6 +1788,10 @@ with tab4:
                                 </div>
                                 """, unsafe_allow_html=True)
                             
+                            # === THUMBNAIL INSIGHTS ===
+                            st.markdown("---")
+                            draw_thumbnail_insights(stats_res['items'], ratios['views'])
+                            
                             # === ACTIONABLE INSIGHTS ===
                             st.markdown("---")
                             st.markdown("### 💡 Actionable Insights")
@@ -1431,7 +1806,7 @@ with tab4:
                                 </div>
                                 """, unsafe_allow_html=True)
                                 
-                                top_keywords = [word for word, _ in word_counts.most_common(5)]
+                                top_keywords = [word for word, _ in top_phrases[:5]]
                                 st.success(f"✅ **Use these keywords:** {', '.join(top_keywords)}")
                                 
                                 if emoji_counts:
@@ -1456,14 +1831,17 @@ with tab4:
                                 high_engagement_videos = [v for v in trend_data if v['engagement'] > avg_engagement]
                                 st.info(f"🔥 **{len(high_engagement_videos)} videos** have above-average engagement")
                                 
-                                st.warning(f"📊 **Target engagement:** >{avg_engagement:.2f}% for best performance")
+                                st.warning(f"📊 **Target engagement:** >{format_rate(avg_engagement)} for best performance")
+                            
+                            export_on_demand(trend_view, 'trend', niche, "trend data", "dl_trend",
+                                             lambda exporter: exporter.write_rows(trend_data))
                             
                             # === QUICK TITLE GENERATOR ===
                             st.markdown("---")
                             st.markdown("### ✨ Quick Trend-Based Title Generator")
                             
                             if st.button("🎲 Generate Trending Title Ideas", type="primary"):
-                                top_keyword = word_counts.most_common(1)[0][0] if word_counts else niche
+                                top_keyword = top_phrases[0][0] if top_phrases else niche
                                 top_emoji = emoji_counts.most_common(1)[0][0] if emoji_counts else random.choice(VIRAL_EMOJIS)
                                 power_word = random.choice(POWER_WORDS_DB).upper()
                                 number = random.choice(['5', '7', '10'])
@@ -1487,6 +1865,228 @@ with tab4:
                     st.error(f"❌ Error: {str(e)}")
                     st.caption("Please check your API key and try again")
 
+with tab4:
+    trend_finder_tab()
+
+# TAB 5: MY CORPUS (offline search, zero quota)
+with tab5, profile_section("My Corpus"):
+    st.markdown("### 🗂️ Search My Corpus")
+    st.caption("Every video fetched by Keyword Research, Channel Audit and Trend Finder is indexed locally - searching costs no API quota.")
+    
+    corpus = get_corpus_index()
+    
+    col_query, col_limit = st.columns([3, 1])
+    with col_query:
+        corpus_query = st.text_input("Search titles, descriptions, tags & channels:", placeholder="e.g., sleep music")
+    with col_limit:
+        corpus_limit = st.selectbox("Results", [25, 50, 100, 250], index=1)
+    
+    st.caption(f"📦 {corpus.count():,} videos indexed")
+    
+    if corpus_query:
+        start = time.perf_counter()
+        hits = corpus.search(corpus_query, limit=corpus_limit)
+        summary = corpus.aggregate(corpus_query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if not hits:
+            st.warning(f"No indexed videos match '{corpus_query}'. Run some research first to grow the corpus.")
+        else:
+            st.success(f"✅ {summary['matches']:,} matches in {elapsed_ms:.1f} ms")
+            
+            m1, m2, m3, m4 = st.columns(4)
+            with m1:
+                st.metric("Matches", f"{summary['matches']:,}")
+            with m2:
+                st.metric("Median Views", f"{int(summary['median_views']):,}")
+            with m3:
+                st.metric("Avg Views", f"{int(summary['avg_views']):,}")
+            with m4:
+                st.metric("Avg Engagement", f"{summary['avg_engagement']}%")
+            
+            col_channels, col_tags = st.columns(2)
+            with col_channels:
+                st.markdown("#### 📺 Top Channels")
+                for channel, count in summary['top_channels']:
+                    st.markdown(f"- **{channel}** ({count} videos)")
+            with col_tags:
+                st.markdown("#### 🏷️ Top Tags")
+                for tag, count in summary['top_tags']:
+                    st.markdown(f"- `{tag}` ({count}x)")
+            
+            st.markdown("#### 🏆 Best Matches (BM25)")
+            st.dataframe(
+                pd.DataFrame([{
+                    'Relevance': hit['rank'],
+                    'Title': hit['title'],
+                    'Channel': hit['channel'],
+                    'Views': hit['views'],
+                    'Date': hit['published_at'][:10],
+                    'Source': hit['source']
+                } for hit in hits]),
+                use_container_width=True,
+                hide_index=True
+            )
+
+# TAB 6: BACKGROUND JOBS
+with tab6, profile_section("Jobs"):
+    st.markdown("### 🧵 Background Jobs")
+    st.caption("Large audits, bulk metadata proposals, bulk keyword runs and deep trend scans run on worker threads - keep using the other tabs. Progress is saved after every page, so interrupted jobs resume where they stopped.")
+    
+    runner = get_job_runner()
+    
+    job_type = st.radio("New job:", ["📺 Channel Audit", "🛠️ Bulk Optimizer", "🔍 Bulk Keywords", "🎯 Trend Scan"], horizontal=True)
+    
+    if job_type in ("📺 Channel Audit", "🛠️ Bulk Optimizer"):
+        col_id, col_limit = st.columns([3, 1])
+        with col_id:
+            job_channel = st.text_input("Channel ID (UC...):", placeholder="UC_x5XG1OV2P6uZZ5FSM9Ttw", key="job_channel")
+        with col_limit:
+            job_limit = st.selectbox("Videos", [50, 200, 500, 1000, 5000], index=1, key="job_limit")
+        if job_type == "🛠️ Bulk Optimizer":
+            job_topic = st.text_input(
+                "Topic keyword (optional):", placeholder="e.g., lofi hip hop", key="job_topic",
+                help="Its top videos' titles and tags are shared competitor context for every upload (101 quota units)"
+            )
+            st.caption("💡 Thousands of uploads? `python channel_optimizer.py UC... -o review.csv` spreads the work over every CPU core")
+    elif job_type == "🔍 Bulk Keywords":
+        job_keywords = st.text_area("Keywords (one per line):", placeholder="lofi hip hop\nsleep music\nrain sounds", key="job_keywords")
+    else:
+        col_niche, col_days, col_pages = st.columns([3, 1, 1])
+        with col_niche:
+            job_niche = st.text_input("🎨 Niche/Category:", placeholder="e.g., gaming", key="job_niche")
+        with col_days:
+            job_days = st.selectbox("Period", [7, 14, 30], key="job_days", format_func=lambda d: f"{d} Days")
+        with col_pages:
+            job_pages = st.selectbox("Pages (50 videos each)", [2, 5, 10, 20], key="job_pages")
+    
+    if st.button("▶️ Start Job", type="primary"):
+        if not api_key or len(api_key) < 30:
+            st.error("⚠️ API Key required in sidebar")
+        elif job_type in ("📺 Channel Audit", "🛠️ Bulk Optimizer"):
+            if not job_channel or not job_channel.startswith("UC"):
+                st.error("⚠️ Invalid Channel ID (must start with UC)")
+            elif job_type == "📺 Channel Audit":
+                runner.submit('channel_audit', f"Audit {job_channel} ({job_limit} videos)", {
+                    'channel_id': job_channel, 'limit': job_limit, 'power_words': current_power_words()
+                }, api_key)
+            else:
+                runner.submit('channel_optimize', f"Optimize {job_channel} ({job_limit} videos)", {
+                    'channel_id': job_channel, 'limit': job_limit, 'keyword': job_topic.strip(),
+                    'power_words': current_power_words()
+                }, api_key)
+        elif job_type == "🔍 Bulk Keywords":
+            keywords = [k.strip() for k in job_keywords.splitlines() if k.strip()]
+            if not keywords:
+                st.warning("⚠️ Enter at least one keyword")
+            else:
+                runner.submit('keyword_batch', f"{len(keywords)} keywords", {'keywords': keywords}, api_key)
+        elif not job_niche:
+            st.warning("⚠️ Enter your niche first")
+        else:
+            runner.submit('trend_scan', f"Trends '{job_niche}' ({job_days}d, {job_pages} pages)", {
+                'niche': job_niche, 'days': job_days, 'pages': job_pages
+            }, api_key)
+    
+    st.markdown("---")
+    st.markdown("#### 📋 Jobs")
+    polling = runner.has_active()
+    st.fragment(render_job_list, run_every=2 if polling else None)(runner, polling)
+    
+    finished = [job for job in runner.store.list() if job['progress']]
+    if finished:
+        st.markdown("---")
+        st.markdown("#### 📊 Results")
+        selected_job = st.selectbox(
+            "Job:", finished,
+            format_func=lambda job: f"#{job['id']} {job['label']} ({job['status']})"
+        )
+        render_job_results(runner, selected_job)
+
+# TAB 7: COMPETITOR WATCHLIST
+with tab7, profile_section("Watchlist"):
+    st.markdown("### 👀 Competitor Watchlist")
+    st.caption("New uploads from watched channels, scored with the Title Optimizer rubric. Only channels whose video count changed cost extra quota. Keep it polling without the app: `python watchlist.py run --interval 900`")
+    
+    watch_store = get_watchlist_store()
+    
+    col_add, col_btn = st.columns([3, 1])
+    with col_add:
+        new_channels = st.text_area("Add channels (UC... IDs, one per line):", height=80, key="watch_add")
+    with col_btn:
+        st.write("")
+        add_btn = st.button("➕ Add", use_container_width=True)
+        poll_btn = st.button("🔄 Poll now", type="primary", use_container_width=True)
+    
+    if add_btn:
+        channel_ids = re.findall(r'UC[\w-]{22}', new_channels)
+        if channel_ids:
+            watch_store.add_channels(channel_ids)
+            st.success(f"✅ Watching {len(channel_ids)} more channel(s)")
+        else:
+            st.warning("⚠️ No valid channel IDs (UC + 22 characters)")
+    
+    if poll_btn:
+        if not api_key or len(api_key) < 30:
+            st.error("⚠️ API Key required")
+        else:
+            with st.spinner("🔄 Polling watched channels..."):
+                summary = poll_watchlist(api_key, watch_store, current_power_words(), on_items=index_fetched_items)
+            st.success(f"✅ {summary['changed']}/{summary['channels']} channels changed · {summary['new_videos']} new uploads · {summary['quota_units']} quota units")
+            if summary['catching_up']:
+                st.info(f"⏳ {summary['catching_up']} channels uploaded more than {MAX_UPLOAD_PAGES * UPLOADS_PAGE_SIZE} videos since the last poll - the rest is fetched over the next polls")
+            for error in summary['errors']:
+                st.warning(error)
+    
+    watched = watch_store.channels()
+    recent = watch_store.recent_videos(limit=200)
+    last_poll = next(iter(watch_store.polls(limit=1)), None)
+    week_ago = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    this_week = [v for v in recent if v['published_at'] >= week_ago]
+    
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        st.metric("📺 Channels", len(watched))
+    with m2:
+        st.metric("🆕 Uploads (7 days)", len(this_week))
+    with m3:
+        st.metric("📊 Avg Score (7 days)", f"{int(sum(v['score'] for v in this_week) / len(this_week))}/100" if this_week else "-")
+    with m4:
+        if last_poll:
+            minutes = int((time.time() - last_poll['started_at']) / 60)
+            st.metric("⏱️ Last Poll", f"{minutes} min ago", f"{last_poll['quota_units']} units", delta_color="off")
+        else:
+            st.metric("⏱️ Last Poll", "never")
+    
+    if recent:
+        st.markdown("#### 🆕 New Uploads")
+        st.dataframe(pd.DataFrame([{
+            'Date': v['published_at'][:10],
+            'Channel': v['channel'] or v['channel_id'],
+            'Title': v['title'],
+            'Keyword': v['keyword'],
+            'Score': v['score']
+        } for v in recent]), use_container_width=True, hide_index=True)
+    elif watched:
+        st.info("No new uploads since the channels were added - the first poll only records a baseline.")
+    
+    if watched:
+        with st.expander(f"📺 Watched channels ({len(watched)})"):
+            st.dataframe(pd.DataFrame([{
+                'Channel': c['title'] or '(not polled yet)',
+                'ID': c['channel_id'],
+                'Subscribers': c['subscribers'],
+                'Videos': c['video_count'],
+                'Latest Upload': c['last_video_at'][:10]
+            } for c in watched]), use_container_width=True, hide_index=True)
+            to_remove = st.multiselect(
+                "Stop watching:", [c['channel_id'] for c in watched],
+                format_func=lambda cid: next((c['title'] for c in watched if c['channel_id'] == cid and c['title']), cid)
+            )
+            if to_remove and st.button("🗑️ Remove"):
+                watch_store.remove_channels(to_remove)
+                st.rerun()
+
 # FOOTER
 st.markdown("---")
 st.markdown("""
@@ -1496,3 +2096,14 @@ st.markdown("""
     <p style='font-size: 0.8rem; opacity: 0.6;'>Made with ❤️ for Content Creators</p>
 </div>
 """, unsafe_allow_html=True)
+
+# --- 9. PROFILING REPORT ---
+if PROFILER is not None:
+    st.session_state.pop('_rerun_profiler', None)
+    PROFILER.stop()
+    if CLI_ARGS.profile_dir:
+        stamp = datetime.datetime.fromtimestamp(PROFILER.started_at).strftime('%Y%m%d_%H%M%S_%f')
+        PROFILER.dump(os.path.join(CLI_ARGS.profile_dir, f"vidiq_profile_{stamp}.json"))
+    with st.sidebar:
+        st.divider()
+        render_profile_report(PROFILER)
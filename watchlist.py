@@ -0,0 +1,378 @@
+"""
+Competitor watchlist: poll a list of channels on a schedule and score their new uploads.
+
+    python watchlist.py add UCxxxx UCyyyy
+    python watchlist.py run --interval 900 --channels-file competitors.txt
+    python watchlist.py poll
+
+Each cycle costs one channels().list call per 50 channels plus one playlistItems
+call per channel whose video count went up; unchanged channels cost nothing more.
+The API key comes from --api-key or the YOUTUBE_API_KEY environment variable; with
+YOUTUBE_API_KEYS (comma separated) set instead, polls are spread over that key pool.
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from seo import FALLBACK_POWER_WORDS, analyze_title, extract_keywords_from_title
+from async_youtube import AsyncYouTubeClient, run_all, uploads_playlist_id
+from youtube_api import KEY_POOL
+
+DEFAULT_WATCHLIST_DB = os.environ.get("VIDIQ_WATCHLIST_DB", "vidiq_watchlist.db")
+DEFAULT_INTERVAL = 15 * 60
+CHANNELS_PER_CALL = 50      # channels().list accepts at most 50 IDs
+UPLOADS_PAGE_SIZE = 10
+MAX_UPLOAD_PAGES = 5        # per channel per cycle; a longer gap is resumed from a saved page token next cycle
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watch_channels (
+    channel_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    subscribers INTEGER,
+    video_count INTEGER,
+    last_video_at TEXT NOT NULL DEFAULT '',
+    resume_token TEXT NOT NULL DEFAULT '',
+    resume_latest TEXT NOT NULL DEFAULT '',
+    last_polled REAL,
+    added_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS watch_videos (
+    video_id TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    published_at TEXT NOT NULL DEFAULT '',
+    keyword TEXT NOT NULL DEFAULT '',
+    score INTEGER NOT NULL,
+    checks TEXT NOT NULL DEFAULT '[]',
+    baseline INTEGER NOT NULL DEFAULT 0,
+    found_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS watch_videos_published ON watch_videos (published_at DESC);
+
+CREATE TABLE IF NOT EXISTS watch_polls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    channels INTEGER NOT NULL,
+    changed INTEGER NOT NULL,
+    new_videos INTEGER NOT NULL,
+    quota_units INTEGER NOT NULL,
+    error TEXT NOT NULL DEFAULT ''
+);
+"""
+
+# Columns added after the first release, for databases created before them
+MIGRATIONS = {
+    'watch_channels': {
+        'resume_token': "TEXT NOT NULL DEFAULT ''",
+        'resume_latest': "TEXT NOT NULL DEFAULT ''",
+    },
+}
+
+
+class WatchlistStore:
+    """Watched channels, every upload found for them and a log of poll cycles"""
+
+    def __init__(self, path=DEFAULT_WATCHLIST_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            for table, columns in MIGRATIONS.items():
+                existing = {row['name'] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                for column, definition in columns.items():
+                    if column not in existing:
+                        self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def add_channels(self, channel_ids):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO watch_channels (channel_id, added_at) VALUES (?, ?)",
+                [(cid, now) for cid in channel_ids]
+            )
+
+    def remove_channels(self, channel_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM watch_channels WHERE channel_id = ?", [(cid,) for cid in channel_ids])
+
+    def sync_channels(self, channel_ids):
+        """Make the watched set exactly `channel_ids` (stored uploads are kept)"""
+        wanted = set(channel_ids)
+        current = {c['channel_id'] for c in self.channels()}
+        self.add_channels(sorted(wanted - current))
+        self.remove_channels(sorted(current - wanted))
+
+    def channels(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM watch_channels ORDER BY title, channel_id").fetchall()
+        return [dict(row) for row in rows]
+
+    def update_channel(self, channel_id, title, subscribers, video_count=None, last_video_at=None):
+        """Refresh channel info; video_count / last_video_at only move once its uploads were read"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """UPDATE watch_channels SET title = ?, subscribers = ?, last_polled = ?,
+                       video_count = COALESCE(?, video_count),
+                       last_video_at = MAX(last_video_at, COALESCE(?, ''))
+                   WHERE channel_id = ?""",
+                (title, subscribers, time.time(), video_count, last_video_at, channel_id)
+            )
+
+    def set_resume(self, channel_id, resume_token="", resume_latest=""):
+        """
+        Where an unfinished catch-up continues: the next page token and the newest upload
+        seen so far (it becomes last_video_at once the gap is covered). Empty when caught up.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE watch_channels SET resume_token = ?, resume_latest = ? WHERE channel_id = ?",
+                (resume_token, resume_latest, channel_id)
+            )
+
+    def add_videos(self, rows):
+        """Insert scored uploads; returns how many were not stored before"""
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """INSERT OR IGNORE INTO watch_videos
+                   (video_id, channel_id, title, published_at, keyword, score, checks, baseline, found_at)
+                   VALUES (:video_id, :channel_id, :title, :published_at, :keyword, :score, :checks, :baseline, :found_at)""",
+                rows
+            )
+            return self._conn.total_changes - before
+
+    def record_poll(self, started_at, duration, channels, changed, new_videos, quota_units, error=""):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO watch_polls (started_at, duration, channels, changed, new_videos, quota_units, error)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (started_at, duration, channels, changed, new_videos, quota_units, error)
+            )
+
+    def recent_videos(self, limit=100, include_baseline=False):
+        where = "" if include_baseline else "WHERE v.baseline = 0"
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT v.*, c.title AS channel FROM watch_videos v
+                    LEFT JOIN watch_channels c ON c.channel_id = v.channel_id
+                    {where} ORDER BY v.published_at DESC LIMIT ?""",
+                (limit,)
+            ).fetchall()
+        return [dict(row, checks=json.loads(row['checks'])) for row in rows]
+
+    def polls(self, limit=20):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM watch_polls ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+async def _new_uploads(client, channel_id, last_video_at, page_token=None):
+    """
+    (uploads newer than `last_video_at` newest first, calls made, resume token). Starts at
+    `page_token` when resuming and stops at the first already-seen upload; the resume
+    token is None once the gap is covered, else the page to continue from next cycle.
+    """
+    found = []
+    calls = 0
+    for _ in range(MAX_UPLOAD_PAGES):
+        res = await client.list(
+            'playlistItems', 'watch_uploads',
+            playlistId=uploads_playlist_id(channel_id), maxResults=UPLOADS_PAGE_SIZE, pageToken=page_token
+        )
+        calls += 1
+        for item in res.get('items', []):
+            if item.get('snippet', {}).get('publishedAt', '') <= last_video_at:
+                return found, calls, None
+            found.append(item)
+        page_token = res.get('nextPageToken')
+        # First poll of a channel: one page is enough as a baseline
+        if not page_token or not last_video_at:
+            return found, calls, None
+    return found, calls, page_token
+
+
+def score_upload(item, channel_id, power_words, baseline):
+    snippet = item.get('snippet', {})
+    title = snippet.get('title', '')
+    keywords = extract_keywords_from_title(title, top_n=1)
+    keyword = keywords[0] if keywords else ""
+    score, checks = analyze_title(title, keyword, power_words)
+    return {
+        'video_id': snippet.get('resourceId', {}).get('videoId') or item.get('id'),
+        'channel_id': channel_id,
+        'title': title,
+        'published_at': snippet.get('publishedAt', ''),
+        'keyword': keyword,
+        'score': score,
+        'checks': json.dumps([message for _, message in checks], ensure_ascii=False),
+        'baseline': int(baseline),
+        'found_at': time.time()
+    }
+
+
+def poll_watchlist(api_key, store, power_words=None, on_items=None):
+    """
+    One poll cycle: channel stats in batches of 50, uploads only for channels whose
+    video count grew. Returns a summary dict (also logged to the store).
+    """
+    started = time.time()
+    power_words = power_words or FALLBACK_POWER_WORDS
+    watched = {c['channel_id']: c for c in store.channels()}
+    summary = {'channels': len(watched), 'changed': 0, 'new_videos': 0, 'quota_units': 0, 'catching_up': 0, 'errors': []}
+    if not watched:
+        return summary
+
+    client = AsyncYouTubeClient(api_key)
+    ids = list(watched)
+    batches = [ids[i:i + CHANNELS_PER_CALL] for i in range(0, len(ids), CHANNELS_PER_CALL)]
+    try:
+        responses = run_all(*[
+            client.list('channels', 'watch_channels', id=','.join(batch), maxResults=CHANNELS_PER_CALL)
+            for batch in batches
+        ])
+    except Exception as e:
+        summary['errors'].append(str(e))
+        store.record_poll(started, time.time() - started, len(watched), 0, 0, len(batches), str(e))
+        return summary
+    summary['quota_units'] += len(batches)
+
+    changed = []
+    for item in (item for res in responses for item in res.get('items', [])):
+        cid = item['id']
+        known = watched.get(cid)
+        if known is None:
+            continue
+        stats = item.get('statistics', {})
+        video_count = int(stats.get('videoCount', 0))
+        subscribers = int(stats['subscriberCount']) if 'subscriberCount' in stats else None
+        title = item.get('snippet', {}).get('title', '')
+        # Channels still catching up on a long gap continue even if their count didn't move
+        if known['video_count'] is None or video_count > known['video_count'] or known['resume_token']:
+            changed.append((cid, title, subscribers, video_count))
+        else:
+            # Unchanged (or deletions): nothing to fetch, just remember the new count
+            store.update_channel(cid, title, subscribers, video_count)
+    summary['changed'] = len(changed)
+
+    results = run_all(
+        *[
+            _new_uploads(client, cid, watched[cid]['last_video_at'], watched[cid]['resume_token'] or None)
+            for cid, *_ in changed
+        ],
+        return_exceptions=True
+    )
+    for (cid, title, subscribers, video_count), result in zip(changed, results):
+        if isinstance(result, Exception):
+            # Count stays put, so the next cycle tries this channel again (from the newest
+            # upload if a resume token was in play: it may have expired)
+            summary['errors'].append(f"{cid}: {result}")
+            store.update_channel(cid, title, subscribers)
+            if watched[cid]['resume_token']:
+                store.set_resume(cid, "", watched[cid]['resume_latest'])
+            continue
+        items, calls, resume_token = result
+        summary['quota_units'] += calls
+        baseline = not watched[cid]['last_video_at']
+        rows = [score_upload(item, cid, power_words, baseline) for item in items]
+        rows = [row for row in rows if row['video_id']]
+        inserted = store.add_videos(rows)
+        if not baseline:
+            summary['new_videos'] += inserted
+        if on_items and items:
+            on_items(items, 'watchlist')
+        latest = max([watched[cid]['resume_latest'], *(row['published_at'] for row in rows)])
+        if resume_token:
+            # Gap not covered yet: last_video_at and the count stay put until it is
+            summary['catching_up'] += 1
+            store.update_channel(cid, title, subscribers)
+            store.set_resume(cid, resume_token, latest)
+        else:
+            # After a catch-up the old count is kept, so uploads that arrived meanwhile
+            # still register as a change next cycle
+            resumed = bool(watched[cid]['resume_token'])
+            store.update_channel(cid, title, subscribers, None if resumed else video_count, latest or None)
+            store.set_resume(cid)
+
+    duration = time.time() - started
+    summary['duration'] = duration
+    store.record_poll(
+        started, duration, len(watched), len(changed), summary['new_videos'], summary['quota_units'],
+        "; ".join(summary['errors'])[:1000]
+    )
+    return summary
+
+
+def read_channels_file(path):
+    """One UC... ID per line; blank lines and # comments are ignored"""
+    with open(path, encoding="utf-8") as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line.startswith("UC")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VidIQ Clone competitor watchlist")
+    parser.add_argument("--db", default=DEFAULT_WATCHLIST_DB, help="Watchlist database file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Watch channels")
+    add.add_argument("channel_ids", nargs="+")
+    remove = sub.add_parser("remove", help="Stop watching channels")
+    remove.add_argument("channel_ids", nargs="+")
+    sub.add_parser("list", help="Show watched channels")
+    for name, help_text in (("poll", "Run one poll cycle"), ("run", "Poll forever on a schedule")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY"), help="Default: $YOUTUBE_API_KEY")
+        cmd.add_argument("--channels-file", help="Watch exactly the channels listed here (re-read every cycle)")
+        cmd.add_argument("--power-words", help="JSON array or newline-separated power words (default: offline list)")
+        cmd.add_argument("--no-corpus", action="store_true", help="Don't add found uploads to the local corpus")
+        if name == "run":
+            cmd.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help="Seconds between cycles")
+    args = parser.parse_args(argv)
+
+    store = WatchlistStore(args.db)
+    if args.command == "add":
+        store.add_channels([cid for cid in args.channel_ids if cid.startswith("UC")])
+    elif args.command == "remove":
+        store.remove_channels(args.channel_ids)
+    elif args.command == "list":
+        for channel in store.channels():
+            print(f"{channel['channel_id']}  {channel['title'] or '(not polled yet)'}  videos={channel['video_count']}")
+    else:
+        api_key = args.api_key or KEY_POOL.any_key()
+        if not api_key:
+            raise SystemExit("❌ API key required (--api-key, YOUTUBE_API_KEY or YOUTUBE_API_KEYS)")
+        from score_titles import load_power_words
+        power_words = load_power_words(args.power_words)
+        on_items = None
+        if not args.no_corpus:
+            from corpus_index import CorpusIndex, DEFAULT_DB_PATH
+            on_items = CorpusIndex(DEFAULT_DB_PATH).add_items
+
+        while True:
+            if args.channels_file:
+                store.sync_channels(read_channels_file(args.channels_file))
+            summary = poll_watchlist(api_key, store, power_words, on_items)
+            print(
+                f"{time.strftime('%Y-%m-%d %H:%M:%S')} ✅ {summary['channels']} channels, "
+                f"{summary['changed']} changed, {summary['new_videos']} new uploads, "
+                f"{summary['quota_units']} quota units"
+                + (f", {summary['catching_up']} still catching up" if summary['catching_up'] else "")
+                + (f", {len(summary['errors'])} errors" if summary['errors'] else ""),
+                file=sys.stderr
+            )
+            if args.command == "poll":
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,693 @@
+import os
+import copy
+import datetime
+import time
+import threading
+import pandas as pd
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+import resilience
+from resilience import CircuitOpenError, DeadlineExceededError
+from profiling import stage, staged
+from baselines import load_baselines
+from key_pool import KeyPool, KeyPoolExhaustedError, uri_cost
+from engagement import engagement_frame, summarize
+
+# YouTube Data API access shared by the Streamlit tabs and background jobs.
+# `on_items(items, source, query, region)` hooks let callers persist raw results (e.g. the corpus index).
+
+
+ETAG_CACHE_SIZE = 1024
+VIDEO_STATS_SIZE = 4096
+VIDEO_STATS_TTL = 15 * 60
+API_DEADLINE = float(os.environ.get('VIDIQ_API_DEADLINE', resilience.DEFAULT_DEADLINE))
+# Seconds before a slow videos/channels/playlistItems call gets a duplicate request (off unless set)
+HEDGE_AFTER = float(os.environ['VIDIQ_HEDGE_AFTER']) if os.environ.get('VIDIQ_HEDGE_AFTER') else None
+API_UNAVAILABLE = "❌ YouTube API sedang gangguan, coba lagi sebentar lagi"
+MISSING_KEY = "❌ Invalid API Key"
+INVALID_KEY = "❌ API Key tidak valid!"
+QUOTA_EXHAUSTED = "❌ Quota API habis!"
+# Errors that fail every request made with the same key(s), not just the current keyword
+KEY_ERRORS = frozenset({API_UNAVAILABLE, MISSING_KEY, INVALID_KEY, QUOTA_EXHAUSTED})
+
+YOUTUBE_BREAKER = resilience.CircuitBreaker('YouTube API')
+# Keys from YOUTUBE_API_KEYS (comma separated); the app adds its secrets.toml keys
+KEY_POOL = KeyPool(os.environ.get('YOUTUBE_API_KEYS', ''))
+# Unmasked calibration samples are skipped while the pool has less than this many units left
+CALIBRATION_RESERVE = 1000
+_local = threading.local()
+
+# Per-view request profiles: `part` plus a `fields` mask covering exactly what each
+# view reads (ETags included for the conditional-request cache). `baseline_part` is
+# what the view requested before masking; it is fetched once, unmasked, to measure
+# savings. Search views have no baseline, an unmasked search would cost 100 units.
+FIELD_PROFILES = {
+    'keyword_search': {
+        # Titles and channels are shown while statistics are still loading
+        'part': 'id,snippet',
+        'fields': 'items(id/videoId,snippet(title,channelTitle,publishedAt))',
+    },
+    'keyword': {
+        'part': 'snippet,statistics',
+        'fields': 'etag,items(id,snippet(title,channelId,channelTitle,publishedAt,tags),'
+                  'statistics(viewCount,likeCount,commentCount))',
+        'baseline_part': 'statistics,snippet,contentDetails',
+    },
+    'trend_search': {
+        'part': 'id',
+        'fields': 'nextPageToken,items/id/videoId',
+    },
+    'trend': {
+        'part': 'snippet,statistics',
+        'fields': 'etag,items(id,snippet(title,channelId,channelTitle,publishedAt,tags,thumbnails/medium/url),'
+                  'statistics(viewCount,likeCount,commentCount))',
+        'baseline_part': 'statistics,snippet,contentDetails',
+    },
+    'audit_channel': {
+        'part': 'snippet,statistics,contentDetails',
+        'fields': 'etag,items(id,snippet(title,description,thumbnails/medium/url),'
+                  'statistics(subscriberCount,viewCount,videoCount),contentDetails/relatedPlaylists/uploads)',
+        'baseline_part': 'snippet,statistics,contentDetails',
+    },
+    'audit_uploads': {
+        'part': 'snippet',
+        'fields': 'etag,nextPageToken,items(kind,snippet(title,channelId,channelTitle,publishedAt,'
+                  'resourceId/videoId,thumbnails/default/url))',
+        'baseline_part': 'snippet',
+    },
+    'audit_videos': {
+        # Per-video engagement for the audit; everything else comes from the uploads page
+        'part': 'statistics',
+        'fields': 'etag,items(id,statistics(viewCount,likeCount,commentCount))',
+        'baseline_part': 'statistics',
+    },
+    'optimize': {
+        # Current metadata of each upload for the bulk optimizer's review sheet
+        'part': 'snippet,contentDetails',
+        'fields': 'etag,items(id,snippet(title,description,tags,publishedAt),contentDetails/duration)',
+        'baseline_part': 'snippet,contentDetails',
+    },
+    'comments': {
+        # No etag in the mask: comment pages are streamed once, not kept in the ETag cache
+        'part': 'snippet',
+        'fields': 'nextPageToken,items/snippet/topLevelComment/snippet(textOriginal,likeCount)',
+    },
+    'watch_channels': {
+        'part': 'snippet,statistics',
+        'fields': 'etag,items(id,snippet/title,statistics(videoCount,subscriberCount))',
+    },
+    'watch_uploads': {
+        'part': 'snippet',
+        'fields': 'etag,nextPageToken,items(kind,snippet(title,channelId,channelTitle,publishedAt,resourceId/videoId))',
+    },
+}
+
+
+def get_youtube_client(api_key):
+    """YouTube Data API v3 client"""
+    return build('youtube', 'v3', developerKey=api_key)
+
+
+def view_params(view):
+    """`part` and `fields` keyword arguments for a list() call of the given view"""
+    profile = FIELD_PROFILES[view]
+    return {'part': profile['part'], 'fields': profile['fields']}
+
+
+def _baseline_uri(uri, part):
+    """Same request without the field mask, using the view's pre-mask `part`"""
+    parts = urlsplit(uri)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in ('fields', 'part')]
+    query.append(('part', part))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+class PayloadStats:
+    """
+    Response bytes per view. The first masked response of a view with a baseline is
+    compared against the same request unmasked; that ratio estimates the bytes saved
+    on every later call of the view.
+    """
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def _view(self, view):
+        return self._views.setdefault(view, {
+            'calls': 0, 'bytes': 0, 'not_modified': 0, 'masked_sample': 0, 'full_sample': None
+        })
+
+    def record(self, view, nbytes):
+        with self._lock:
+            stats = self._view(view)
+            stats['calls'] += 1
+            stats['bytes'] += nbytes
+
+    def record_not_modified(self, view):
+        with self._lock:
+            stats = self._view(view)
+            stats['calls'] += 1
+            stats['not_modified'] += 1
+
+    def needs_calibration(self, view):
+        if 'baseline_part' not in FIELD_PROFILES.get(view, {}):
+            return False
+        with self._lock:
+            return self._view(view)['full_sample'] is None
+
+    def claim_calibration(self, view):
+        """True exactly once per view, for the caller that should measure the baseline"""
+        with self._lock:
+            stats = self._view(view)
+            if stats['full_sample'] is not None:
+                return False
+            stats['full_sample'] = 0
+            return True
+
+    def calibrate(self, view, masked_bytes, full_bytes):
+        with self._lock:
+            stats = self._view(view)
+            stats['masked_sample'] = masked_bytes
+            stats['full_sample'] = full_bytes
+
+    def rows(self):
+        """One summary dict per view, for display"""
+        with self._lock:
+            views = {view: dict(stats) for view, stats in self._views.items()}
+        rows = []
+        for view, stats in sorted(views.items()):
+            fetched = stats['calls'] - stats['not_modified']
+            avg = stats['bytes'] / fetched if fetched else 0
+            saved = None
+            if stats['masked_sample'] and stats['full_sample']:
+                saved = avg * (stats['full_sample'] / stats['masked_sample'] - 1)
+            rows.append({
+                'View': view,
+                'Calls': stats['calls'],
+                '304s': stats['not_modified'],
+                'KB received': round(stats['bytes'] / 1024, 1),
+                'Avg bytes/call': int(avg),
+                'Est. bytes saved/call': int(saved) if saved is not None else None,
+            })
+        return rows
+
+
+PAYLOAD_STATS = PayloadStats()
+
+
+def _measure(request, view, sink):
+    """Report the raw response size of `request` to sink(view, nbytes)"""
+    postproc = request.postproc
+
+    def measured(resp, content):
+        sink(view, len(content or b''))
+        return postproc(resp, content)
+
+    request.postproc = measured
+
+
+def _calibration_allowed(uri):
+    """Calibration costs a real call: only with an unpooled key or while the pool has quota to spare"""
+    key = dict(parse_qsl(urlsplit(uri).query)).get('key')
+    return key not in KEY_POOL or KEY_POOL.remaining() >= CALIBRATION_RESERVE
+
+
+def _calibrate(baseline, view, masked_bytes):
+    """
+    Fetch the view's request once without the field mask and keep both sizes. Sent like
+    any other call (key routing, quota charge, breaker); a failure only loses the sample.
+    """
+    baseline.uri = _baseline_uri(baseline.uri, FIELD_PROFILES[view]['baseline_part'])
+    sizes = []
+    _measure(baseline, view, lambda _, nbytes: sizes.append(nbytes))
+    try:
+        _execute(baseline)
+    except Exception:
+        return
+    if sizes:
+        PAYLOAD_STATS.calibrate(view, masked_bytes, sizes[0])
+
+
+def _thread_http():
+    """One connection pool per worker thread (httplib2.Http is not thread-safe)"""
+    http = getattr(_local, 'http', None)
+    if http is None:
+        http = _local.http = build_http()
+        http.timeout = API_DEADLINE
+    return http
+
+
+def _with_key(uri, key):
+    """Same request URL sent with another API key"""
+    parts = urlsplit(uri)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != 'key']
+    query.append(('key', key))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def _execute(request, hedge=False):
+    """Execute with retries, a deadline and the YouTube circuit breaker"""
+    caller_key = dict(parse_qsl(urlsplit(request.uri).query)).get('key')
+    cost = uri_cost(request.uri)
+
+    def attempt():
+        # Own copy per attempt: hedged duplicates may run at the same time
+        req = copy.copy(request)
+        req.headers = dict(request.headers)
+        while True:
+            # Pooled keys: sent with whichever key has the most quota left, moving on when one is spent
+            key = KEY_POOL.route(caller_key, cost)
+            if key != caller_key:
+                req.uri = _with_key(request.uri, key)
+            try:
+                return req.execute(http=_thread_http())
+            except Exception as e:
+                if not KEY_POOL.report_error(key, e):
+                    raise
+
+    return resilience.call(
+        attempt, YOUTUBE_BREAKER, deadline=API_DEADLINE,
+        hedge_after=HEDGE_AFTER if hedge else None
+    )
+
+
+def execute_measured(request, view):
+    """
+    Execute a search request, counting its response bytes under `view`. Searches are
+    never sent conditionally, so their responses stay out of the ETag cache.
+    """
+    return ETAG_CACHE.execute(request, view, conditional=False)
+
+
+def published_after(days):
+    """`publishedAfter` for the last `days` days, rounded down to the hour so repeat searches share a URL"""
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+    return cutoff.replace(minute=0, second=0, microsecond=0).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _request_key(uri):
+    """Request URL without the API key, so every key shares one cache entry"""
+    parts = urlsplit(uri)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if k != 'key')
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+class ETagCache:
+    """
+    Last response and ETag per request URL. A repeat request is sent with
+    If-None-Match; a 304 Not Modified reply is answered from the stored payload.
+    While YouTube is failing, the stored payload is served stale instead.
+    Unconditional requests (searches) bypass the cache entirely.
+    Cached payloads are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries=ETAG_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def lookup(self, key):
+        with self._lock:
+            return self._items.get(key)
+
+    def fallback(self, key, cached, error, view=None, conditional=True):
+        """The cached payload answering `error` (304 or an outage), or None to re-raise it"""
+        if cached is None:
+            return None
+        if conditional and resilience.status_of(error) == 304:
+            if view:
+                PAYLOAD_STATS.record_not_modified(view)
+            with self._lock:
+                self.hits += 1
+                if key in self._items:
+                    self._items.move_to_end(key)
+            return cached
+        if isinstance(error, (CircuitOpenError, DeadlineExceededError)) or resilience.is_retryable(error):
+            with self._lock:
+                self.stale += 1
+            return cached
+        return None
+
+    def store(self, key, response):
+        with self._lock:
+            self.misses += 1
+            if response.get('etag'):
+                self._items[key] = response
+                self._items.move_to_end(key)
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+
+    @staged('fetch')
+    def execute(self, request, view=None, conditional=True):
+        key = _request_key(request.uri)
+        cached = self.lookup(key) if conditional else None
+        # Copied before the ETag header and size hook are attached (headers too: copy.copy shares the dict)
+        baseline = None
+        if view and PAYLOAD_STATS.needs_calibration(view):
+            baseline = copy.copy(request)
+            baseline.headers = dict(request.headers)
+        if cached is not None and conditional and cached.get('etag'):
+            request.headers['If-None-Match'] = cached['etag']
+        sizes = []
+        if view:
+            _measure(request, view, lambda v, nbytes: (sizes.append(nbytes), PAYLOAD_STATS.record(v, nbytes)))
+
+        try:
+            response = _execute(request, hedge=conditional)
+        except Exception as e:
+            answer = self.fallback(key, cached, e, view, conditional)
+            if answer is None:
+                raise
+            return answer
+
+        if conditional:
+            self.store(key, response)
+        if baseline is not None and sizes and _calibration_allowed(request.uri) and PAYLOAD_STATS.claim_calibration(view):
+            _calibrate(baseline, view, sizes[0])
+        return response
+
+
+ETAG_CACHE = ETagCache()
+
+
+class VideoStatsCache:
+    """
+    Recent videos#video items (keyword view) by video ID. Searches that overlap - the
+    same keyword in several regions - then fetch each shared video's statistics once;
+    the ETag cache can't help there because every search yields a different ID list.
+    Items are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries=VIDEO_STATS_SIZE, ttl=VIDEO_STATS_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_many(self, video_ids):
+        """{video_id: item} for the IDs that are cached and still fresh"""
+        now = time.time()
+        found = {}
+        with self._lock:
+            for video_id in video_ids:
+                entry = self._items.get(video_id)
+                if entry is not None and now - entry[0] < self.ttl:
+                    self._items.move_to_end(video_id)
+                    found[video_id] = entry[1]
+            self.hits += len(found)
+            self.misses += len(set(video_ids)) - len(found)
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        with self._lock:
+            for item in items:
+                self._items[item['id']] = (now, item)
+                self._items.move_to_end(item['id'])
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+VIDEO_STATS = VideoStatsCache()
+
+
+def execute_cached(request, view=None):
+    """Execute a videos/channels/playlistItems request through the shared ETag cache"""
+    return ETAG_CACHE.execute(request, view)
+
+
+def rate_competition(keyword, region, median_views, avg_engagement):
+    """
+    (difficulty label, difficulty score, opportunity score, baseline info or None).
+    With a baselines file, difficulty is the percentile of the results' median views
+    among videos of the keyword's niche and region, and opportunity adds how engaged
+    that audience is relative to the niche; otherwise fixed view thresholds apply.
+    """
+    baselines = load_baselines()
+    rating = baselines.rate(keyword, region, median_views, avg_engagement) if baselines else None
+    if rating is None:
+        if median_views > 500000:
+            return "🔴 High", 30, 30, None
+        elif median_views > 100000:
+            return "🟡 Medium", 60, 60, None
+        return "🟢 Low", 90, 90, None
+    
+    views_pct = rating['views_percentile']
+    if views_pct >= 70:
+        difficulty = "🔴 High"
+    elif views_pct >= 40:
+        difficulty = "🟡 Medium"
+    else:
+        difficulty = "🟢 Low"
+    diff_score = round(100 - views_pct)
+    if rating['engagement_percentile'] is None:
+        opportunity = diff_score
+    else:
+        opportunity = round(0.7 * diff_score + 0.3 * rating['engagement_percentile'])
+    return difficulty, diff_score, opportunity, rating
+
+
+@staged('aggregate')
+def keyword_metrics_from_items(items, keyword="", region='ID'):
+    """Aggregate videos#video items (statistics + snippet): (metrics dict, None) or (None, error)"""
+    # Process data
+    metrics = []
+    all_tags = []
+    upload_times = []
+    
+    with stage('parse'):
+        for item in items:
+            snippet = item.get('snippet', {})
+        
+            tags = snippet.get('tags', [])
+            all_tags.extend(tags)
+        
+            published = snippet.get('publishedAt', '')
+            if published:
+                upload_times.append(published)
+        
+            metrics.append({
+                'Title': snippet.get('title', 'Unknown'),
+                'Channel': snippet.get('channelTitle', 'Unknown'),
+                'Date': published[:10] if published else 'N/A',
+                'tags': tags,
+                'publishedAt': published,
+                'video_id': item.get('id')
+            })
+    
+    if not metrics:
+        return None, "❌ No data available"
+    
+    # Ratios over the whole sample at once; hidden likes stay NaN instead of counting as 0
+    ratios = engagement_frame(items)
+    df = pd.DataFrame(metrics)
+    df.insert(1, 'Views', ratios['views'].fillna(0).astype('int64').to_numpy())
+    df.insert(2, 'Likes', ratios['likes'].astype('Int64').to_numpy())
+    df.insert(3, 'Comments', ratios['comments'].astype('Int64').to_numpy())
+    df.insert(4, 'Engagement', ratios['engagement'].to_numpy())
+    
+    # Calculate metrics
+    view_counts = df['Views'][df['Views'] > 0]
+    summary = summarize(ratios)
+    
+    median_views = float(view_counts.median()) if len(view_counts) else 0
+    avg_views = float(view_counts.mean()) if len(view_counts) else 0
+    # Real zeros count; videos with hidden likes don't. NaN only if every video hides them
+    avg_engagement = summary['avg_engagement']
+    
+    # Trending tags
+    trending_tags = []
+    if all_tags:
+        tag_counts = Counter(all_tags)
+        trending_tags = [tag for tag, _ in tag_counts.most_common(15)]
+    
+    # Best upload time
+    best_time = "Unknown"
+    best_hour = None
+    if upload_times:
+        hours = [int(t[11:13]) for t in upload_times if len(t) > 13]
+        if hours:
+            most_common_hour = best_hour = Counter(hours).most_common(1)[0][0]
+            best_time = f"{most_common_hour:02d}:00 - {(most_common_hour+1):02d}:00 WIB"
+    
+    # Competition level & opportunity, relative to the keyword's niche when baselines exist
+    difficulty, diff_score, opportunity_score, baseline = rate_competition(keyword, region, median_views, avg_engagement)
+    
+    return {
+        'median_views': median_views,
+        'avg_views': avg_views,
+        'avg_engagement': avg_engagement,
+        'hidden_likes': summary['hidden_likes'],
+        'score': opportunity_score,
+        'difficulty': difficulty,
+        'difficulty_score': diff_score,
+        'baseline': baseline,
+        'trending_tags': trending_tags,
+        'best_upload_time': best_time,
+        'best_hour': best_hour,
+        'total_videos': len(metrics),
+        'top_videos': df
+    }, None
+
+
+def keyword_error_message(e):
+    """User-facing message for a failed keyword fetch"""
+    if isinstance(e, CircuitOpenError):
+        return API_UNAVAILABLE
+    if isinstance(e, DeadlineExceededError):
+        return "❌ YouTube API timeout, coba lagi"
+    if isinstance(e, KeyPoolExhaustedError):
+        return QUOTA_EXHAUSTED
+    error_msg = str(e)
+    if "API key not valid" in error_msg:
+        return INVALID_KEY
+    elif "quota" in error_msg.lower():
+        return QUOTA_EXHAUSTED
+    elif resilience.is_retryable(e):
+        return f"❌ YouTube API sibuk (HTTP {resilience.status_of(e) or '-'}), coba lagi"
+    else:
+        return f"❌ Error: {error_msg}"
+
+
+def get_keyword_metrics(api_key, keyword, on_items=None, region='ID'):
+    """
+    Get comprehensive keyword metrics from YouTube (search results as seen in `region`).
+    Key and quota failures come back as one of KEY_ERRORS.
+    """
+    if not api_key or len(api_key) < 30:
+        return None, MISSING_KEY
+    
+    if not keyword:
+        return None, "❌ Keyword required"
+    
+    try:
+        youtube = get_youtube_client(api_key)
+        
+        # Search for videos
+        search_res = execute_measured(youtube.search().list(
+            q=keyword,
+            type='video',
+            maxResults=20,
+            order='relevance',
+            regionCode=region,
+            **view_params('keyword_search')
+        ), 'keyword_search')
+        
+        if not search_res.get('items'):
+            return None, f"❌ No videos found for '{keyword}'"
+        
+        # Get video IDs
+        video_ids = [item['id']['videoId'] for item in search_res['items'] if 'videoId' in item.get('id', {})]
+        
+        if not video_ids:
+            return None, "❌ No valid videos found"
+        
+        # Get detailed statistics
+        stats_res = execute_cached(youtube.videos().list(
+            id=','.join(video_ids),
+            **view_params('keyword')
+        ), 'keyword')
+        
+        VIDEO_STATS.put_many(stats_res.get('items', []))
+        if on_items:
+            on_items(stats_res.get('items', []), 'keyword', keyword, region)
+        
+        return keyword_metrics_from_items(stats_res.get('items', []), keyword, region)
+        
+    except Exception as e:
+        return None, keyword_error_message(e)
+
+
+def get_channel(youtube, channel_id):
+    """Channel resource (snippet, statistics, uploads playlist) or None"""
+    ch_res = execute_cached(youtube.channels().list(
+        id=channel_id,
+        **view_params('audit_channel')
+    ), 'audit_channel')
+    items = ch_res.get('items', [])
+    return items[0] if items else None
+
+
+def iter_upload_pages(youtube, uploads_playlist_id, limit, page_token=None, page_size=50):
+    """
+    Walk a channel's uploads playlist page by page.
+    Yields (items, next_page_token) so callers can checkpoint after every page.
+    """
+    fetched = 0
+    while fetched < limit:
+        res = execute_cached(youtube.playlistItems().list(
+            playlistId=uploads_playlist_id,
+            maxResults=min(page_size, limit - fetched),
+            pageToken=page_token,
+            **view_params('audit_uploads')
+        ), 'audit_uploads')
+        items = res.get('items', [])
+        page_token = res.get('nextPageToken')
+        fetched += len(items)
+        yield items, page_token
+        if not items or not page_token:
+            break
+
+
+def iter_upload_details(youtube, uploads_playlist_id, limit, page_token=None):
+    """
+    iter_upload_pages() plus one videos call per page for titles, descriptions, tags
+    and durations (2 quota units per 50 videos). Yields (video_items, next_page_token);
+    videos that are private or deleted drop out.
+    """
+    for items, next_token in iter_upload_pages(youtube, uploads_playlist_id, limit, page_token):
+        video_ids = [item['snippet']['resourceId']['videoId'] for item in items]
+        if not video_ids:
+            yield [], next_token
+            continue
+        res = execute_cached(youtube.videos().list(
+            id=','.join(video_ids),
+            **view_params('optimize')
+        ), 'optimize')
+        # videos.list doesn't promise the requested order; keep the playlist's
+        by_id = {item['id']: item for item in res.get('items', [])}
+        yield [by_id[vid] for vid in video_ids if vid in by_id], next_token
+
+
+def iter_trend_pages(youtube, niche, days, pages, page_token=None, region='ID'):
+    """
+    Most-viewed recent videos for a niche, one search page (+ statistics) at a time.
+    Yields (video_items, next_page_token).
+    """
+    cutoff = published_after(days)
+    for _ in range(pages):
+        trends_res = execute_measured(youtube.search().list(
+            q=niche,
+            type='video',
+            maxResults=50,
+            order='viewCount',
+            publishedAfter=cutoff,
+            regionCode=region,
+            pageToken=page_token,
+            **view_params('trend_search')
+        ), 'trend_search')
+        video_ids = [item['id']['videoId'] for item in trends_res.get('items', []) if 'videoId' in item.get('id', {})]
+        page_token = trends_res.get('nextPageToken')
+        if not video_ids:
+            break
+        stats_res = execute_cached(youtube.videos().list(
+            id=','.join(video_ids),
+            **view_params('trend')
+        ), 'trend')
+        yield stats_res.get('items', []), page_token
+        if not page_token:
+            break